@@ -0,0 +1,59 @@
+"""
+api/backlog.py
+--------------
+Recherche dans le backlog persistant (toutes les User Stories générées, toutes sessions).
+
+Endpoints :
+- GET /api/backlog/stories  → recherche plein texte classée (bm25) + filtres exacts, paginée
+- GET /api/backlog/facets   → répartition par thème, priorité, session et source pour la même sélection
+"""
+
+from fastapi import APIRouter, Query
+
+from backlog_generator.backlog_store import get_backlog_store
+
+router = APIRouter(prefix="/api/backlog", tags=["backlog"])
+
+
+def _filters(theme, priority, session_id, source, min_relevance) -> dict:
+    return {"theme": theme, "priority": priority, "session_id": session_id,
+            "source": source, "min_relevance": min_relevance}
+
+
+@router.get("/stories")
+def search_stories(
+    q: str | None = Query(None, description="Texte recherché (titre, idée, US, critères, thème)"),
+    theme: str | None = None,
+    priority: str | None = None,
+    session_id: str | None = None,
+    source: str | None = Query(None, description="audio ou text"),
+    min_relevance: float | None = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    """User Stories correspondant à la recherche, les plus pertinentes d'abord."""
+    items, total = get_backlog_store().search(
+        q, limit=limit, offset=offset, **_filters(theme, priority, session_id, source, min_relevance)
+    )
+    next_offset = offset + len(items)
+    return {
+        "items": items,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < total else None,
+    }
+
+
+@router.get("/facets")
+def story_facets(
+    q: str | None = None,
+    theme: str | None = None,
+    priority: str | None = None,
+    session_id: str | None = None,
+    source: str | None = None,
+    min_relevance: float | None = Query(None, ge=0),
+    top: int = Query(20, ge=1, le=100),
+):
+    """Nombre d'User Stories par valeur de facette (les `top` valeurs les plus fréquentes)."""
+    return get_backlog_store().facets(q, top=top, **_filters(theme, priority, session_id, source, min_relevance))
@@ -0,0 +1,390 @@
+"""
+api/jobs.py
+-----------
+Soumission et suivi des jobs d'analyse par HTTP.
+
+Endpoints :
+- POST /api/jobs              → audio (multipart `file` ou corps brut audio/*) ou texte (`text`, JSON ou multipart)
+- POST /api/jobs/batch        → import en masse de feedbacks (fichier envoyé ou chemin sous input/, voir batch_ingest)
+- GET  /api/jobs/{id}         → état du job (file SQLite job_queue)
+- GET  /api/jobs/{id}/events  → progression en Server-Sent Events (reprise via Last-Event-ID)
+
+L'audio est écrit sur disque au fil de la réception (jamais chargé en mémoire) dans un nouveau
+dossier de session. Les jobs sont exécutés dans le process de l'API par JobRunner : threads
+dédiés bornés par un sémaphore asyncio, la boucle d'événements n'attend jamais un appel Groq.
+Des workers externes (`make worker`) peuvent consommer la même file.
+"""
+
+import os
+import json
+import uuid
+import shutil
+import socket
+import asyncio
+import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from backlog_generator.job_queue import JOB_QUEUE_PATH, JobQueue, run_job
+from backlog_generator.session_processing import enqueue_session, update_metadata
+from backlog_generator.logger_manager import info
+
+SESSIONS_DIR = Path("input/sessions")
+BATCH_INPUT_DIR = Path("input")
+BATCH_TYPES = {"text/plain": ".txt", "text/csv": ".csv", "application/x-ndjson": ".jsonl", "application/jsonl": ".jsonl"}
+API_JOB_CONCURRENCY = int(os.getenv("API_JOB_CONCURRENCY", "8"))
+API_MAX_UPLOAD_MB = int(os.getenv("API_MAX_UPLOAD_MB", "500"))
+SSE_POLL_SEC = 0.5
+SSE_KEEPALIVE_SEC = 15.0
+AUDIO_SUFFIXES = {".wav", ".flac", ".ogg", ".opus", ".mp3", ".m4a", ".webm"}
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+_queue: JobQueue | None = None
+runner: "JobRunner | None" = None
+
+
+def get_queue() -> JobQueue:
+    """File partagée par les endpoints et le runner (connexion SQLite unique, protégée par verrou)."""
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(JOB_QUEUE_PATH)
+    return _queue
+
+
+# -------------------------
+# ⚙️ Exécution des jobs dans le process de l'API
+# -------------------------
+class JobRunner:
+    """
+    Prend les jobs de la file et les exécute dans un pool de `concurrency` threads
+    (run_job : bail, battement de cœur, reprises). Réveillé immédiatement à chaque soumission.
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: int = API_JOB_CONCURRENCY, poll_sec: float = 1.0):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_sec = poll_sec
+        self.worker_id = f"api-{socket.gethostname()}-{os.getpid()}"
+        self._executor = ThreadPoolExecutor(max_workers=concurrency + 1, thread_name_prefix="job")
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+        info("Exécution des jobs dans l'API", concurrency=self.concurrency, event="api_runner_start")
+
+    def notify(self):
+        self._wake.set()
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            await slots.acquire()
+            job = await loop.run_in_executor(self._executor, self.queue.claim, self.worker_id)
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_sec)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+            task = loop.create_task(self._run(job, slots))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, job, slots: asyncio.Semaphore):
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, run_job, self.queue, job, self.worker_id)
+        finally:
+            slots.release()
+
+    async def stop(self):
+        """Arrête la prise de jobs ; les jobs en cours finissent (ou seront repris à l'expiration du bail)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# -------------------------
+# 📥 Réception des uploads
+# -------------------------
+def _new_session_folder() -> Path:
+    stamp = datetime.datetime.now().strftime("%Y-%m-%d_%H%M%S")
+    folder = SESSIONS_DIR / f"session_{stamp}_{uuid.uuid4().hex[:6]}"
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+def _audio_name(filename: str | None) -> str:
+    suffix = Path(filename or "").suffix.lower()
+    return f"audio{suffix if suffix in AUDIO_SUFFIXES else '.wav'}"
+
+
+class MultipartToDisk:
+    """
+    Analyse un corps multipart/form-data au fil de l'eau (python-multipart) :
+    la partie fichier est écrite directement dans `folder`, les champs texte sont gardés (bornés).
+    """
+
+    def __init__(self, boundary: bytes, folder: Path, max_field_bytes: int = 1 << 20):
+        self.folder = folder
+        self.max_field_bytes = max_field_bytes
+        self.fields: dict[str, str] = {}
+        self.file_path: Path | None = None
+        self.file_name: str | None = None
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: dict[bytes, bytes] = {}
+        self._name: str | None = None
+        self._value = bytearray()
+        self._file = None
+        self.parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._part_begin,
+            "on_header_field": lambda data, start, end: self._append_header("_header_field", data[start:end]),
+            "on_header_value": lambda data, start, end: self._append_header("_header_value", data[start:end]),
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        })
+
+    def _append_header(self, attr: str, data: bytes):
+        setattr(self, attr, getattr(self, attr) + data)
+
+    def _part_begin(self):
+        self._headers, self._name, self._value = {}, None, bytearray()
+
+    def _header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field, self._header_value = b"", b""
+
+    def _headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" in options and self.file_path is None:
+            self.file_name = options[b"filename"].decode("utf-8", "replace")
+            self.file_path = self.folder / _audio_name(self.file_name)
+            self._file = open(self.file_path, "wb")
+
+    def _part_data(self, data: bytes, start: int, end: int):
+        if self._file is not None:
+            self._file.write(data[start:end])
+        else:
+            self._value += data[start:end]
+            if len(self._value) > self.max_field_bytes:
+                raise HTTPException(status_code=413, detail=f"Champ {self._name} trop volumineux")
+
+    def _part_end(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        elif self._name:
+            self.fields[self._name] = self._value.decode("utf-8", "replace")
+
+    def write(self, chunk: bytes):
+        self.parser.write(chunk)
+
+    def close(self):
+        self.parser.finalize()
+        if self._file is not None:
+            self._file.close()
+
+
+async def _stream_body(request: Request, sink) -> int:
+    """Copie le corps de la requête bloc par bloc dans `sink` (écritures disque hors boucle d'événements)."""
+    limit = API_MAX_UPLOAD_MB * 1024 * 1024
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise HTTPException(status_code=413, detail=f"Upload limité à {API_MAX_UPLOAD_MB} Mo")
+        if chunk:
+            await asyncio.to_thread(sink.write, chunk)
+    return received
+
+
+def _truthy(value) -> bool:
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+def _job_links(job_id: int) -> dict:
+    return {"status_url": f"/api/jobs/{job_id}", "events_url": f"/api/jobs/{job_id}/events"}
+
+
+# -------------------------
+# 🚀 Endpoints
+# -------------------------
+@router.post("", status_code=202)
+async def submit_job(request: Request):
+    """
+    Soumet un enregistrement ou un feedback écrit et retourne l'identifiant du job.
+    - multipart/form-data : `file` (audio) ou `text`, option `push_to_jira`
+    - audio/* ou application/octet-stream : corps brut (`?filename=…&push_to_jira=…`)
+    - application/json : {"text": "...", "push_to_jira": false}
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type"))
+    content_type = content_type.decode("latin-1").lower()
+    queue = get_queue()
+    push_to_jira = _truthy(request.query_params.get("push_to_jira", "0"))
+    text = None
+    folder = None
+
+    if content_type == "application/json":
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="JSON invalide")
+        text = (body.get("text") or "").strip()
+        push_to_jira = push_to_jira or bool(body.get("push_to_jira"))
+    elif content_type == "multipart/form-data":
+        if b"boundary" not in options:
+            raise HTTPException(status_code=400, detail="Boundary multipart manquante")
+        folder = _new_session_folder()
+        sink = MultipartToDisk(options[b"boundary"], folder)
+        try:
+            await _stream_body(request, sink)
+            await asyncio.to_thread(sink.close)
+        except Exception:
+            shutil.rmtree(folder, ignore_errors=True)
+            raise
+        push_to_jira = push_to_jira or _truthy(sink.fields.get("push_to_jira", "0"))
+        if sink.file_path is None:
+            folder.rmdir()
+            folder = None
+            text = (sink.fields.get("text") or "").strip()
+        else:
+            audio_file, filename = sink.file_path, sink.file_name
+    elif content_type.startswith("audio/") or content_type == "application/octet-stream":
+        folder = _new_session_folder()
+        filename = request.query_params.get("filename")
+        audio_file = folder / _audio_name(filename or f"upload.{content_type.split('/')[-1]}")
+        try:
+            with open(audio_file, "wb") as f:
+                await _stream_body(request, f)
+        except Exception:
+            shutil.rmtree(folder, ignore_errors=True)
+            raise
+    else:
+        raise HTTPException(status_code=415, detail=f"Type de contenu non pris en charge : {content_type or 'aucun'}")
+
+    if folder is not None:
+        if audio_file.stat().st_size == 0:
+            shutil.rmtree(folder, ignore_errors=True)
+            raise HTTPException(status_code=400, detail="Fichier audio vide")
+        now = datetime.datetime.now().isoformat()
+        await asyncio.to_thread(
+            update_metadata, folder,
+            session_id=folder.name, start_time=now, end_time=now, duration_sec=0,
+            audio_file=str(audio_file), folder_path=str(folder), processed=False,
+            status="recorded", source="api", original_filename=filename,
+        )
+        job_id = await asyncio.to_thread(enqueue_session, queue, folder, push_to_jira)
+        kind = "session"
+    elif text:
+        job_id = await asyncio.to_thread(queue.enqueue, "text", {"text": text, "push_to_jira": push_to_jira})
+        kind = "text"
+    else:
+        raise HTTPException(status_code=400, detail="Fournir un fichier audio (`file`) ou un texte (`text`)")
+
+    if runner is not None:
+        runner.notify()
+    info("Job soumis via l'API", job_id=job_id, kind=kind, event="api_job_submitted")
+    return JSONResponse(status_code=202, content={"job_id": job_id, "kind": kind, "status": "queued", **_job_links(job_id)})
+
+
+@router.post("/batch", status_code=202)
+async def submit_batch(request: Request):
+    """
+    Soumet un import en masse de feedbacks (un par ligne / enregistrement).
+    - application/json : {"path": "input/feedbacks.txt", "push_to_jira": false} (fichier ou dossier sous input/)
+    - text/plain, text/csv, application/x-ndjson : fichier envoyé en corps brut, écrit au fil de la réception
+    """
+    content_type = parse_options_header(request.headers.get("content-type"))[0].decode("latin-1").lower()
+    push_to_jira = _truthy(request.query_params.get("push_to_jira", "0"))
+
+    if content_type == "application/json":
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="JSON invalide")
+        path = Path(body.get("path") or "")
+        push_to_jira = push_to_jira or bool(body.get("push_to_jira"))
+        if not body.get("path") or not path.resolve().is_relative_to(BATCH_INPUT_DIR.resolve()):
+            raise HTTPException(status_code=400, detail=f"Chemin attendu sous {BATCH_INPUT_DIR}/")
+        if not path.exists():
+            raise HTTPException(status_code=404, detail=f"Introuvable : {path}")
+    elif content_type in BATCH_TYPES:
+        folder = BATCH_INPUT_DIR / "batches"
+        folder.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        path = folder / f"feedbacks_{stamp}_{uuid.uuid4().hex[:6]}{BATCH_TYPES[content_type]}"
+        try:
+            with open(path, "wb") as f:
+                received = await _stream_body(request, f)
+        except Exception:
+            path.unlink(missing_ok=True)
+            raise
+        if received == 0:
+            path.unlink()
+            raise HTTPException(status_code=400, detail="Fichier de feedbacks vide")
+    else:
+        raise HTTPException(status_code=415, detail=f"Type de contenu non pris en charge : {content_type or 'aucun'}")
+
+    job_id = await asyncio.to_thread(get_queue().enqueue, "batch", {"path": str(path), "push_to_jira": push_to_jira})
+    if runner is not None:
+        runner.notify()
+    info("Import de feedbacks soumis via l'API", job_id=job_id, path=str(path), event="api_job_submitted")
+    return JSONResponse(status_code=202, content={"job_id": job_id, "kind": "batch", "status": "queued", **_job_links(job_id)})
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: int):
+    """État courant d'un job (statut, tentatives, résultat ou erreur)."""
+    job = await asyncio.to_thread(get_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} introuvable")
+    return {**job.to_json(), **_job_links(job_id)}
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: int, request: Request, after: int = 0):
+    """
+    Flux SSE des événements du job (queued, started, stage_started, stage_completed, retry, succeeded, failed).
+    Le flux se ferme après l'événement final ; `Last-Event-ID` (ou `?after=`) reprend après une coupure.
+    """
+    queue = get_queue()
+    if await asyncio.to_thread(queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} introuvable")
+    last_id = int(request.headers.get("last-event-id") or after)
+
+    async def stream():
+        nonlocal last_id
+        idle = 0.0
+        while not await request.is_disconnected():
+            job = await asyncio.to_thread(queue.get, job_id)
+            events = await asyncio.to_thread(queue.events, job_id, last_id)
+            for event in events:
+                last_id = event["id"]
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            if job.status in TERMINAL_STATUSES:
+                break
+            idle = 0.0 if events else idle + SSE_POLL_SEC
+            if idle >= SSE_KEEPALIVE_SEC:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(SSE_POLL_SEC)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -5,16 +5,45 @@ Serveur FastAPI pour exposer les endpoints du projet AI Scrum PO Assistant.
 
 Endpoints :
 - GET /ping → test basique de disponibilité
+- /api/sessions → liste, dernier résumé et détail des sessions (voir api/sessions.py)
+- /api/backlog → recherche plein texte et facettes sur toutes les User Stories (voir api/backlog.py)
+- /api/jobs → soumission et suivi des analyses (voir api/jobs.py)
 """
 
+import os
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 
+from api import backlog, jobs, sessions
+
+# Exécute les jobs soumis dans le process de l'API (0 = uniquement via `make worker`)
+API_RUN_JOBS = os.getenv("API_RUN_JOBS", "1") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(sessions.ensure_catalog)
+    if API_RUN_JOBS:
+        jobs.runner = jobs.JobRunner(jobs.get_queue())
+        jobs.runner.start()
+    yield
+    if jobs.runner is not None:
+        await jobs.runner.stop()
+        jobs.runner = None
+
+
 app = FastAPI(
     title="AI Scrum PO Assistant API",
     description="API REST du moteur d'analyse et de génération d'User Stories",
     version="1.0.0",
+    lifespan=lifespan,
 )
+app.include_router(sessions.router)
+app.include_router(backlog.router)
+app.include_router(jobs.router)
 
 
 @app.get("/ping", tags=["healthcheck"])
@@ -24,46 +53,6 @@ def ping():
     """
     return JSONResponse(content={"status": "ok", "message": "API opérationnelle 🚀"})
 
-from pathlib import Path
-import json
-from fastapi import HTTPException
-
-SESSIONS_DIR = Path("input/sessions")
-
-@app.get("/api/sessions/latest", tags=["sessions"])
-def get_latest_session():
-    """
-    Retourne le contenu du dernier summary.json généré.
-    """
-    # Vérifie si le répertoire existe
-    if not SESSIONS_DIR.exists():
-        raise HTTPException(status_code=404, detail="Répertoire de sessions introuvable")
-
-    # Récupère les sessions triées par date de modification
-    sessions = sorted(SESSIONS_DIR.glob("session_*"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if not sessions:
-        raise HTTPException(status_code=404, detail="Aucune session disponible")
-
-    latest = sessions[0]
-    summary_path = latest / "summary.json"
-    meta_path = latest / "metadata.json"
-
-    if not summary_path.exists():
-        raise HTTPException(status_code=404, detail=f"Fichier summary.json manquant dans {latest.name}")
-
-    # Lecture du fichier JSON
-    try:
-        with open(summary_path, "r", encoding="utf-8") as f:
-            summary = json.load(f)
-        if meta_path.exists():
-            with open(meta_path, "r", encoding="utf-8") as f:
-                summary["metadata"] = json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur de lecture du résumé : {str(e)}")
-
-    return summary
-
-
 
 # point d’entrée
 if __name__ == "__main__":
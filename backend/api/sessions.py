@@ -0,0 +1,159 @@
+"""
+api/sessions.py
+---------------
+Consultation des sessions analysées, servie par le catalogue indexé (session_catalog).
+
+Endpoints :
+- GET /api/sessions               → liste paginée, filtres `since`, `theme`, `min_score`
+- GET /api/sessions/latest        → dernier résumé de session (summary.json + metadata)
+- GET /api/sessions/{session_id}  → résumé et métadonnées d'une session
+
+Les réponses sont gardées dans un cache LRU du process, valable tant que la révision du
+catalogue ne change pas. Chaque réponse porte un ETag : un client qui renvoie
+If-None-Match reçoit un 304 sans corps tant que le contenu est identique.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Callable
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+
+from backlog_generator.session_catalog import SessionCatalog, get_catalog
+
+SESSIONS_DIR = Path("input/sessions")
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "256"))
+
+router = APIRouter(prefix="/api/sessions", tags=["sessions"])
+
+
+# -------------------------
+# 🧠 Cache LRU des réponses
+# -------------------------
+class ResponseCache:
+    """Corps JSON sérialisés et leur ETag, indexés par requête et invalidés par révision du catalogue."""
+
+    def __init__(self, maxsize: int = API_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[int, str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, revision: int) -> tuple[str, bytes] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != revision:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: tuple, revision: int, etag: str, body: bytes):
+        with self._lock:
+            self._entries[key] = (revision, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+cache = ResponseCache()
+
+
+def ensure_catalog() -> int:
+    """Indexe les dossiers de session existants si le catalogue est vide (premier démarrage)."""
+    catalog = get_catalog()
+    if len(catalog) == 0 and SESSIONS_DIR.exists():
+        return catalog.rebuild(SESSIONS_DIR)
+    return 0
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in header.split(",")]
+
+
+def cached_response(request: Request, key: tuple, build: Callable[[SessionCatalog], dict]) -> Response:
+    """
+    Sert la réponse depuis le cache si la révision du catalogue n'a pas bougé, sinon la
+    reconstruit (`build` peut lever HTTPException, les erreurs ne sont pas mises en cache).
+    """
+    catalog = get_catalog()
+    revision = catalog.revision()
+    key = (str(catalog.path), *key)
+    hit = cache.get(key, revision)
+    if hit is None:
+        body = json.dumps(build(catalog), ensure_ascii=False).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        cache.put(key, revision, etag, body)
+    else:
+        etag, body = hit
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# -------------------------
+# 🌐 Endpoints
+# -------------------------
+@router.get("")
+def list_sessions(
+    request: Request,
+    since: str | None = Query(None, description="Date ISO : sessions démarrées à partir de cette date"),
+    theme: str | None = Query(None, description="Thème détecté (insensible à la casse)"),
+    min_score: float | None = Query(None, ge=0, le=1, description="Score global minimal"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """Liste paginée des sessions (plus récentes d'abord)."""
+    def build(catalog: SessionCatalog) -> dict:
+        items, total = catalog.search(since=since, theme=theme, min_score=min_score, limit=limit, offset=offset)
+        next_offset = offset + len(items)
+        return {
+            "items": items,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_offset": next_offset if next_offset < total else None,
+        }
+
+    return cached_response(request, ("list", since, theme and theme.lower(), min_score, limit, offset), build)
+
+
+@router.get("/latest")
+def get_latest_session(request: Request):
+    """
+    Retourne le contenu du dernier summary.json généré.
+    """
+    def build(catalog: SessionCatalog) -> dict:
+        summary = catalog.latest()
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Aucune session disponible")
+        return summary
+
+    return cached_response(request, ("latest",), build)
+
+
+@router.get("/{session_id}")
+def get_session(session_id: str, request: Request):
+    """Résumé et métadonnées d'une session du catalogue."""
+    def build(catalog: SessionCatalog) -> dict:
+        session = catalog.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Session inconnue : {session_id}")
+        return session
+
+    return cached_response(request, ("session", session_id), build)
@@ -0,0 +1,132 @@
+"""
+audio_buffer.py
+---------------
+Tampon PCM int16 pour l'enregistrement des sessions longues.
+
+Au lieu d'une liste de milliers de petits tableaux concaténés à l'arrêt,
+l'audio est copié dans des blocs préalloués de taille fixe (ex. 60 s) :
+- aucune allocation par lecture micro (une seule par bloc)
+- pas de concaténation à l'arrêt : la sauvegarde WAV écrit directement les blocs
+- mémoire ≈ durée enregistrée (pas de pic ×2 au moment du stop)
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import wave
+from typing import Iterator
+
+import numpy as np
+
+
+class PCMBuffer:
+    """Tampon audio extensible par blocs préalloués (int16, forme (n, canaux))."""
+
+    def __init__(self, channels: int = 1, block_frames: int = 44100 * 60):
+        self.channels = channels
+        self.block_frames = block_frames
+        self._blocks: list[np.ndarray] = []
+        self._fill = block_frames  # force l'allocation du premier bloc à la première écriture
+        self._frames = 0
+
+    def __len__(self) -> int:
+        return self._frames
+
+    # ------------------------------------------------------------
+    def write(self, data: np.ndarray):
+        """Copie `data` (n, canaux) à la suite du tampon."""
+        data = np.asarray(data).reshape(-1, self.channels)
+        offset = 0
+        while offset < len(data):
+            if self._fill == self.block_frames:
+                # np.empty ne touche pas la mémoire : l'OS ne l'engage qu'à l'écriture
+                self._blocks.append(np.empty((self.block_frames, self.channels), dtype=np.int16))
+                self._fill = 0
+            n = min(len(data) - offset, self.block_frames - self._fill)
+            self._blocks[-1][self._fill:self._fill + n] = data[offset:offset + n]
+            self._fill += n
+            offset += n
+        self._frames += len(data)
+
+    def clear(self):
+        self._blocks = []
+        self._fill = self.block_frames
+        self._frames = 0
+
+    # ------------------------------------------------------------
+    def iter_blocks(self, start: int = 0, end: int | None = None) -> Iterator[np.ndarray]:
+        """Vues (sans copie) sur les échantillons [start, end)."""
+        end = self._frames if end is None else min(end, self._frames)
+        for i, block in enumerate(self._blocks):
+            block_start = i * self.block_frames
+            lo = max(start - block_start, 0)
+            hi = min(end - block_start, self.block_frames)
+            if hi > lo:
+                yield block[lo:hi]
+
+    def read(self, start: int = 0, end: int | None = None) -> np.ndarray:
+        """Copie contiguë des échantillons [start, end) (ex. fenêtre du mode live)."""
+        views = list(self.iter_blocks(start, end))
+        if not views:
+            return np.zeros((0, self.channels), dtype=np.int16)
+        return np.concatenate(views, axis=0)
+
+    def write_wav(self, path: str, fs: int):
+        """Sauvegarde en WAV PCM 16 bits, bloc par bloc, sans concaténation."""
+        with wave.open(str(path), "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(fs)
+            for view in self.iter_blocks():
+                wf.writeframes(memoryview(np.ascontiguousarray(view)).cast("B"))
+
+
+class BlockQueue:
+    """
+    File bornée mono-producteur / mono-consommateur entre le callback audio et le thread d'écriture.
+
+    Les emplacements sont préalloués : le callback ne fait qu'une copie dans un slot libre,
+    sans verrou ni allocation. Chaque index n'est modifié que par un seul thread
+    (`_tail` par le producteur, `_head` par le consommateur), ce qui suffit sous le GIL.
+    Si la file est pleine, le bloc est perdu et compté dans `overflows`.
+    """
+
+    def __init__(self, capacity: int = 512, block_frames: int = 1024, channels: int = 1):
+        self.capacity = capacity
+        self.block_frames = block_frames
+        self._slots = np.zeros((capacity, block_frames, channels), dtype=np.int16)
+        self._sizes = [0] * capacity
+        self._head = 0  # prochain slot à lire (consommateur)
+        self._tail = 0  # prochain slot à écrire (producteur)
+        self.overflows = 0
+        self.dropped_frames = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def push(self, data: np.ndarray) -> bool:
+        """Côté producteur (callback audio). Retourne False si le bloc a dû être abandonné."""
+        for start in range(0, len(data), self.block_frames):
+            part = data[start:start + self.block_frames]
+            depth = self._tail - self._head
+            if depth >= self.capacity:
+                self.overflows += 1
+                self.dropped_frames += len(data) - start
+                return False
+            slot = self._tail % self.capacity
+            self._slots[slot, :len(part)] = part
+            self._sizes[slot] = len(part)
+            self._tail += 1  # publication après la copie
+            self.max_depth = max(self.max_depth, depth + 1)
+        return True
+
+    def drain(self, consume) -> int:
+        """Côté consommateur : passe chaque bloc en attente à `consume(view)` ; retourne le nombre de blocs."""
+        count = 0
+        tail = self._tail
+        while self._head < tail:
+            slot = self._head % self.capacity
+            consume(self._slots[slot, :self._sizes[slot]])
+            self._head += 1  # libère le slot après consommation
+            count += 1
+        return count
@@ -0,0 +1,131 @@
+"""
+audio_chunker.py
+----------------
+Découpe un enregistrement long en fenêtres transcriptibles séparément :
+- coupes placées sur les silences (énergie minimale autour de la cible)
+- fenêtres qui se chevauchent pour ne perdre aucun mot à la frontière
+- recollage des transcriptions avec suppression des doublons du chevauchement
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import io
+import re
+import wave
+from difflib import SequenceMatcher
+
+import numpy as np
+
+
+# -------------------------
+# 🎧 Lecture / écriture WAV
+# -------------------------
+def read_wav(file_path: str) -> tuple[np.ndarray, int]:
+    """Lit un WAV PCM 16 bits → (échantillons int16 de forme (n, canaux), fréquence)."""
+    with wave.open(str(file_path), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"❌ Seul le PCM 16 bits est supporté ({file_path})")
+        channels = wf.getnchannels()
+        fs = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+    samples = np.frombuffer(raw, dtype="<i2").reshape(-1, channels)
+    return samples, fs
+
+
+def encode_wav_bytes(samples: np.ndarray, fs: int) -> bytes:
+    """Encode des échantillons int16 en fichier WAV complet (en mémoire)."""
+    samples = np.asarray(samples, dtype="<i2")
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(samples.shape[1])
+        wf.setsampwidth(2)
+        wf.setframerate(fs)
+        wf.writeframes(np.ascontiguousarray(samples).tobytes())
+    return buf.getvalue()
+
+
+# -------------------------
+# ✂️ Recherche des coupes sur les silences
+# -------------------------
+def frame_energy(samples: np.ndarray, fs: int, frame_ms: int = 50) -> np.ndarray:
+    """Énergie RMS par trame (calcul vectorisé, canaux moyennés)."""
+    mono = samples.astype(np.float32)
+    if mono.ndim == 2:
+        mono = mono.mean(axis=1)
+    frame = max(1, int(fs * frame_ms / 1000))
+    n_frames = len(mono) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = mono[: n_frames * frame].reshape(n_frames, frame)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def find_silence_cuts(
+    samples: np.ndarray,
+    fs: int,
+    chunk_sec: float = 300,
+    search_sec: float = 20,
+    frame_ms: int = 50,
+) -> list[int]:
+    """
+    Retourne les positions de coupe (en échantillons) : toutes les `chunk_sec` secondes,
+    la trame la plus silencieuse dans une fenêtre de ±`search_sec` autour de la cible.
+    """
+    energy = frame_energy(samples, fs, frame_ms)
+    frame = max(1, int(fs * frame_ms / 1000))
+    total = len(samples)
+    cuts = []
+    target = chunk_sec * fs
+    while target < total - search_sec * fs:
+        lo = max(int((target - search_sec * fs) // frame), (cuts[-1] // frame + 1) if cuts else 0)
+        hi = min(int((target + search_sec * fs) // frame), len(energy))
+        if hi <= lo:
+            break
+        best = lo + int(np.argmin(energy[lo:hi]))
+        cut = best * frame + frame // 2
+        cuts.append(cut)
+        target = cut + chunk_sec * fs
+    return cuts
+
+
+def plan_chunks(total_samples: int, cuts: list[int], fs: int, overlap_sec: float = 2.0) -> list[tuple[int, int]]:
+    """Fenêtres (début, fin) couvrant tout l'audio ; chacune déborde de `overlap_sec` sur la suivante."""
+    overlap = int(overlap_sec * fs)
+    bounds = [0] + list(cuts) + [total_samples]
+    return [
+        (start, min(end + overlap, total_samples) if end < total_samples else end)
+        for start, end in zip(bounds[:-1], bounds[1:])
+        if end > start
+    ]
+
+
+# -------------------------
+# 🧵 Recollage des transcriptions
+# -------------------------
+def _word_key(word: str) -> str:
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+def stitch_transcripts(previous: str, current: str, max_overlap_words: int = 40, min_match: int = 2) -> str:
+    """
+    Retire du début de `current` les mots déjà présents à la fin de `previous`
+    (zone de chevauchement des fenêtres audio).
+    """
+    prev_words = previous.split()[-max_overlap_words:]
+    cur_words = current.split()
+    head = cur_words[:max_overlap_words]
+    if not prev_words or not head:
+        return current
+
+    a = [_word_key(w) for w in prev_words]
+    b = [_word_key(w) for w in head]
+    match = SequenceMatcher(None, a, b, autojunk=False).find_longest_match(0, len(a), 0, len(b))
+
+    # Le bloc commun doit terminer `previous` et ouvrir `current` (à 2 mots près)
+    ends_previous = len(a) - (match.a + match.size) <= 2
+    starts_current = match.b <= 2
+    if match.size >= min_match and ends_previous and starts_current:
+        return " ".join(cur_words[match.b + match.size:])
+    return current
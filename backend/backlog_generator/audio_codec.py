@@ -0,0 +1,229 @@
+"""
+audio_codec.py
+--------------
+Formats compressés pour l'archivage des sessions audio.
+
+- FLAC (sans perte) : via `soundfile` si installé, sinon via les outils `flac` / `ffmpeg`
+- Opus (voix, 16 kHz mono) : via `soundfile` (libsndfile ≥ 1.0.29), `opusenc` ou `ffmpeg` ;
+  à défaut, repli automatique sur FLAC
+- lecture de ces formats pour le prétraitement avant transcription
+
+Réencodage des anciennes sessions :
+    PYTHONPATH=backend python -m backlog_generator.audio_codec input/sessions --format flac [--keep-wav]
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import json
+import wave
+import shutil
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .audio_chunker import read_wav
+from .audio_preprocess import ASR_SAMPLE_RATE, resample
+from .logger_manager import info, warn
+
+try:  # dépendance optionnelle (libsndfile embarquée dans la wheel)
+    import soundfile as sf
+except (ImportError, OSError):
+    sf = None
+
+EXTENSIONS = {"wav": ".wav", "flac": ".flac", "opus": ".ogg"}
+BLOCK_FRAMES = 1 << 20
+
+
+def available_formats() -> list[str]:
+    """Formats d'archivage utilisables sur cette machine."""
+    formats = ["wav"]
+    if sf is not None or shutil.which("flac") or shutil.which("ffmpeg"):
+        formats.append("flac")
+    if _soundfile_supports_opus() or shutil.which("opusenc") or shutil.which("ffmpeg"):
+        formats.append("opus")
+    return formats
+
+
+def _soundfile_supports_opus() -> bool:
+    return sf is not None and "OPUS" in sf.available_subtypes("OGG")
+
+
+# -------------------------
+# 🗜️ Encodage
+# -------------------------
+def encode_audio(wav_path: str | Path, fmt: str = "flac", remove_source: bool = False) -> Path:
+    """
+    Encode un WAV PCM 16 bits au format demandé et retourne le chemin du fichier produit.
+    Opus se replie sur FLAC si aucun encodeur n'est disponible.
+    """
+    wav_path = Path(wav_path)
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"❌ Format audio inconnu : {fmt} (attendu : {', '.join(EXTENSIONS)})")
+    if fmt == "wav":
+        return wav_path
+
+    target = wav_path.with_suffix(EXTENSIONS[fmt])
+    if fmt == "opus":
+        try:
+            _encode_opus(wav_path, target)
+        except RuntimeError as e:
+            print(f"⚠️ {e} — repli sur FLAC")
+            warn("Encodeur Opus indisponible, repli FLAC", audio_file=str(wav_path))
+            return encode_audio(wav_path, "flac", remove_source)
+    else:
+        _encode_flac(wav_path, target)
+
+    ratio = target.stat().st_size / max(wav_path.stat().st_size, 1)
+    print(f"🗜️ {wav_path.name} → {target.name} ({ratio:.0%} de la taille d'origine)")
+    if remove_source:
+        wav_path.unlink()
+    return target
+
+
+def _encode_flac(wav_path: Path, target: Path):
+    if sf is not None:
+        with wave.open(str(wav_path), "rb") as wf, sf.SoundFile(
+            str(target), "w", samplerate=wf.getframerate(), channels=wf.getnchannels(),
+            format="FLAC", subtype="PCM_16",
+        ) as out:
+            while True:
+                raw = wf.readframes(BLOCK_FRAMES)
+                if not raw:
+                    break
+                out.write(np.frombuffer(raw, dtype="<i2").reshape(-1, wf.getnchannels()))
+        return
+    if shutil.which("flac"):
+        _run(["flac", "--silent", "--force", "-o", str(target), str(wav_path)])
+    elif shutil.which("ffmpeg"):
+        _run(["ffmpeg", "-y", "-loglevel", "error", "-i", str(wav_path), "-c:a", "flac", str(target)])
+    else:
+        raise RuntimeError("Aucun encodeur FLAC disponible (installer `soundfile` ou `flac`)")
+
+
+def _encode_opus(wav_path: Path, target: Path, bitrate_kbps: int = 24):
+    if _soundfile_supports_opus():
+        samples, fs = read_wav(wav_path)
+        mono = resample(samples.mean(axis=1, dtype=np.float32), fs, ASR_SAMPLE_RATE)
+        sf.write(str(target), np.clip(mono, -32768, 32767).astype(np.int16), ASR_SAMPLE_RATE, format="OGG", subtype="OPUS")
+    elif shutil.which("opusenc"):
+        _run(["opusenc", "--quiet", "--bitrate", str(bitrate_kbps), str(wav_path), str(target)])
+    elif shutil.which("ffmpeg"):
+        _run([
+            "ffmpeg", "-y", "-loglevel", "error", "-i", str(wav_path),
+            "-ac", "1", "-ar", str(ASR_SAMPLE_RATE), "-c:a", "libopus", "-b:a", f"{bitrate_kbps}k", str(target),
+        ])
+    else:
+        raise RuntimeError("Aucun encodeur Opus disponible")
+
+
+def _run(cmd: list[str], **kwargs) -> subprocess.CompletedProcess:
+    result = subprocess.run(cmd, capture_output=True, **kwargs)
+    if result.returncode != 0:
+        raise RuntimeError(f"Échec de {cmd[0]} : {result.stderr.decode(errors='ignore').strip()}")
+    return result
+
+
+# -------------------------
+# 🎧 Décodage
+# -------------------------
+def read_audio(file_path: str | Path) -> tuple[np.ndarray, int]:
+    """Lit un fichier WAV / FLAC / Ogg → (échantillons int16 (n, canaux), fréquence)."""
+    file_path = Path(file_path)
+    if file_path.suffix.lower() == ".wav":
+        return read_wav(str(file_path))
+    if sf is not None:
+        try:
+            samples, fs = sf.read(str(file_path), dtype="int16", always_2d=True)
+            return samples, fs
+        except RuntimeError:
+            pass  # format non géré par libsndfile : on tente ffmpeg
+    if shutil.which("ffmpeg"):
+        fs = ASR_SAMPLE_RATE
+        raw = _run([
+            "ffmpeg", "-loglevel", "error", "-i", str(file_path),
+            "-f", "s16le", "-ac", "1", "-ar", str(fs), "-",
+        ]).stdout
+        return np.frombuffer(raw, dtype="<i2").reshape(-1, 1), fs
+    raise RuntimeError(f"Aucun décodeur disponible pour {file_path.name}")
+
+
+# -------------------------
+# 🔁 Réencodage des anciennes sessions
+# -------------------------
+def _update_session_json(folder: Path, audio_name: str):
+    """Fait pointer `audio_file` de metadata.json / summary.json vers le fichier réencodé.
+
+    Écritures atomiques et indexées au catalogue, pour que /api/sessions ne serve
+    jamais le chemin du WAV supprimé.
+    """
+    # Imports locaux : session_processing importe audio_transcriber, qui importe ce module
+    from .session_processing import read_metadata, update_metadata
+    from .session_summary import save_summary
+
+    def retarget(data: dict) -> str:
+        current = data.get("audio_file")
+        return str(Path(current).with_name(audio_name)) if current else str(folder / audio_name)
+
+    if (folder / "metadata.json").exists():
+        update_metadata(folder, audio_file=retarget(read_metadata(folder)))
+    summary_path = folder / "summary.json"
+    if summary_path.exists():
+        with open(summary_path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        summary["audio_file"] = retarget(summary)
+        save_summary(folder, summary)
+
+
+def _session_status(folder: Path) -> str | None:
+    """Statut de metadata.json ; les anciennes sessions n'ont que le booléen `processed`."""
+    path = folder / "metadata.json"
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    return meta.get("status") or ("completed" if meta.get("processed") else None)
+
+
+def reencode_session(folder: Path, fmt: str = "flac", keep_wav: bool = False) -> Path | None:
+    """
+    Compresse l'audio.wav d'un dossier de session et met à jour ses fichiers JSON.
+    Seules les sessions analysées (statut "completed") sont réencodées : une session en cours
+    d'enregistrement, en file ou en échec relit encore son WAV, clé de ses points de reprise.
+    """
+    wav_path = folder / "audio.wav"
+    if not wav_path.exists():
+        return None
+    status = _session_status(folder)
+    if status != "completed":
+        warn("Session non terminée : réencodage ignoré", folder=str(folder), status=status, event="reencode_skipped")
+        return None
+    target = encode_audio(wav_path, fmt)
+    # Le WAV n'est supprimé qu'une fois l'archive écrite et référencée
+    _update_session_json(folder, target.name)
+    if not keep_wav and target != wav_path:
+        wav_path.unlink()
+    info("Session réencodée", folder=str(folder), audio_file=str(target), format=fmt)
+    return target
+
+
+def reencode_sessions(base_dir: str | Path, fmt: str = "flac", keep_wav: bool = False, max_workers: int = 2) -> list[Path]:
+    """Réencode en parallèle toutes les sessions encore stockées en WAV."""
+    folders = sorted(p for p in Path(base_dir).glob("session_*") if (p / "audio.wav").exists())
+    print(f"🔁 {len(folders)} session(s) à réencoder en {fmt}")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = list(pool.map(lambda folder: reencode_session(folder, fmt, keep_wav), folders))
+    return [r for r in results if r]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Réencode les sessions audio archivées.")
+    parser.add_argument("base_dir", nargs="?", default="input/sessions")
+    parser.add_argument("--format", default="flac", choices=sorted(EXTENSIONS))
+    parser.add_argument("--keep-wav", action="store_true")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    done = reencode_sessions(args.base_dir, args.format, args.keep_wav, args.workers)
+    print(f"✅ {len(done)} session(s) réencodée(s)")
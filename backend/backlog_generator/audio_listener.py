@@ -12,20 +12,25 @@ Auteur : Djamil
 import os
 import sys
 import json
+import time
 import signal
 import threading
 import datetime
 import numpy as np
 import sounddevice as sd
-import wavio
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 # Import du pipeline existant
-from backlog_generator.audio_transcriber import process_audio_feedback
-from backlog_generator.session_summary import generate_session_summary, print_session_summary
+from backlog_generator.session_processing import process_session, enqueue_session
+from backlog_generator.job_queue import JobQueue
+from backlog_generator.session_catalog import catalog_metadata
 from backlog_generator.logger_manager import info, warn, error
+from backlog_generator.live_pipeline import LiveSessionPipeline
+from backlog_generator.audio_buffer import PCMBuffer, BlockQueue
+from backlog_generator.wav_writer import StreamingWavWriter
+from backlog_generator.audio_codec import encode_audio
 
 
 # ============================================================
@@ -50,6 +55,9 @@ class AudioSession:
     folder_path: Path | None = None
     audio_file: Path | None = None
     processed: bool = False
+    status: str = "recorded"          # recorded → queued → processing → completed / failed
+    job_id: int | None = None
+    capture_stats: dict = field(default_factory=dict)
 
     def create_session_folder(self, base_dir: Path):
         """Crée un dossier dédié à la session."""
@@ -68,7 +76,9 @@ class AudioSession:
             "audio_file": str(self.audio_file) if self.audio_file else None,
             "folder_path": str(self.folder_path) if self.folder_path else None,
             "processed": self.processed,
-            "status": "completed" if self.processed else "recorded"
+            "status": "completed" if self.processed else self.status,
+            "job_id": self.job_id,
+            "capture": self.capture_stats,
         }
 
     def save_metadata(self):
@@ -79,6 +89,7 @@ class AudioSession:
         meta_path = self.folder_path / "metadata.json"
         with open(meta_path, "w", encoding="utf-8") as f:
             json.dump(self.to_json(), f, ensure_ascii=False, indent=4)
+        catalog_metadata(self.folder_path, self.to_json())
         print(f"🧾 Métadonnées sauvegardées : {meta_path}")
 
 
@@ -88,25 +99,116 @@ class AudioSession:
 class AudioListener:
     """Gère le démarrage, l’arrêt et le traitement post-session."""
 
-    def __init__(self, output_dir: str = "input/sessions"):
+    def __init__(
+        self,
+        output_dir: str = "input/sessions",
+        live: bool = False,
+        live_window_sec: float = 60,
+        live_overlap_sec: float = 2,
+        stream_to_disk: bool = False,
+        capture_mode: str = "callback",
+        audio_format: str = "wav",
+        job_queue: JobQueue | None = None,
+    ):
+        """
+        `live=True` active l'analyse incrémentale pendant la réunion : toutes les
+        `live_window_sec` secondes, la fenêtre audio écoulée est transmise au pipeline live.
+        `stream_to_disk=True` écrit l'audio dans audio.wav au fil de l'eau (RAM constante,
+        fichier récupérable après crash via `python -m backlog_generator.wav_writer`).
+        `capture_mode="callback"` (défaut) capture via le callback PortAudio et une file SPSC ;
+        `"blocking"` conserve l'ancienne boucle `stream.read`.
+        `audio_format` : format d'archivage de la session ("wav", "flac" ou "opus").
+        `job_queue` : si fournie, la session terminée est mise en file et analysée par les
+        workers (`python -m backlog_generator.job_queue worker`) au lieu de bloquer le listener.
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.current_session: AudioSession | None = None
         self.fs = 44100
         self.channels = 1
         self.recording = False
-        self.frames = []
+        self.stream_to_disk = stream_to_disk
+        self.capture_mode = capture_mode
+        self.audio_format = audio_format
+        self.job_queue = job_queue
+        self.block_frames = 1024
+        self._queue: BlockQueue | None = None
+        self.capture_stats = {"input_overflows": 0, "input_underflows": 0}
+        self.buffer: PCMBuffer | StreamingWavWriter = PCMBuffer(channels=self.channels, block_frames=self.fs * 60)
         self._thread: threading.Thread | None = None
+        self.live = live
+        self.live_window_sec = live_window_sec
+        self.live_overlap_sec = live_overlap_sec
+        self._live_pipeline: LiveSessionPipeline | None = None
+        self._live_cursor = 0          # premier échantillon non encore transmis au pipeline live
         print(f"📁 Répertoire d’enregistrement configuré : {self.output_dir}")
 
     # ------------------------------------------------------------
     def _record_audio(self):
         """Thread d’enregistrement continu du micro."""
         print("🎧 Micro prêt — enregistrement en cours...")
+        if self.capture_mode == "callback":
+            self._record_audio_callback()
+            return
         with sd.InputStream(samplerate=self.fs, channels=self.channels, dtype="int16") as stream:
             while self.recording:
-                data, _ = stream.read(1024)
-                self.frames.append(data.copy())
+                data, overflowed = stream.read(self.block_frames)
+                if overflowed:
+                    self.capture_stats["input_overflows"] += 1
+                self._store_block(data)
+
+    def _record_audio_callback(self):
+        """Capture par callback PortAudio : le callback remplit la file, ce thread l'écrit dans le tampon."""
+        self._queue = BlockQueue(capacity=512, block_frames=self.block_frames, channels=self.channels)
+        with sd.InputStream(
+            samplerate=self.fs,
+            channels=self.channels,
+            dtype="int16",
+            blocksize=self.block_frames,
+            callback=self._audio_callback,
+        ):
+            while self.recording:
+                if not self._queue.drain(self._store_block):
+                    time.sleep(0.01)
+        self._queue.drain(self._store_block)  # blocs reçus avant la fermeture du flux
+
+    def _audio_callback(self, indata, frames, time_info, status):
+        """Callback temps réel PortAudio : aucune allocation, aucun verrou."""
+        if status.input_overflow:
+            self.capture_stats["input_overflows"] += 1
+        if status.input_underflow:
+            self.capture_stats["input_underflows"] += 1
+        self._queue.push(indata)
+
+    def _store_block(self, data: np.ndarray):
+        """Écrit un bloc capturé et transmet une fenêtre au pipeline live si nécessaire."""
+        self.buffer.write(data)
+        if self._live_pipeline is not None and len(self.buffer) - self._live_cursor >= self.live_window_sec * self.fs:
+            self._live_pipeline.submit_window(self._take_live_window())
+
+    def _collect_capture_stats(self) -> dict:
+        """Compteurs de pertes audio pour metadata.json (preuve qu'aucun bloc n'a été perdu)."""
+        stats = {
+            "mode": self.capture_mode,
+            "frames": len(self.buffer),
+            **self.capture_stats,
+        }
+        if self._queue is not None:
+            stats.update(
+                queue_overflows=self._queue.overflows,
+                dropped_frames=self._queue.dropped_frames,
+                max_queue_depth=self._queue.max_depth,
+            )
+        return stats
+
+    def _take_live_window(self) -> np.ndarray | None:
+        """Fenêtre audio depuis la dernière transmission (+ chevauchement avec la précédente)."""
+        end = len(self.buffer)
+        if end <= self._live_cursor:
+            return None
+        start = max(self._live_cursor - int(self.live_overlap_sec * self.fs), 0)
+        self._live_cursor = end
+        return self.buffer.read(start, end)
 
     # ------------------------------------------------------------
     def start_listening(self):
@@ -122,7 +224,16 @@ class AudioListener:
         self.current_session.audio_file = folder / "audio.wav"
 
         # Démarre l’enregistrement
-        self.frames = []
+        if self.stream_to_disk:
+            self.buffer = StreamingWavWriter(self.current_session.audio_file, self.fs, self.channels)
+        else:
+            self.buffer = PCMBuffer(channels=self.channels, block_frames=self.fs * 60)
+        self._live_cursor = 0
+        if self.live:
+            self._live_pipeline = LiveSessionPipeline(fs=self.fs, session_id=session_id)
+            self._live_pipeline.start()
+        self.capture_stats = {"input_overflows": 0, "input_underflows": 0}
+        self._queue = None
         self.recording = True
         self._thread = threading.Thread(target=self._record_audio)
         self._thread.start()
@@ -150,60 +261,75 @@ class AudioListener:
             (self.current_session.ended_at - self.current_session.started_at).total_seconds()
         )
 
-        if not self.frames:
+        if isinstance(self.buffer, StreamingWavWriter):
+            self.buffer.close()
+
+        self.current_session.capture_stats = self._collect_capture_stats()
+        if self.current_session.capture_stats.get("dropped_frames") or self.capture_stats["input_overflows"]:
+            warn("Pertes audio pendant la capture", session_id=self.current_session.session_id, **self.current_session.capture_stats)
+
+        if not len(self.buffer):
             print("⚠️ Aucun son capté — fichier non créé.")
             return
 
         print(f"💾 Sauvegarde du fichier audio : {self.current_session.audio_file}")
         info("Fichier audio sauvegardé", session_id=self.current_session.session_id, audio_file=str(self.current_session.audio_file))
         try:
-            full_audio = np.concatenate(self.frames, axis=0)
-            wavio.write(str(self.current_session.audio_file), full_audio, self.fs, sampwidth=2)
+            if isinstance(self.buffer, PCMBuffer):
+                self.buffer.write_wav(str(self.current_session.audio_file), self.fs)
         except Exception as e:
             print(f"❌ Erreur lors de la sauvegarde du fichier audio : {e}")
             error("Erreur dans audio_listener", session_id=self.current_session.session_id, details=str(e))
             return
 
+        if self.audio_format != "wav":
+            try:
+                self.current_session.audio_file = encode_audio(
+                    self.current_session.audio_file, self.audio_format, remove_source=True
+                )
+            except Exception as e:
+                # Le WAV est intact : la session reste analysable, seule la compression est perdue
+                print(f"⚠️ Compression {self.audio_format} impossible ({e}) — WAV conservé")
+                warn("Compression audio impossible, WAV conservé", session_id=self.current_session.session_id,
+                     audio_format=self.audio_format, details=str(e), event="audio_encode_failed")
+
         # Sauvegarde des métadonnées
         self.current_session.save_metadata()
 
         # =====================================================
         # 🚀 Lancement du pipeline d’analyse post-session
         # =====================================================
-        info("Lancement du pipeline d’analyse post-session", session_id=self.current_session.session_id)
-        print("🚀 Lancement du pipeline d’analyse post-session...")
-        try:
-            user_stories = process_audio_feedback(str(self.current_session.audio_file))
-            self.current_session.processed = True
-            self.current_session.save_metadata()
-            info("Pipeline terminé avec succès", session_id=self.current_session.session_id, processed=True)
-            print("✅ Session terminée et analysée.")
-        except Exception as e:
-            print(f"❌ Erreur pendant le pipeline : {e}")
-            error("Erreur dans audio_listener", session_id=self.current_session.session_id, details=str(e))
-            user_stories, quality = [], {"global_score": 0.0}
+        folder = self.current_session.folder_path
+        if self._live_pipeline is not None:
+            # Mode live : seules la dernière fenêtre et la consolidation restent à faire
+            live, window = self._live_pipeline, self._take_live_window()
+            self._live_pipeline = None
+            analyze = lambda report: live.finish(window, report=report)
+        elif self.job_queue is not None:
+            self.current_session.job_id = enqueue_session(self.job_queue, folder)
+            self.current_session.status = "queued"
+            print(f"📥 Session mise en file d'analyse (job {self.current_session.job_id}).")
+            return
         else:
-            quality = {"global_score": 0.85}  # Valeur temporaire si non renvoyée
+            analyze = None
 
-        # =====================================================
-        # 📊 Génération du résumé de session
-        # =====================================================
         try:
-            summary = generate_session_summary(
-                metadata_path=self.current_session.folder_path / "metadata.json",
-                user_stories=user_stories if user_stories else [],
-                quality=quality if quality else {}
-            )
-            print_session_summary(summary)
-        except Exception as e:
-            print(f"⚠️ Erreur lors de la génération du résumé : {e}")
-            error("Erreur dans audio_listener", session_id=self.current_session.session_id, details=str(e))
+            process_session(folder, analyze=analyze)
+            self.current_session.processed = True
+        except Exception:
+            self.current_session.status = "failed"  # déjà journalisé par process_session
 
 # ============================================================
 # 🧪 Test interactif avec gestion d'interruption
 # ============================================================
 if __name__ == "__main__":
-    listener = AudioListener()
+    listener = AudioListener(
+        live="--live" in sys.argv,
+        stream_to_disk="--stream" in sys.argv,
+        capture_mode="blocking" if "--blocking" in sys.argv else "callback",
+        audio_format=next((a.split("=", 1)[1] for a in sys.argv if a.startswith("--format=")), "wav"),
+        job_queue=JobQueue() if "--queue" in sys.argv else None,
+    )
 
     def handle_interrupt(sig, frame):
         print("\n⚠️ Interruption détectée — arrêt sécurisé en cours...")
@@ -0,0 +1,167 @@
+"""
+audio_preprocess.py
+-------------------
+Préparation de l'audio avant l'envoi au modèle de transcription :
+- détection d'activité vocale (VAD) vectorisée : énergie + taux de passage par zéro
+- suppression des silences et pauses, avec une table de correspondance des temps
+  (position dans l'audio réduit → position dans l'enregistrement d'origine)
+- conversion en 16 kHz mono, la fréquence réellement utilisée par Whisper
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+ASR_SAMPLE_RATE = 16000
+
+
+@dataclass
+class PreparedAudio:
+    """Audio prêt pour l'ASR + statistiques de réduction."""
+    samples: np.ndarray                 # int16 mono à `fs` (ASR_SAMPLE_RATE au plus)
+    fs: int
+    original_duration_sec: float
+    original_bytes: int
+    offset_map: list[tuple[float, float, float]] = field(default_factory=list)  # (début réduit, début origine, durée)
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.samples) / self.fs
+
+    @property
+    def prepared_bytes(self) -> int:
+        return self.samples.nbytes
+
+    def stats(self) -> dict:
+        """Statistiques reportées dans le résumé de session."""
+        ratio = 1 - self.prepared_bytes / self.original_bytes if self.original_bytes else 0.0
+        return {
+            "original_duration_sec": round(self.original_duration_sec, 1),
+            "speech_duration_sec": round(self.duration_sec, 1),
+            "original_bytes": self.original_bytes,
+            "uploaded_bytes": self.prepared_bytes,
+            "bytes_saved_ratio": round(ratio, 3),
+            "speech_spans": len(self.offset_map),
+        }
+
+    def to_original_time(self, t: float) -> float:
+        """Convertit un temps de l'audio réduit (ex. horodatage Whisper) en temps de l'enregistrement."""
+        for reduced_start, original_start, duration in reversed(self.offset_map):
+            if t >= reduced_start:
+                return original_start + min(t - reduced_start, duration)
+        return t
+
+
+# -------------------------
+# 🗣️ Détection d'activité vocale
+# -------------------------
+def _to_mono(samples: np.ndarray) -> np.ndarray:
+    samples = np.asarray(samples)
+    if samples.ndim == 2:
+        return samples.mean(axis=1, dtype=np.float32)
+    return samples.astype(np.float32)
+
+
+def detect_speech(
+    samples: np.ndarray,
+    fs: int,
+    frame_ms: int = 30,
+    threshold_ratio: float = 3.0,
+    min_level: float = 150.0,
+    max_level: float = 800.0,
+    pad_ms: int = 300,
+    min_silence_ms: int = 800,
+) -> np.ndarray:
+    """
+    Masque booléen par trame (True = parole).
+    Une trame est parlée si son énergie dépasse `threshold_ratio` × bruit de fond
+    (seuil borné entre `min_level` et `max_level`, pour les extraits sans aucun silence), ou si elle est moyennement énergétique avec un taux de passage par zéro typique de la voix.
+    Les bords sont élargis de `pad_ms` et les pauses plus courtes que `min_silence_ms` conservées.
+    """
+    mono = _to_mono(samples)
+    frame = max(1, int(fs * frame_ms / 1000))
+    n_frames = len(mono) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool)
+    frames = mono[: n_frames * frame].reshape(n_frames, frame)
+
+    energy = np.sqrt(np.mean(frames ** 2, axis=1))
+    zcr = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+    noise_floor = np.percentile(energy, 10)
+    threshold = min(max(noise_floor * threshold_ratio, min_level), max_level)
+
+    speech = (energy > threshold) | ((energy > threshold / 2) & (zcr > 0.02) & (zcr < 0.35))
+
+    # Élargissement des zones de parole (attaques / fins de mots)
+    pad = max(1, pad_ms // frame_ms)
+    speech = np.convolve(speech.astype(np.int32), np.ones(2 * pad + 1, dtype=np.int32), mode="same") > 0
+
+    # Les pauses courtes (respiration, hésitation) restent dans la parole
+    min_gap = max(1, min_silence_ms // frame_ms)
+    edges = np.flatnonzero(np.diff(np.concatenate([[1], speech.astype(np.int8), [1]])))
+    for start, end in zip(edges[::2], edges[1::2]):
+        if end - start < min_gap and start > 0 and end < n_frames:
+            speech[start:end] = True
+    return speech
+
+
+def speech_spans(mask: np.ndarray, frame: int) -> list[tuple[int, int]]:
+    """Convertit le masque par trame en intervalles (début, fin) en échantillons."""
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], mask.astype(np.int8), [0]])))
+    return [(int(s) * frame, int(e) * frame) for s, e in zip(edges[::2], edges[1::2])]
+
+
+# -------------------------
+# 🔉 Rééchantillonnage
+# -------------------------
+def resample(mono: np.ndarray, fs_in: int, fs_out: int = ASR_SAMPLE_RATE, taps: int = 63) -> np.ndarray:
+    """Filtre passe-bas (sinc fenêtré) puis interpolation linéaire vers `fs_out`."""
+    if fs_in == fs_out or len(mono) == 0:
+        return mono.astype(np.float32)
+    if fs_out < fs_in:
+        cutoff = 0.45 * fs_out / fs_in
+        n = np.arange(taps) - (taps - 1) / 2
+        kernel = (2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)).astype(np.float32)
+        mono = np.convolve(mono, kernel / kernel.sum(), mode="same")
+    n_out = int(round(len(mono) * fs_out / fs_in))
+    positions = np.arange(n_out, dtype=np.float64) * (fs_in / fs_out)
+    return np.interp(positions, np.arange(len(mono)), mono).astype(np.float32)
+
+
+# -------------------------
+# 🚀 Préparation complète
+# -------------------------
+def prepare_for_asr(samples: np.ndarray, fs: int, gap_ms: int = 200, frame_ms: int = 30) -> PreparedAudio:
+    """
+    Supprime les silences puis convertit en 16 kHz mono int16 (sans suréchantillonner
+    un enregistrement de fréquence plus basse). Un court blanc (`gap_ms`) est gardé entre deux zones de parole pour ne pas coller les phrases.
+    """
+    samples = np.asarray(samples)
+    original_bytes = samples.nbytes
+    original_duration = len(samples) / fs
+    out_fs = min(fs, ASR_SAMPLE_RATE)
+    frame = max(1, int(fs * frame_ms / 1000))
+    spans = speech_spans(detect_speech(samples, fs, frame_ms=frame_ms), frame)
+
+    gap = np.zeros(int(out_fs * gap_ms / 1000), dtype=np.float32)
+    pieces, offset_map, cursor = [], [], 0.0
+    for start, end in spans:
+        piece = resample(_to_mono(samples[start:end]), fs, out_fs)
+        if pieces:
+            pieces.append(gap)
+            cursor += len(gap) / out_fs
+        offset_map.append((round(cursor, 3), round(start / fs, 3), round((end - start) / fs, 3)))
+        pieces.append(piece)
+        cursor += len(piece) / out_fs
+
+    out = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+    out = np.clip(np.round(out), -32768, 32767).astype(np.int16)
+    return PreparedAudio(
+        samples=out,
+        fs=out_fs,
+        original_duration_sec=original_duration,
+        original_bytes=original_bytes,
+        offset_map=offset_map,
+    )
@@ -11,15 +11,24 @@ Auteur : Djamil
 """
 
 import os
-import re
 import json
 from pathlib import Path
-from difflib import SequenceMatcher
+from typing import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from groq import Groq
+from .llm_client import chat_completion, transcribe_file, transcribe_bytes, cache_stats, client_stats
+from .audio_chunker import encode_wav_bytes, find_silence_cuts, plan_chunks, stitch_transcripts
+from .audio_preprocess import prepare_for_asr
+from .audio_codec import read_audio
 from .consolidator import consolidate_user_stories
-from .generator import generate_user_story, generate_short_title
+from .checkpoints import CheckpointStore, file_fingerprint, fingerprint
+from .embeddings import VectorStore
+from .semantic_segmenter import segment_conversation_local
+from .similarity import dedupe_indices
+from .generator import GENERATION_BATCH_SIZE, generate_user_stories_batch
 from .jira_client import export_user_stories_to_jira
+from .jira_ledger import SyncLedger
+from .backlog_store import record_stories
 
 
 # -------------------------
@@ -27,46 +36,158 @@ from .jira_client import export_user_stories_to_jira
 # -------------------------
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+
+# Nombre d'appels LLM menés en parallèle (segments + idées)
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "4"))
+
+# Au-delà de cette taille, l'audio est transcrit par fenêtres (limite d'upload du fournisseur : 25 Mo)
+CHUNKED_TRANSCRIPTION_MIN_BYTES = int(os.getenv("CHUNKED_TRANSCRIPTION_MIN_MB", "20")) * 1024 * 1024
+
+# Taille maximale d'une fenêtre envoyée (WAV int16) : la durée des fenêtres en découle
+TRANSCRIPTION_CHUNK_MAX_BYTES = int(float(os.getenv("TRANSCRIPTION_CHUNK_MAX_MB", "24")) * 1_000_000)
+
+# Segmentation : "llm" (un appel au modèle) ou "local" (clustering d'embeddings, hors ligne)
+SEGMENTER = os.getenv("SEGMENTER", "llm")
+
+# Cosinus minimal pour fusionner deux US reformulées (désactivé si vide ; ~0.3 avec les embeddings hachés)
+SEMANTIC_MERGE_THRESHOLD = float(os.environ["SEMANTIC_MERGE_THRESHOLD"]) if os.getenv("SEMANTIC_MERGE_THRESHOLD") else None
+
+# Version de chaque étape reprenable : à incrémenter quand son prompt ou sa logique change
+# (les artefacts des étapes suivantes sont alors recalculés, pas ceux des précédentes)
+STAGE_VERSIONS = {"transcript": 1, "segments": 1, "ideas": 1, "stories": 1}
 
 # -------------------------
 # 🧰 Nettoyage / déduplication
 # -------------------------
-def _normalize(txt: str) -> str:
-    return re.sub(r"\s+", " ", txt.strip().lower())
-
-def _similar(a: str, b: str) -> float:
-    return SequenceMatcher(None, _normalize(a), _normalize(b)).ratio()
-
 def dedupe_keep_order(items: list[str], threshold: float = 0.88) -> list[str]:
     """Supprime les doublons tout en gardant l’ordre logique."""
-    out = []
-    for it in items:
-        if not it or len(it.strip()) < 5:
-            continue
-        if not any(_similar(it, x) >= threshold for x in out):
-            out.append(it.strip())
-    return out
+    items = [it.strip() for it in items if it and len(it.strip()) >= 5]
+    return [items[i] for i in dedupe_indices(items, threshold)]
 
 
 # -------------------------
 # 🎧 Transcription Audio → Texte
 # -------------------------
-def transcribe_audio(file_path: str) -> str:
+def transcribe_audio(
+    file_path: str,
+    chunked: bool | None = None,
+    preprocess: bool = True,
+    report: dict | None = None,
+) -> str:
+    """
+    Transcrit un fichier audio.
+    - `preprocess=True` : les silences sont retirés et l'audio converti en 16 kHz mono avant l'envoi
+      (statistiques dans `report["audio"]` si un dictionnaire est fourni)
+    - `chunked=None` : le mode par fenêtres s'active automatiquement pour les gros volumes
+    Accepte WAV, FLAC et Ogg/Opus ; sans décodeur local, le fichier compressé est envoyé tel quel.
+    """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"❌ Fichier introuvable : {file_path}")
 
-    with open(file_path, "rb") as audio_file:
-        response = client.audio.transcriptions.create(
-            model="whisper-large-v3-turbo",
-            file=audio_file
-        )
-
-    text = response.text.strip()
+    samples = None
+    if preprocess or chunked:
+        try:
+            samples, fs = _load_for_asr(file_path, preprocess, report)
+        except RuntimeError as e:
+            print(f"⚠️ Lecture locale impossible ({e}) — envoi du fichier tel quel")
+
+    if samples is None:
+        text = transcribe_file(file_path).strip()
+        print(f"🎙️ Transcription terminée : {len(text.split())} mots détectés")
+        return text
+
+    if chunked is None:
+        chunked = samples.nbytes > CHUNKED_TRANSCRIPTION_MIN_BYTES
+
+    if not len(samples):
+        text = ""
+    elif chunked:
+        text = " ".join(part for part in transcribe_samples_stream(samples, fs) if part).strip()
+    else:
+        text = transcribe_bytes(encode_wav_bytes(samples, fs), Path(file_path).with_suffix(".wav").name).strip()
     print(f"🎙️ Transcription terminée : {len(text.split())} mots détectés")
     return text
 
 
+def _load_for_asr(file_path: str, preprocess: bool, report: dict | None = None):
+    """Lit l'audio et, si demandé, retire les silences (VAD) + conversion 16 kHz mono."""
+    samples, fs = read_audio(file_path)
+    if not preprocess:
+        return samples, fs
+
+    prepared = prepare_for_asr(samples, fs)
+    stats = prepared.stats()
+    print(
+        f"🔇 Silences retirés : {stats['original_duration_sec']} s → {stats['speech_duration_sec']} s "
+        f"({stats['bytes_saved_ratio']:.0%} d'octets en moins à l'envoi)"
+    )
+    if report is not None:
+        report["audio"] = {**stats, "offset_map": prepared.offset_map}
+    return prepared.samples, prepared.fs
+
+
+def chunk_seconds_for(fs: int, channels: int = 1, overlap_sec: float = 2.0,
+                      max_bytes: int | None = None) -> float:
+    """
+    Durée cible des fenêtres pour qu'aucun WAV envoyé ne dépasse `max_bytes`
+    (défaut : TRANSCRIPTION_CHUNK_MAX_BYTES). Une fenêtre peut durer jusqu'à
+    chunk_sec + search_sec (coupe cherchée après la cible, search_sec = min(20, chunk_sec / 4))
+    + overlap_sec : c'est cette durée maximale qui doit tenir dans le budget.
+    """
+    budget = (max_bytes or TRANSCRIPTION_CHUNK_MAX_BYTES) - 44  # en-tête WAV
+    seconds = budget / (fs * channels * 2) - overlap_sec
+    if seconds <= 0:
+        raise ValueError(f"❌ Budget de {budget} octets insuffisant à {fs} Hz × {channels} canal(aux)")
+    return max(seconds - 20, seconds / 1.25)
+
+
+def transcribe_audio_stream(
+    file_path: str,
+    chunk_sec: float | None = None,
+    overlap_sec: float = 2.0,
+    max_workers: int | None = None,
+    preprocess: bool = True,
+) -> Iterator[str]:
+    """Transcription par fenêtres d'un fichier audio (voir `transcribe_samples_stream`)."""
+    samples, fs = _load_for_asr(file_path, preprocess)
+    yield from transcribe_samples_stream(samples, fs, chunk_sec, overlap_sec, max_workers)
+
+
+def transcribe_samples_stream(
+    samples,
+    fs: int,
+    chunk_sec: float | None = None,
+    overlap_sec: float = 2.0,
+    max_workers: int | None = None,
+) -> Iterator[str]:
+    """
+    Transcription par fenêtres pour les longs enregistrements.
+    L'audio est coupé sur les silences en fenêtres qui se chevauchent, transcrites en parallèle ;
+    le texte est produit dans l'ordre, fenêtre par fenêtre, dès que chacune est prête,
+    sans les mots dupliqués par le chevauchement.
+    `chunk_sec` est plafonné par `chunk_seconds_for` (budget d'octets par fenêtre) : c'est sa
+    valeur par défaut.
+    """
+    channels = samples.shape[1] if samples.ndim > 1 else 1
+    max_chunk_sec = chunk_seconds_for(fs, channels, overlap_sec)
+    chunk_sec = max_chunk_sec if chunk_sec is None else min(chunk_sec, max_chunk_sec)
+    cuts = find_silence_cuts(samples, fs, chunk_sec=chunk_sec, search_sec=min(20, chunk_sec / 4))
+    chunks = plan_chunks(len(samples), cuts, fs, overlap_sec=overlap_sec)
+    print(f"✂️ Transcription découpée en {len(chunks)} fenêtre(s)")
+
+    def _transcribe_chunk(idx: int, start: int, end: int) -> str:
+        return transcribe_bytes(encode_wav_bytes(samples[start:end], fs), f"chunk_{idx:04d}.wav").strip()
+
+    workers = max(1, max_workers or PIPELINE_MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_transcribe_chunk, i, start, end) for i, (start, end) in enumerate(chunks)]
+        previous = ""
+        for future in futures:
+            text = stitch_transcripts(previous, future.result())
+            previous = f"{previous} {text}"[-2000:]
+            yield text
+
+
 # -------------------------
 # 🧩 Segmentation de la conversation
 # -------------------------
@@ -90,15 +211,13 @@ Texte :
 \"\"\"{transcribed_text}\"\"\"
 """
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        raw = chat_completion(
             messages=[
                 {"role": "system", "content": "Réponds uniquement en JSON valide, sans texte hors JSON."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.25,
-        )
-        raw = response.choices[0].message.content.strip()
+        ).strip()
         data = json.loads(raw)
         return [
             {"theme": s["theme"].strip(), "content": s["content"].strip()}
@@ -110,6 +229,16 @@ Texte :
         return [{"theme": "Discussion générale", "content": transcribed_text}]
 
 
+def segment_transcript(text: str, segmenter: str | None = None, store: VectorStore | None = None) -> list[dict]:
+    """Segmentation thématique selon `segmenter` ("llm" ou "local", défaut : SEGMENTER)."""
+    segmenter = segmenter or SEGMENTER
+    if segmenter == "local":
+        return segment_conversation_local(text, store=store)
+    if segmenter == "llm":
+        return segment_conversation_llm(text)
+    raise ValueError(f"❌ Segmenteur inconnu : {segmenter} (attendu : llm, local)")
+
+
 # -------------------------
 # 🧠 Détection du contenu produit
 # -------------------------
@@ -126,12 +255,11 @@ Sinon, réponds "non".
 Texte :
 \"\"\"{segment_text}\"\"\"
 """
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
+    answer = chat_completion(
         messages=[{"role": "user", "content": prompt}],
         temperature=0,
     )
-    return "oui" in response.choices[0].message.content.lower()
+    return "oui" in answer.lower()
 
 
 # -------------------------
@@ -165,15 +293,14 @@ Segment :
 \"\"\"{segment_text}\"\"\"
 """
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        raw = chat_completion(
             messages=[
                 {"role": "system", "content": "Tu es un Product Manager expérimenté. Réponds UNIQUEMENT en JSON valide."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
         )
-        data = json.loads(response.choices[0].message.content.strip())
+        data = json.loads(raw.strip())
         return [
             i for i in data.get("ideas", [])
             if i.get("idea") and i.get("confidence", 0) >= 0.5
@@ -181,6 +308,85 @@ Segment :
     except Exception:
         return []
 
+# -------------------------
+# ⚡ Analyse concurrente des segments
+# -------------------------
+def _analyze_segment(segment: dict) -> tuple[bool, list[dict]]:
+    """Classifie un segment puis, s'il parle produit, en extrait les idées."""
+    if not is_segment_about_product(segment["content"]):
+        return False, []
+    return True, extract_ideas_from_segment(segment["content"])
+
+
+def _build_user_story(segment: dict, idea: dict, story: dict) -> dict:
+    """User Story enrichie (thème, idée, titre court, confiance) d'une idée."""
+    story = dict(story)
+    short_title = story.pop("title")
+    return {
+        "theme": segment["theme"],
+        "idea": idea["idea"],
+        "title": short_title,
+        "why": idea.get("why", ""),
+        "confidence": idea.get("confidence", 0),
+        **story
+    }
+
+
+def select_ideas(segments: list[dict], max_workers: int | None = None) -> list[tuple[dict, dict]]:
+    """
+    Classifie les segments et en extrait les idées, en parallèle (pool de threads borné).
+    Retourne les couples (segment, idée) retenus (2 idées max. par segment), dans l'ordre des segments.
+    """
+    workers = max(1, max_workers or PIPELINE_MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        analyses = [pool.submit(_analyze_segment, seg) for seg in segments]
+        selected = []
+
+        for idx, (seg, analysis) in enumerate(zip(segments, analyses), 1):
+            print(f"🎯 Segment {idx}/{len(segments)} — Thème : {seg['theme']}")
+            is_product, ideas = analysis.result()
+            if not is_product:
+                print("🗨️ Segment conversationnel ignoré.\n")
+                continue
+            if not ideas:
+                print("⚠️ Aucun besoin détecté dans ce segment.\n")
+                continue
+
+            print(f"💡 {len(ideas)} idée(s) pertinentes détectées :")
+            for idea in ideas[:2]:  # max 2 idées/segment pour éviter le spam
+                print(f"   → {idea['title']} ({idea['confidence']:.2f})")
+                selected.append((seg, idea))
+    return selected
+
+
+def write_user_stories(selected: list[tuple[dict, dict]], max_workers: int | None = None) -> list[dict]:
+    """Rédige les User Stories des idées retenues, par lots (une requête pour plusieurs idées, lots parallèles)."""
+    workers = max(1, max_workers or PIPELINE_MAX_WORKERS)
+    # Lots assez petits pour occuper tous les workers, jamais plus grands que GENERATION_BATCH_SIZE
+    size = max(1, min(GENERATION_BATCH_SIZE, -(-len(selected) // workers)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        batches = [
+            pool.submit(generate_user_stories_batch, [idea["idea"] for _, idea in selected[i:i + size]])
+            for i in range(0, len(selected), size)
+        ]
+        stories = [story for batch in batches for story in batch.result()]
+
+    user_stories = [_build_user_story(seg, idea, story) for (seg, idea), story in zip(selected, stories)]
+    for us in user_stories:
+        print(f"✅ {us['title']} → {us['user_story']}\n")
+    return user_stories
+
+
+def analyze_segments(segments: list[dict], max_workers: int | None = None) -> list[dict]:
+    """
+    Transforme les segments en User Stories enrichies.
+    Les segments sont analysés en parallèle (pool de threads borné), puis les idées retenues
+    sont rédigées par lots (une requête pour plusieurs idées, lots eux aussi parallèles).
+    Le résultat conserve exactement l'ordre d'une exécution séquentielle.
+    """
+    return write_user_stories(select_ideas(segments, max_workers), max_workers)
+
+
 # -------------------------
 # 📊 Scoring de la qualité globale
 # -------------------------
@@ -221,80 +427,163 @@ def compute_us_quality_score(user_stories: list[dict]) -> dict:
 
 
 # -------------------------
-# 🚀 Pipeline complet : audio → US
+# 🔁 Consolidation + export + qualité
 # -------------------------
-def process_audio_feedback(file_path: str, push_to_jira: bool = False):
-    """Pipeline principal complet"""
-    # Étape 1 : transcription
-    text = transcribe_audio(file_path)
-    print("\n🧠 Texte transcrit :")
-    print(text[:400] + ("..." if len(text) > 400 else ""))
-
-    # Étape 2 : segmentation
-    print("\n🧩 Segmentation de la conversation...")
-    segments = segment_conversation_llm(text)
-    print(f"✅ {len(segments)} segment(s) détecté(s).\n")
-
-    user_stories = []
-
-    # Étape 3 : boucle segment → idées
-    for idx, seg in enumerate(segments, 1):
-        print(f"🎯 Segment {idx}/{len(segments)} — Thème : {seg['theme']}")
-        if not is_segment_about_product(seg["content"]):
-            print("🗨️ Segment conversationnel ignoré.\n")
-            continue
-
-        ideas = extract_ideas_from_segment(seg["content"])
-        if not ideas:
-            print("⚠️ Aucun besoin détecté dans ce segment.\n")
-            continue
-
-        print(f"💡 {len(ideas)} idée(s) pertinentes détectées :")
-        for idea in ideas[:2]:  # max 2 idées/segment pour éviter le spam
-            print(f"   → {idea['title']} ({idea['confidence']:.2f})")
-
-            story = generate_user_story(idea["idea"])
-            short_title = generate_short_title(story["user_story"])
-
-            enriched = {
-                "theme": seg["theme"],
-                "idea": idea["idea"],
-                "title": short_title,
-                "why": idea.get("why", ""),
-                "confidence": idea.get("confidence", 0),
-                **story
-            }
-            user_stories.append(enriched)
-            print(f"✅ {short_title} → {story['user_story']}\n")
-
+def finalize_user_stories(
+    user_stories: list[dict],
+    push_to_jira: bool = False,
+    report: dict | None = None,
+    store: VectorStore | None = None,
+    ledger: SyncLedger | None = None,
+    session_id: str | None = None,
+) -> list[dict]:
+    """
+    Dernières étapes du pipeline : fusion des US similaires, export Jira, évaluation qualité.
+    Le score qualité est ajouté à `report["quality"]` si un dictionnaire est fourni.
+    `store` : cache d'embeddings de la session (fusion des reformulations si SEMANTIC_MERGE_THRESHOLD).
+    `ledger` : registre de synchronisation Jira de la session (export idempotent et reprenable).
+    `session_id` : si fourni, les US finales sont comparées au backlog persistant et enregistrées
+    dans la même transaction (consolidation incrémentale, décompte dans `report["cross_session"]`) :
+    seules les nouvelles sont enregistrées et exportées vers Jira, les variantes enrichissent l'US
+    existante. Toutes les US sont retournées.
+    """
     # Étape 4 : consolidation finale
     print("\n🔁 Consolidation des User Stories similaires...")
     before = len(user_stories)
-    user_stories = consolidate_user_stories(user_stories, threshold=0.8)
+    user_stories = consolidate_user_stories(
+        user_stories, threshold=0.8, semantic_threshold=SEMANTIC_MERGE_THRESHOLD, store=store
+    )
     after = len(user_stories)
     print(f"✅ {before - after} fusion(s), {after} User Stories finales.\n")
 
+    # Consolidation incrémentale : comparaison aux sessions précédentes et enregistrement
+    decisions = record_stories(session_id, user_stories, source="audio") if session_id else None
+    to_export = user_stories
+    if decisions is not None:
+        to_export = [s for s, d in zip(user_stories, decisions) if d["decision"] == "new"]
+        counts = {kind: sum(d["decision"] == kind for d in decisions) for kind in ("new", "merge-into", "duplicate")}
+        print(f"🗂️ Backlog : {counts['new']} nouvelle(s), {counts['merge-into']} fusion(s), "
+              f"{counts['duplicate']} doublon(s) de sessions précédentes.\n")
+        if report is not None:
+            report["cross_session"] = counts
+
     # Étape 5 : export Jira
-    if push_to_jira and user_stories:
+    if push_to_jira and to_export:
         print("🚀 Export vers Jira...")
-        export_user_stories_to_jira(user_stories)
+        export_user_stories_to_jira(to_export, ledger=ledger)
     else:
         print("ℹ️ Export Jira désactivé.")
 
-        # Évaluation de la qualité
+    # Évaluation de la qualité
     print("\n📊 Évaluation de la qualité des User Stories...")
     quality = compute_us_quality_score(user_stories)
     print(f"   - Confiance moyenne : {quality['confidence']:.2f}")
     print(f"   - Diversité thématique : {quality['diversity']:.2f}")
     print(f"   - Pertinence : {quality['pertinence']:.2f}")
     print(f"   👉 Score global : {quality['global_score']:.2f}\n")
+    if report is not None:
+        report["quality"] = quality
+    return user_stories
+
+
+# -------------------------
+# 🚀 Pipeline complet : audio → US
+# -------------------------
+def process_audio_feedback(
+    file_path: str,
+    push_to_jira: bool = False,
+    max_workers: int | None = None,
+    report: dict | None = None,
+    segmenter: str | None = None,
+    checkpoint_dir: str | Path | None = None,
+    progress=None,
+    session_id: str | None = None,
+):
+    """
+    Pipeline principal complet.
+    `max_workers` borne le nombre d'appels LLM simultanés (1 = exécution séquentielle).
+    `report` (optionnel) reçoit les statistiques audio et le score qualité pour le résumé de session.
+    `segmenter` : "llm" ou "local" (défaut : variable SEGMENTER) ; les embeddings locaux
+    sont mis en cache dans `embeddings.npz`, à côté du fichier audio ; le registre
+    de synchronisation Jira (`jira_sync.sqlite`) y est également conservé.
+    `checkpoint_dir` : dossier des artefacts d'étapes (transcript, segments, ideas, stories.json) ;
+    une relance reprend à la première étape invalidée (entrée ou STAGE_VERSIONS modifiée).
+    `progress(event, **data)` : notifié au début et à la fin de chaque étape (suivi d'un job).
+    `session_id` : identité de la session dans le backlog persistant ; par défaut, le nom du dossier
+    de session (`checkpoint_dir`, sinon celui de l'audio : les fichiers s'appellent tous audio.*).
+    """
+    segmenter = segmenter or SEGMENTER
+    session_id = session_id or Path(checkpoint_dir or Path(file_path).parent).name or None
+    store = None
+    if segmenter == "local" or SEMANTIC_MERGE_THRESHOLD is not None:
+        store = VectorStore(Path(file_path).parent / "embeddings.npz")
+    checkpoints = CheckpointStore(checkpoint_dir) if checkpoint_dir else None
+
+    def notify(event: str, **data):
+        if progress is not None:
+            progress(event, **data)
+
+    def stage(name: str, inputs, compute):
+        notify("stage_started", stage=name)
+        if checkpoints is None:
+            data, reused = compute(), False
+        else:
+            before = len(checkpoints.reused)
+            data = checkpoints.run(name, STAGE_VERSIONS[name], inputs(), compute)
+            reused = len(checkpoints.reused) > before
+        notify("stage_completed", stage=name, reused=reused, items=len(data) if isinstance(data, list) else None)
+        return data
 
+    # Étape 1 : transcription
+    def transcribe() -> dict:
+        audio_report = {}
+        return {"text": transcribe_audio(file_path, report=audio_report), "audio": audio_report.get("audio")}
+
+    transcript = stage("transcript", lambda: fingerprint(file_fingerprint(file_path)), transcribe)
+    text = transcript["text"]
+    if report is not None and transcript.get("audio"):
+        report["audio"] = transcript["audio"]
+    print("\n🧠 Texte transcrit :")
+    print(text[:400] + ("..." if len(text) > 400 else ""))
+
+    # Étape 2 : segmentation
+    print("\n🧩 Segmentation de la conversation...")
+    segments = stage("segments", lambda: fingerprint(text, segmenter),
+                     lambda: segment_transcript(text, segmenter, store))
+    print(f"✅ {len(segments)} segment(s) détecté(s).\n")
+
+    # Étape 3 : segments → idées → US (appels LLM en parallèle)
+    ideas = stage("ideas", lambda: fingerprint(segments), lambda: [
+        {"segment": seg, "idea": idea} for seg, idea in select_ideas(segments, max_workers=max_workers)
+    ])
+    user_stories = stage("stories", lambda: fingerprint(ideas), lambda: write_user_stories(
+        [(item["segment"], item["idea"]) for item in ideas], max_workers=max_workers
+    ))
+
+    # Étapes 4-5 : consolidation, export Jira, qualité
+    notify("stage_started", stage="finalize")
+    ledger = SyncLedger.for_session(Path(file_path).parent) if push_to_jira else None
+    user_stories = finalize_user_stories(
+        user_stories, push_to_jira=push_to_jira, report=report, store=store, ledger=ledger,
+        session_id=session_id,
+    )
+    notify("stage_completed", stage="finalize", items=len(user_stories))
 
     # Résumé
     print("\n🧾 RÉSUMÉ FINAL -------------------")
     print(f"🎙️ Fichier : {file_path}")
     print(f"🧩 {len(segments)} segment(s) analysé(s)")
-    print(f"🧱 {len(user_stories)} User Stories générée(s)\n")
+    print(f"🧱 {len(user_stories)} User Stories générée(s)")
+    stats = cache_stats()
+    if stats:
+        print(f"🗄️ Cache LLM : {stats['hits']} hit(s) / {stats['misses']} miss(es)")
+    calls = client_stats()
+    print(f"🌐 Appels LLM : {calls['requests']} requête(s), {calls['retries']} reprise(s), "
+          f"{calls['throttled_sec']:.1f} s d'attente du limiteur")
+    if checkpoints is not None:
+        print(f"♻️ Étapes reprises : {', '.join(checkpoints.reused) or 'aucune'} — "
+              f"recalculées : {', '.join(checkpoints.computed) or 'aucune'}")
+    print()
     for i, us in enumerate(user_stories, 1):
         print(f"{i}. 🧱 [{us['theme']}] {us['title']}")
         print(f"   🗣️ Idée : {us['idea']}")
@@ -0,0 +1,568 @@
+"""
+backlog_store.py
+----------------
+Backlog persistant (SQLite + FTS5) : toutes les User Stories générées, toutes sessions confondues.
+
+- une ligne par US (session, source, thème, priorité, relevance_score, critères d'acceptation)
+- index plein texte FTS5 (titre, idée, US, critères, thème), classement bm25 pondéré par colonne
+- index composites (filtre, pertinence) : un filtre exact sans texte se lit directement dans l'index
+- compteurs de facettes maintenus à l'écriture : les facettes globales ne parcourent pas la table
+- classement bm25 de toutes les correspondances ; pour une requête large (mot présent dans la moitié
+  du backlog), les premiers rangs et le total sont gardés en cache jusqu'à la prochaine écriture
+
+Les US d'une session sont écrites en une seule transaction et remplacent la version
+précédente de la session : relancer une analyse ne duplique pas le backlog.
+
+Chaque US porte aussi un croquis MinHash (clés de bandes LSH, table `story_sketches`) :
+la consolidation incrémentale (consolidator.consolidate_against_backlog) retrouve les US
+proches d'un nouveau lot par recherche indexée, sans relire le backlog. Classement et écriture
+d'une session se font dans la même transaction (add_classified_session) : deux sessions
+proches traitées en même temps ne peuvent pas se classer « nouvelles » toutes les deux.
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from pathlib import Path
+from collections import Counter, OrderedDict
+
+from .consolidator import consolidate_against_backlog
+from .similarity import MinHasher, normalize
+from .storage import DATA_DIR, connect_sqlite
+from .logger_manager import info, warn
+
+BACKLOG_STORE_PATH = Path(os.getenv("BACKLOG_STORE_PATH", str(DATA_DIR / "backlog.sqlite")))
+
+# Poids bm25 des colonnes FTS (titre et thème comptent plus que le corps des critères)
+FTS_COLUMNS = ("title", "idea", "user_story", "acceptance_criteria", "theme")
+BM25_WEIGHTS = (5.0, 3.0, 2.0, 1.0, 4.0)
+# Requêtes larges (au moins SEARCH_RANK_CACHE_MIN correspondances) : les SEARCH_RANK_CACHE_DEPTH
+# premiers rangs bm25 sont gardés en cache (SEARCH_RANK_CACHE_SIZE requêtes, jusqu'à la prochaine écriture)
+SEARCH_RANK_CACHE_MIN = int(os.getenv("SEARCH_RANK_CACHE_MIN", "1000"))
+SEARCH_RANK_CACHE_DEPTH = int(os.getenv("SEARCH_RANK_CACHE_DEPTH", "1000"))
+SEARCH_RANK_CACHE_SIZE = 32
+FACETS = ("theme", "priority", "session_id", "source")
+FILTERS = ("theme", "priority", "session_id", "source")
+RESULT_COLUMNS = (
+    "s.id, s.session_id, s.source, s.theme, s.priority, s.relevance_score, s.title, s.idea, "
+    "s.user_story, s.acceptance_criteria, s.created_at"
+)
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Croquis LSH : 30 bandes de 4 valeurs MinHash (rappel ≈ 85 % dès un Jaccard de 0.5 sur les 3-grammes)
+SKETCH_PERM = 120
+SKETCH_BANDS = 30
+SCHEMA_VERSION = 1
+# Classe les US d'une nouvelle session par rapport au backlog (0 = tout est enregistré et exporté)
+INCREMENTAL_CONSOLIDATION = os.getenv("INCREMENTAL_CONSOLIDATION", "1") == "1"
+_hasher = MinHasher(num_perm=SKETCH_PERM, ngram=3)
+
+
+def sketch_text(story: dict) -> str:
+    """Texte comparé entre sessions : titre + idée normalisés (à défaut, la User Story)."""
+    text = f"{story.get('title') or ''} {story.get('idea') or ''}".strip() or story.get("user_story") or ""
+    return normalize(text)
+
+
+def sketch_keys(text_norm: str) -> list[int]:
+    """Clés 64 bits des bandes LSH (numéro de bande inclus) de la signature MinHash d'un texte."""
+    sig = _hasher.signature(text_norm)
+    rows = SKETCH_PERM // SKETCH_BANDS
+    return [
+        int.from_bytes(hashlib.blake2b(band.to_bytes(1, "big") + sig[band * rows:(band + 1) * rows].tobytes(),
+                                       digest_size=8).digest(), "big", signed=True)
+        for band in range(SKETCH_BANDS)
+    ]
+
+
+def match_expression(query: str | None) -> str | None:
+    """
+    Requête utilisateur → expression FTS5 sûre : chaque mot devient un terme entre guillemets
+    (la syntaxe FTS n'est jamais interprétée), le dernier est cherché en préfixe
+    s'il compte au moins 3 caractères (un préfixe plus court couvrirait presque tout l'index).
+    """
+    tokens = _TOKEN.findall(query or "")
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens]
+    if len(tokens[-1]) >= 3:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _fold(text: str) -> str:
+    """Minuscules sans accents, caractère pour caractère (mêmes positions que le texte d'origine)."""
+    return "".join(unicodedata.normalize("NFD", c.lower())[0] for c in text) if text else ""
+
+
+def highlight(text: str, query: str | None, start: str = "[", end: str = "]") -> str:
+    """Encadre dans `text` les mots de la requête (insensible à la casse et aux accents, dernier mot en préfixe)."""
+    tokens = [_fold(t) for t in _TOKEN.findall(query or "")]
+    if not tokens or not text:
+        return text
+    words = [re.escape(t) for t in tokens[:-1]]
+    last = re.escape(tokens[-1]) + (r"\w*" if len(tokens[-1]) >= 3 else "")
+    pattern = re.compile(rf"\b(?:{'|'.join([*words, last])})\b")
+    folded, parts, cursor = _fold(text), [], 0
+    for m in pattern.finditer(folded):
+        parts += [text[cursor:m.start()], start, text[m.start():m.end()], end]
+        cursor = m.end()
+    return "".join(parts) + text[cursor:]
+
+
+def _criteria_text(criteria) -> str:
+    if isinstance(criteria, str):
+        return criteria
+    return "\n".join(str(c) for c in criteria or [])
+
+
+def _result(row) -> dict:
+    item = dict(row)
+    item["acceptance_criteria"] = [c for c in item["acceptance_criteria"].split("\n") if c]
+    return item
+
+
+# -------------------------
+# 🗄️ Store SQLite / FTS5
+# -------------------------
+class BacklogStore:
+    """Backlog multi-sessions partagé entre threads (et entre process via SQLite WAL)."""
+
+    def __init__(self, path: str | Path = BACKLOG_STORE_PATH):
+        self.path = Path(path)
+        self._lock = threading.RLock()  # réentrant : add_classified_session relit le backlog sous le verrou
+        self._conn = connect_sqlite(self.path)
+        self._writes = 0
+        self._rank_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        columns = ", ".join(FTS_COLUMNS)
+        new_columns = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+        old_columns = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+        with self._conn:
+            self._conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS stories (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    theme TEXT NOT NULL DEFAULT '',
+                    priority TEXT NOT NULL DEFAULT '',
+                    relevance_score REAL,
+                    title TEXT NOT NULL DEFAULT '',
+                    idea TEXT NOT NULL DEFAULT '',
+                    user_story TEXT NOT NULL DEFAULT '',
+                    acceptance_criteria TEXT NOT NULL DEFAULT '',
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_stories_session ON stories(session_id, position);
+                CREATE INDEX IF NOT EXISTS idx_stories_theme ON stories(theme, relevance_score DESC, id DESC);
+                CREATE INDEX IF NOT EXISTS idx_stories_priority ON stories(priority, relevance_score DESC, id DESC);
+                CREATE INDEX IF NOT EXISTS idx_stories_source ON stories(source, relevance_score DESC, id DESC);
+                CREATE INDEX IF NOT EXISTS idx_stories_relevance ON stories(relevance_score DESC, id DESC);
+                CREATE TABLE IF NOT EXISTS facet_counts (
+                    facet TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (facet, value)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_facet_counts ON facet_counts(facet, count DESC);
+                CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5(
+                    {columns}, content='stories', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS stories_ai AFTER INSERT ON stories BEGIN
+                    INSERT INTO stories_fts(rowid, {columns}) VALUES (new.id, {new_columns});
+                END;
+                CREATE TRIGGER IF NOT EXISTS stories_ad AFTER DELETE ON stories BEGIN
+                    INSERT INTO stories_fts(stories_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+                END;
+                CREATE TRIGGER IF NOT EXISTS stories_au AFTER UPDATE ON stories BEGIN
+                    INSERT INTO stories_fts(stories_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+                    INSERT INTO stories_fts(rowid, {columns}) VALUES (new.id, {new_columns});
+                END;
+                CREATE TABLE IF NOT EXISTS story_sketches (
+                    key INTEGER NOT NULL,
+                    story_id INTEGER NOT NULL,
+                    PRIMARY KEY (key, story_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_story_sketches_story ON story_sketches(story_id);
+                CREATE TRIGGER IF NOT EXISTS stories_ad_sketch AFTER DELETE ON stories BEGIN
+                    DELETE FROM story_sketches WHERE story_id = old.id;
+                END;
+                """
+            )
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Backlog créé avant les croquis : calcul unique pour les US existantes
+                rows = self._conn.execute("SELECT id, title, idea, user_story FROM stories").fetchall()
+                self._add_sketches((row["id"], dict(row)) for row in rows)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # -------------------------
+    # ✍️ Écriture
+    # -------------------------
+    def _adjust_facets(self, rows, sign: int):
+        counts = Counter((facet, row[facet]) for row in rows for facet in FACETS)
+        self._conn.executemany(
+            """
+            INSERT INTO facet_counts (facet, value, count) VALUES (?, ?, ?)
+            ON CONFLICT(facet, value) DO UPDATE SET count = count + excluded.count
+            """,
+            [(facet, value, sign * n) for (facet, value), n in counts.items()],
+        )
+
+    def _add_sketches(self, stories):
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO story_sketches (key, story_id) VALUES (?, ?)",
+            [(key, story_id) for story_id, story in stories if (text := sketch_text(story))
+             for key in sketch_keys(text)],
+        )
+
+    def _merge_into(self, target_id: int, story: dict) -> bool:
+        """Ajoute à une US existante les critères d'acceptation qu'elle n'a pas encore."""
+        row = self._conn.execute("SELECT data, relevance_score FROM stories WHERE id = ?", (target_id,)).fetchone()
+        if row is None:
+            return False
+        data = json.loads(row["data"])
+        criteria = list(data.get("acceptance_criteria") or [])
+        criteria += [c for c in story.get("acceptance_criteria") or [] if c not in criteria]
+        data["acceptance_criteria"] = criteria
+        relevance = max(filter(lambda v: v is not None, (row["relevance_score"], story.get("relevance_score"))), default=None)
+        data["relevance_score"] = relevance
+        self._conn.execute(
+            "UPDATE stories SET acceptance_criteria = ?, relevance_score = ?, data = ? WHERE id = ?",
+            (_criteria_text(criteria), relevance, json.dumps(data, ensure_ascii=False, default=str), target_id),
+        )
+        return True
+
+    def add_session(
+        self, session_id: str, stories: list[dict], source: str = "audio", decisions: list[dict] | None = None
+    ) -> int:
+        """
+        Remplace les US d'une session (une transaction) ; retourne le nombre d'US écrites.
+        `decisions` (consolidation incrémentale, une par US) : seules les "new" sont écrites,
+        les "merge-into" enrichissent l'US visée, les "duplicate" sont ignorées.
+        """
+        with self._lock, self._conn:
+            return self._write_session(session_id, stories, source, decisions)
+
+    def add_classified_session(self, session_id: str, stories: list[dict], source: str = "audio") -> list[dict] | None:
+        """
+        Classe les US d'une session contre les sessions précédentes (consolidate_against_backlog)
+        puis les enregistre comme add_session, sous le verrou du store et dans une même transaction
+        d'écriture (BEGIN IMMEDIATE : les autres process attendent aussi). Retourne les décisions,
+        reportées dans `story["backlog_decision"]` ; None si le classement échoue (tout est enregistré).
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                decisions = consolidate_against_backlog(stories, self, session_id=session_id)
+            except Exception as e:
+                warn("Consolidation incrémentale impossible", session_id=session_id, details=str(e),
+                     event="backlog_consolidation_error")
+                decisions = None
+            for story, decision in zip(stories, decisions or []):
+                story["backlog_decision"] = decision["decision"]
+            self._write_session(session_id, stories, source, decisions)
+        return decisions
+
+    def _write_session(self, session_id: str, stories: list[dict], source: str, decisions: list[dict] | None) -> int:
+        """Corps d'add_session (verrou et transaction à la charge de l'appelant)."""
+        if decisions is not None:
+            merges = [(d["target_id"], s) for s, d in zip(stories, decisions) if d["decision"] == "merge-into"]
+            stories = [s for s, d in zip(stories, decisions) if d["decision"] == "new"]
+        else:
+            merges = []
+        now = time.time()
+        rows = [
+            {
+                "session_id": session_id, "source": source, "position": position,
+                "theme": s.get("theme") or "", "priority": s.get("priority") or "",
+                "relevance_score": s.get("relevance_score"),
+                "title": s.get("title") or "", "idea": s.get("idea") or "", "user_story": s.get("user_story") or "",
+                "acceptance_criteria": _criteria_text(s.get("acceptance_criteria")),
+                "data": json.dumps(s, ensure_ascii=False, default=str), "created_at": now,
+            }
+            for position, s in enumerate(stories)
+        ]
+        previous = self._conn.execute(
+            f"SELECT {', '.join(FACETS)} FROM stories WHERE session_id = ?", (session_id,)
+        ).fetchall()
+        self._adjust_facets(previous, -1)
+        self._conn.execute("DELETE FROM stories WHERE session_id = ?", (session_id,))
+        ids = [
+            self._conn.execute(
+                """
+                INSERT INTO stories (session_id, source, position, theme, priority, relevance_score,
+                                     title, idea, user_story, acceptance_criteria, data, created_at)
+                VALUES (:session_id, :source, :position, :theme, :priority, :relevance_score,
+                        :title, :idea, :user_story, :acceptance_criteria, :data, :created_at)
+                RETURNING id
+                """,
+                row,
+            ).fetchone()[0]
+            for row in rows
+        ]
+        self._add_sketches(zip(ids, stories))
+        self._adjust_facets(rows, +1)
+        self._conn.execute("DELETE FROM facet_counts WHERE count <= 0")
+        for target_id, story in merges:
+            self._merge_into(target_id, story)
+        self._writes += 1
+        return len(rows)
+
+    def similar_stories(self, stories: list[dict], exclude_session: str | None = None) -> list[list[dict]]:
+        """
+        US du backlog partageant au moins une bande LSH avec chacune des `stories`
+        (candidates à vérifier). Coût proportionnel au lot : une recherche indexée par clé.
+        """
+        found = []
+        with self._lock:
+            for story in stories:
+                text = sketch_text(story)
+                if not text:
+                    found.append([])
+                    continue
+                keys = sketch_keys(text)
+                rows = self._conn.execute(
+                    f"""
+                    SELECT s.id, s.session_id, s.title, s.idea, s.user_story, s.acceptance_criteria
+                    FROM stories s WHERE s.id IN (
+                        SELECT story_id FROM story_sketches WHERE key IN ({', '.join('?' * len(keys))})
+                    ) AND s.session_id IS NOT ?
+                    ORDER BY s.id
+                    """,
+                    [*keys, exclude_session],
+                ).fetchall()
+                found.append([_result(row) for row in rows])
+        return found
+
+    def optimize(self):
+        """Fusionne les segments de l'index FTS et met à jour les statistiques du planificateur."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO stories_fts(stories_fts) VALUES ('optimize')")
+            self._conn.execute("ANALYZE")
+
+    # -------------------------
+    # 🔎 Recherche et facettes
+    # -------------------------
+    @staticmethod
+    def _where(filters: dict) -> tuple[list[str], list]:
+        where, params = [], []
+        for column in FILTERS:
+            if filters.get(column):
+                where.append(f"s.{column} = ?")
+                params.append(filters[column])
+        if filters.get("min_relevance") is not None:
+            where.append("s.relevance_score >= ?")
+            params.append(filters["min_relevance"])
+        return where, params
+
+    def _selection(self, match: str | None, filters: dict, with_stories: bool = False) -> tuple[str, list]:
+        """
+        FROM / WHERE des US sélectionnées. Avec du texte, l'index FTS pilote la requête
+        (CROSS JOIN : SQLite ne réordonne pas la jointure) et les filtres s'appliquent ensuite ;
+        sans filtre (ni `with_stories`), la table des US n'est pas lue du tout.
+        """
+        where, params = self._where(filters)
+        if not match:
+            source = "stories s"
+        elif where or with_stories:
+            source = "stories_fts CROSS JOIN stories s ON s.id = stories_fts.rowid"
+        else:
+            source = "stories_fts"
+        if match:
+            where.insert(0, "stories_fts MATCH ?")
+            params.insert(0, match)
+        return f"FROM {source} {'WHERE ' + ' AND '.join(where) if where else ''}", params
+
+    def search(self, query: str | None = None, limit: int = 20, offset: int = 0, **filters) -> tuple[list[dict], int]:
+        """
+        US correspondant à `query` (classées par bm25) et aux filtres exacts
+        (theme, priority, session_id, source, min_relevance) ; sans requête : par pertinence.
+        Retourne (page de résultats, nombre total).
+
+        En deux temps : la page est classée sur les seuls identifiants, puis seules ses
+        lignes sont lues. Le surlignage est fait ici plutôt qu'avec snippet() de FTS5,
+        qui relit toute la liste de documents du terme pour chaque ligne.
+        """
+        match = match_expression(query)
+        selection, params = self._selection(match, filters)
+        with self._lock:
+            if not match:
+                total = self._conn.execute(f"SELECT COUNT(*) {selection}", params).fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT {RESULT_COLUMNS} {selection} ORDER BY s.relevance_score DESC, s.id DESC LIMIT ? OFFSET ?",
+                    [*params, limit, offset],
+                ).fetchall()
+                return [_result(row) for row in rows], total
+            total, ranks = self._rank_page(selection, params, limit, offset)
+            if not ranks:
+                return [], total
+            rows = self._conn.execute(
+                f"SELECT {RESULT_COLUMNS} FROM stories s WHERE s.id IN ({', '.join('?' * len(ranks))})", list(ranks)
+            ).fetchall()
+        order = {row_id: i for i, row_id in enumerate(ranks)}
+        results = sorted((_result(row) for row in rows), key=lambda r: order[r["id"]])
+        for item in results:
+            item["score"] = round(-ranks[item["id"]], 4)
+            item["snippet"] = highlight(item["user_story"], query)
+        return results, total
+
+    def _rank(self, selection: str, params: list, limit: int, offset: int) -> list[tuple[int, float]]:
+        """(identifiant, bm25) des correspondances, toutes classées ; à score égal, la plus récente d'abord."""
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        return self._conn.execute(
+            f"SELECT stories_fts.rowid, bm25(stories_fts, {weights}) AS rank {selection} "
+            "ORDER BY rank, stories_fts.rowid DESC LIMIT ? OFFSET ?",
+            [*params, limit, offset],
+        ).fetchall()
+
+    def _rank_page(self, selection: str, params: list, limit: int, offset: int) -> tuple[int, dict[int, float]]:
+        """
+        (nombre total, identifiants de la page → score bm25 dans l'ordre d'affichage).
+        Noter toutes les correspondances d'un mot fréquent coûte ~100 ms pour 50 000 lignes :
+        pour les requêtes larges, le total et les SEARCH_RANK_CACHE_DEPTH premiers rangs sont
+        calculés une fois puis relus du cache tant que le backlog ne change pas (écriture de ce
+        store ou, via PRAGMA data_version, d'une autre connexion).
+        """
+        version = (self._writes, self._conn.execute("PRAGMA data_version").fetchone()[0])
+        key = (selection, *params)
+        cached = self._rank_cache.get(key)
+        if cached is not None and cached[0] == version:
+            self._rank_cache.move_to_end(key)
+            total, top = cached[1:]
+        else:
+            total = self._conn.execute(f"SELECT COUNT(*) {selection}", params).fetchone()[0]
+            top = None
+            if total >= SEARCH_RANK_CACHE_MIN:
+                top = self._rank(selection, params, SEARCH_RANK_CACHE_DEPTH, 0)
+                self._rank_cache[key] = (version, total, top)
+                self._rank_cache.move_to_end(key)
+                while len(self._rank_cache) > SEARCH_RANK_CACHE_SIZE:
+                    self._rank_cache.popitem(last=False)
+        if top is not None and offset + limit <= len(top):
+            page = top[offset:offset + limit]
+        else:
+            page = self._rank(selection, params, limit, offset)
+        return total, {row[0]: row[1] for row in page}
+
+    def facets(self, query: str | None = None, top: int = 20, **filters) -> dict[str, list[dict]]:
+        """
+        Nombre d'US par valeur de thème / priorité / session / source, pour la même sélection que search.
+        Sans texte ni filtre : lu dans les compteurs maintenus à l'écriture.
+        """
+        match = match_expression(query)
+        if not match and not self._where(filters)[0]:
+            with self._lock:
+                rows = [
+                    row for facet in FACETS for row in self._conn.execute(
+                        "SELECT facet, value, count FROM facet_counts WHERE facet = ? "
+                        "ORDER BY count DESC, value LIMIT ?", (facet, top),
+                    )
+                ]
+        else:
+            selection, params = self._selection(match, filters, with_stories=True)
+            # Une seule évaluation de la sélection, agrégée ensuite pour chaque facette
+            groups = " UNION ALL ".join(
+                f"SELECT '{facet}' AS facet, {facet} AS value, COUNT(*) AS count FROM selected GROUP BY {facet}"
+                for facet in FACETS
+            )
+            with self._lock:
+                rows = self._conn.execute(
+                    f"WITH selected AS MATERIALIZED (SELECT {', '.join(f's.{f}' for f in FACETS)} {selection}) {groups}",
+                    params,
+                ).fetchall()
+
+        result: dict[str, list[dict]] = {facet: [] for facet in FACETS}
+        for row in rows:
+            result[row["facet"]].append({"value": row["value"], "count": row["count"]})
+        for facet, values in result.items():
+            values.sort(key=lambda v: (-v["count"], v["value"]))
+            del values[top:]
+        return result
+
+    def session_stories(self, session_id: str) -> list[dict]:
+        """US complètes d'une session, dans l'ordre du pipeline."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM stories WHERE session_id = ? ORDER BY position", (session_id,)
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def iter_stories(self, batch_size: int = 1000, **filters):
+        """
+        Parcourt les US complètes (ordre d'insertion) par pages de `batch_size`, sans tout charger :
+        chaque page reprend après le dernier id lu (exports du backlog entier, voir exporter.py).
+        """
+        where, params = self._where(filters)
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT s.id, s.data FROM stories s WHERE {' AND '.join(['s.id > ?', *where])} "
+                    "ORDER BY s.id LIMIT ?",
+                    [last_id, *params, batch_size],
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row["data"])
+            last_id = rows[-1]["id"]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM stories").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# -------------------------
+# 🔌 Store partagé du process
+# -------------------------
+_stores: dict[Path, BacklogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_backlog_store() -> BacklogStore:
+    """Backlog du process, ouvert à la première utilisation (chemin : BACKLOG_STORE_PATH)."""
+    path = Path(BACKLOG_STORE_PATH)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = BacklogStore(path)
+        return _stores[path]
+
+
+def record_stories(session_id: str, stories: list[dict], source: str = "audio") -> list[dict] | None:
+    """
+    Enregistre les US d'une session dans le backlog ; un échec n'interrompt jamais le pipeline.
+    Avec la consolidation incrémentale, les US sont d'abord classées contre les sessions
+    précédentes, dans la même transaction que l'écriture (voir add_classified_session) :
+    retourne les décisions ("new" / "merge-into" / "duplicate"), None si désactivée ou en échec.
+    """
+    try:
+        store = get_backlog_store()
+        if not INCREMENTAL_CONSOLIDATION or not stories:
+            count = store.add_session(session_id, stories, source=source)
+            info("User Stories ajoutées au backlog", session_id=session_id, count=count, event="backlog_stored")
+            return None
+        decisions = store.add_classified_session(session_id, stories, source=source)
+    except Exception as e:
+        warn("Backlog non mis à jour", session_id=session_id, details=str(e), event="backlog_error")
+        return None
+    if decisions is None:
+        info("User Stories ajoutées au backlog", session_id=session_id, count=len(stories), event="backlog_stored")
+        return None
+    counts = Counter(d["decision"] for d in decisions)
+    info("Consolidation incrémentale", session_id=session_id, new=counts["new"], merged=counts["merge-into"],
+         duplicates=counts["duplicate"], event="backlog_consolidated")
+    info("User Stories ajoutées au backlog", session_id=session_id, count=counts["new"], event="backlog_stored")
+    return decisions
@@ -0,0 +1,278 @@
+"""
+batch_ingest.py
+---------------
+Import en masse de feedbacks écrits (fichiers type input/feedbacks.txt ou dossiers).
+
+- Lecture en flux : .txt (un feedback par ligne), .jsonl (champ `text` / `feedback` / `content`
+  ou chaîne JSON) et .csv (même colonnes, à défaut la première) ; un dossier est parcouru
+  récursivement. Chaque feedback est nettoyé par parser.clean_text.
+- Traitement par un pool borné de threads (extraction d'idées + génération des US via
+  feedback_listener.process_text_feedback) : seuls quelques feedbacks sont en mémoire à la fois.
+- Reprise : chaque feedback traité est consigné dans un registre SQLite (empreinte du texte
+  nettoyé). Un import interrompu (Ctrl+C, crash, job relancé) reprend sans refaire les
+  feedbacks déjà traités ; ceux en échec sont retentés.
+- Export Jira idempotent : les tickets créés sont consignés dans un registre de synchronisation
+  (`<registre>_jira.sqlite`, identités préfixées par l'id du feedback) ; un feedback retraité
+  après un export partiel ou un crash ne recrée pas ses tickets.
+- Débit rapporté en feedbacks par minute.
+
+Usage : python -m backlog_generator.batch_ingest input/feedbacks.txt [--workers 8] [--push-to-jira]
+"""
+
+import os
+import csv
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from typing import Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import feedback_listener
+from .parser import clean_text
+from .jira_ledger import SyncLedger
+from .storage import DATA_DIR, connect_sqlite
+from .logger_manager import info, warn
+
+BATCH_INGEST_PATH = Path(os.getenv("BATCH_INGEST_PATH", str(DATA_DIR / "batch_ingest.sqlite")))
+BATCH_INGEST_WORKERS = int(os.getenv("BATCH_INGEST_WORKERS", "4"))
+SUFFIXES = (".txt", ".jsonl", ".csv")
+TEXT_FIELDS = ("text", "feedback", "content", "comment")
+MIN_FEEDBACK_CHARS = 15
+PROGRESS_EVERY = 50
+
+
+# -------------------------
+# 📖 Lecture en flux
+# -------------------------
+def _record_text(record) -> str:
+    if isinstance(record, str):
+        return record
+    if isinstance(record, dict):
+        for field in TEXT_FIELDS:
+            if record.get(field):
+                return str(record[field])
+    return ""
+
+
+def _read_file(path: Path) -> Iterator[tuple[int, str]]:
+    """(numéro de ligne / d'enregistrement, texte brut) d'un fichier, sans le charger entièrement."""
+    with open(path, encoding="utf-8", newline="" if path.suffix == ".csv" else None) as f:
+        if path.suffix == ".csv":
+            reader = csv.reader(f)
+            header = [h.strip().lower() for h in next(reader, [])]
+            column = next((header.index(field) for field in TEXT_FIELDS if field in header), 0)
+            for number, row in enumerate(reader, start=2):
+                if len(row) > column:
+                    yield number, row[column]
+        elif path.suffix == ".jsonl":
+            for number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield number, _record_text(json.loads(line))
+                    except json.JSONDecodeError:
+                        warn("Ligne JSONL invalide ignorée", source=str(path), line=number, event="batch_invalid_record")
+        else:
+            for number, line in enumerate(f, start=1):
+                yield number, line
+
+
+def iter_feedbacks(source: str | Path, min_chars: int = MIN_FEEDBACK_CHARS) -> Iterator[dict]:
+    """
+    Feedbacks nettoyés d'un fichier ou d'un dossier : {"id", "source", "line", "text"}.
+    `id` = empreinte du texte nettoyé (identité de reprise) ; les fragments trop courts sont ignorés.
+    """
+    source = Path(source)
+    files = sorted(p for p in source.rglob("*") if p.suffix in SUFFIXES) if source.is_dir() else [source]
+    for path in files:
+        for number, raw in _read_file(path):
+            text = clean_text(raw)
+            if len(text) < min_chars:
+                continue
+            yield {
+                "id": hashlib.sha1(text.encode("utf-8")).hexdigest(),
+                "source": str(path),
+                "line": number,
+                "text": text,
+            }
+
+
+# -------------------------
+# 🗃️ Registre de reprise
+# -------------------------
+class IngestLedger:
+    """Feedbacks déjà traités (ou en échec) ; partageable entre threads."""
+
+    def __init__(self, path: str | Path = BATCH_INGEST_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.path)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ingested (
+                    id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    line INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    story_count INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def is_done(self, feedback_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM ingested WHERE id = ?", (feedback_id,)).fetchone()
+        return row is not None and row["status"] == "done"
+
+    def mark(self, feedback: dict, status: str, story_count: int = 0, error: str | None = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO ingested (id, source, line, status, story_count, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET status = excluded.status, story_count = excluded.story_count,
+                    error = excluded.error, updated_at = excluded.updated_at
+                """,
+                (feedback["id"], feedback["source"], feedback["line"], status, story_count, error, time.time()),
+            )
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM ingested GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def jira_ledger(self) -> SyncLedger:
+        """Registre de synchronisation Jira de l'import, à côté de ce registre."""
+        return SyncLedger(self.path.with_name(f"{self.path.stem}_jira.sqlite"))
+
+    def close(self):
+        self._conn.close()
+
+
+# -------------------------
+# 🚀 Import parallèle
+# -------------------------
+def _process(feedback: dict, push_to_jira: bool, jira_ledger: SyncLedger | None = None) -> int:
+    stories = feedback_listener.process_text_feedback(
+        feedback["text"], push_to_jira=push_to_jira, session_id=f"batch_{feedback['id'][:12]}",
+        jira_ledger=jira_ledger.scoped(feedback["id"]) if jira_ledger is not None else None,
+    )
+    return len(stories)
+
+
+def ingest(
+    source: str | Path,
+    push_to_jira: bool = False,
+    max_workers: int | None = None,
+    ledger: IngestLedger | None = None,
+    progress=None,
+    stop_event: threading.Event | None = None,
+) -> dict:
+    """
+    Importe tous les feedbacks de `source` (fichier ou dossier) et retourne le rapport :
+    {"processed", "skipped", "failed", "stories", "elapsed_sec", "feedbacks_per_min"}.
+    Au plus 2 × `max_workers` feedbacks sont lus d'avance. `stop_event` (ou Ctrl+C) arrête la
+    lecture : les feedbacks en cours se terminent et sont consignés, l'import reprendra après eux.
+    `progress(event, **data)` reçoit "batch_progress" tous les PROGRESS_EVERY feedbacks.
+    Avec `push_to_jira`, les tickets créés sont consignés dans `ledger.jira_ledger()`.
+    """
+    workers = max(1, max_workers or BATCH_INGEST_WORKERS)
+    owned = ledger is None
+    ledger = ledger or IngestLedger(BATCH_INGEST_PATH)
+    jira_ledger = ledger.jira_ledger() if push_to_jira else None
+    report = {"processed": 0, "skipped": 0, "failed": 0, "stories": 0}
+    start = time.perf_counter()
+
+    def throughput() -> float:
+        elapsed = time.perf_counter() - start
+        return round(report["processed"] * 60 / elapsed, 1) if elapsed > 0 else 0.0
+
+    def collect(done):
+        for future in done:
+            feedback = pending.pop(future)
+            try:
+                count = future.result()
+            except Exception as e:
+                report["failed"] += 1
+                ledger.mark(feedback, "failed", error=str(e))
+                warn("Feedback en échec", source=feedback["source"], line=feedback["line"], details=str(e),
+                     event="batch_feedback_failed")
+                continue
+            report["processed"] += 1
+            report["stories"] += count
+            ledger.mark(feedback, "done", story_count=count)
+            if report["processed"] % PROGRESS_EVERY == 0:
+                print(f"📥 {report['processed']} feedback(s) traités — {throughput():.1f} feedbacks/min")
+                if progress is not None:
+                    progress("batch_progress", **report, feedbacks_per_min=throughput())
+
+    print(f"\n📥 Import des feedbacks de {source} ({workers} worker(s))...")
+    pending = {}
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+    try:
+        for feedback in iter_feedbacks(source):
+            if stop_event is not None and stop_event.is_set():
+                break
+            if ledger.is_done(feedback["id"]):
+                report["skipped"] += 1
+                continue
+            pending[executor.submit(_process, feedback, push_to_jira, jira_ledger)] = feedback
+            if len(pending) >= 2 * workers:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+    except KeyboardInterrupt:
+        # Arrêt demandé : les feedbacks non commencés sont abandonnés, ceux en cours sont consignés
+        for future in [f for f in pending if f.cancel()]:
+            del pending[future]
+        report["interrupted"] = True
+        print("\n⚠️ Interruption — fin des feedbacks en cours ; relancer la même commande pour reprendre.")
+    try:
+        while pending:
+            collect(wait(pending, return_when=FIRST_COMPLETED).done)
+    finally:
+        executor.shutdown(wait=True)
+        if jira_ledger is not None:
+            jira_ledger.close()
+        if owned:
+            ledger.close()
+
+    elapsed = time.perf_counter() - start
+    report["elapsed_sec"] = round(elapsed, 2)
+    report["feedbacks_per_min"] = throughput()
+    print(f"✅ {report['processed']} feedback(s) traités, {report['skipped']} déjà importés, "
+          f"{report['failed']} en échec — {report['stories']} User Stories, "
+          f"{report['feedbacks_per_min']:.1f} feedbacks/min.\n")
+    info("Import de feedbacks terminé", source=str(source), **report, event="batch_ingest_done")
+    return report
+
+
+# -------------------------
+# 📥 Traitement via la file de jobs
+# -------------------------
+def batch_job(payload: dict, ctx) -> dict:
+    """Handler du job "batch" (file de jobs) : import d'un fichier ou dossier de feedbacks."""
+    return ingest(payload["path"], push_to_jira=payload.get("push_to_jira", False),
+                  max_workers=payload.get("max_workers"), progress=ctx.event)
+
+
+# ============================================================
+# 🧪 Ligne de commande
+# ============================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import en masse de feedbacks écrits (reprise automatique).")
+    parser.add_argument("source", help="fichier .txt / .jsonl / .csv ou dossier")
+    parser.add_argument("--workers", type=int, default=BATCH_INGEST_WORKERS)
+    parser.add_argument("--push-to-jira", action="store_true")
+    parser.add_argument("--ledger", default=str(BATCH_INGEST_PATH), help="registre de reprise (SQLite)")
+    args = parser.parse_args()
+
+    ledger = IngestLedger(args.ledger)
+    try:
+        ingest(args.source, push_to_jira=args.push_to_jira, max_workers=args.workers, ledger=ledger)
+        print(f"🗃️ Registre : {ledger.counts()}")
+    finally:
+        ledger.close()
@@ -0,0 +1,81 @@
+"""
+checkpoints.py
+--------------
+Points de reprise du pipeline audio : chaque étape écrit son artefact JSON dans le dossier
+de session (transcript.json, segments.json, ideas.json, stories.json) avec :
+
+- `version` : version de l'étape (à incrémenter quand son prompt ou sa logique change)
+- `input_hash` : empreinte de l'entrée (audio, ou artefact de l'étape précédente + paramètres)
+
+Un artefact n'est réutilisé que si version et empreinte correspondent : une relance reprend
+à la première étape invalidée, et une étape qui reproduit la même sortie n'invalide pas la suite.
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Any, Callable
+
+
+def fingerprint(*parts) -> str:
+    """Empreinte SHA-256 stable de valeurs JSON (ordre des clés indifférent)."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier (lecture par blocs)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """Artefacts d'étapes d'une session (`<dossier>/<étape>.json`)."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.reused: list[str] = []
+        self.computed: list[str] = []
+
+    def path(self, stage: str) -> Path:
+        return self.directory / f"{stage}.json"
+
+    def load(self, stage: str, version: int, input_hash: str) -> tuple[bool, Any]:
+        """(True, données) si l'artefact existe et correspond à la version et à l'entrée."""
+        try:
+            with open(self.path(stage), "r", encoding="utf-8") as f:
+                artifact = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False, None
+        if artifact.get("version") != version or artifact.get("input_hash") != input_hash:
+            return False, None
+        return True, artifact["data"]
+
+    def save(self, stage: str, version: int, input_hash: str, data: Any):
+        """Écriture atomique (fichier temporaire puis renommage) : jamais d'artefact tronqué."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        artifact = {"stage": stage, "version": version, "input_hash": input_hash,
+                    "created_at": time.time(), "data": data}
+        tmp = self.path(stage).with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path(stage))
+
+    def run(self, stage: str, version: int, input_hash: str, compute: Callable[[], Any]) -> Any:
+        """Réutilise l'artefact valide de l'étape, sinon le calcule et le persiste."""
+        found, data = self.load(stage, version, input_hash)
+        if found:
+            print(f"♻️ Étape « {stage} » reprise depuis {self.path(stage).name}")
+            self.reused.append(stage)
+            return data
+        data = compute()
+        self.save(stage, version, input_hash, data)
+        self.computed.append(stage)
+        return data
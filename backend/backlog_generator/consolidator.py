@@ -7,6 +7,13 @@ Consolide, nettoie, pondère et priorise automatiquement les User Stories géné
 import re
 from difflib import SequenceMatcher
 
+import numpy as np
+
+from .embeddings import VectorStore, tfidf_weight
+from .similarity import make_index, normalize, ratio
+
+MATCH_FIELDS = ("title", "idea", "user_story")
+
 # -------------------------
 # 🧰 1. Utilitaires
 # -------------------------
@@ -93,14 +100,31 @@ def compute_relevance(story: dict) -> float:
 # -------------------------
 # 🔁 5. Fusion et pondération des US similaires
 # -------------------------
-def consolidate_user_stories(stories: list[dict], threshold: float = 0.72) -> list[dict]:
+def consolidate_user_stories(
+    stories: list[dict],
+    threshold: float = 0.72,
+    index: str = "exact",
+    semantic_threshold: float | None = None,
+    store: VectorStore | None = None,
+) -> list[dict]:
     """
     Fusionne les US similaires, nettoie les artefacts,
     attribue priorité + pertinence, puis trie par valeur produit.
+
+    `index` choisit la recherche des doublons (voir similarity.py) :
+    "exact" (défaut) donne les mêmes fusions que la comparaison exhaustive ("brute"),
+    "lsh" est approximatif mais quasi linéaire pour des dizaines de milliers d'US.
+
+    `semantic_threshold` (optionnel) fusionne aussi les reformulations : deux US dont
+    les embeddings « titre + idée » ont un cosinus ≥ ce seuil sont considérées identiques
+    (vecteurs mis en cache dans `store`, voir embeddings.py).
     """
     merged = []
+    indexes = {field: make_index(index, threshold) for field in MATCH_FIELDS}
+    vectors = _semantic_vectors(stories, store) if semantic_threshold is not None else None
+    merged_vectors = []
 
-    for s in stories:
+    for pos, s in enumerate(stories):
         # Nettoyage du titre
         if _looks_like_prompt_artifact(s["title"]):
             s["title"] = s["title"].split(":", 1)[-1].strip().capitalize()
@@ -110,15 +134,13 @@ def consolidate_user_stories(stories: list[dict], threshold: float = 0.72) -> li
         s["priority"] = auto_priority(s["user_story"], s["theme"])
         s["relevance_score"] = compute_relevance(s)
 
-        duplicate = None
-        for m in merged:
-            if (
-                _similar(s["title"], m["title"]) > threshold
-                or _similar(s["idea"], m["idea"]) > threshold
-                or _similar(s["user_story"], m["user_story"]) > threshold
-            ):
-                duplicate = m
-                break
+        # Formes normalisées calculées une seule fois par US
+        norms = {field: normalize(s[field]) for field in MATCH_FIELDS}
+        semantic = set()
+        if merged_vectors:
+            sims = np.asarray(merged_vectors) @ vectors[pos]
+            semantic = set(np.flatnonzero(sims >= semantic_threshold).tolist())
+        duplicate = _find_duplicate(norms, indexes, merged, threshold, semantic)
 
         if duplicate:
             # Fusion des critères et pondération moyenne
@@ -127,8 +149,82 @@ def consolidate_user_stories(stories: list[dict], threshold: float = 0.72) -> li
             duplicate["relevance_score"] = round((duplicate["relevance_score"] + s["relevance_score"]) / 2, 2)
         else:
             merged.append(s)
+            for field in MATCH_FIELDS:
+                indexes[field].add(norms[field])
+            if vectors is not None:
+                merged_vectors.append(vectors[pos])
 
     # Tri final par pertinence décroissante
     merged = sorted(merged, key=lambda x: x["relevance_score"], reverse=True)
 
     return merged
+
+
+def _semantic_vectors(stories: list[dict], store: VectorStore | None) -> np.ndarray:
+    """Embeddings « titre + idée » de toutes les US, pondérés TF-IDF sur le lot."""
+    store = store or VectorStore()
+    return tfidf_weight(store.embed([f"{s['title']}. {s['idea']}" for s in stories]))
+
+
+def _find_duplicate(
+    norms: dict, indexes: dict, merged: list[dict], threshold: float, semantic: set[int] = frozenset()
+) -> dict | None:
+    """
+    Première US déjà retenue (dans l'ordre d'insertion) dont le titre, l'idée
+    ou le texte dépasse le seuil — seuls les candidats des index sont vérifiés —
+    ou qui figure parmi les voisines sémantiques (`semantic`).
+    """
+    candidates = {field: set(indexes[field].candidates(norms[field]).tolist()) for field in MATCH_FIELDS}
+    for pos in sorted(set().union(semantic, *candidates.values())):
+        if pos in semantic:
+            return merged[pos]
+        for field in MATCH_FIELDS:
+            if pos in candidates[field] and indexes[field].ratio(norms[field], pos) > threshold:
+                return merged[pos]
+    return None
+
+
+# -------------------------
+# 🗂️ 6. Consolidation incrémentale contre le backlog
+# -------------------------
+def consolidate_against_backlog(
+    stories: list[dict],
+    backlog,
+    session_id: str | None = None,
+    threshold: float = 0.8,
+    duplicate_threshold: float = 0.95,
+) -> list[dict]:
+    """
+    Compare un lot d'US (déjà consolidé) aux US des sessions précédentes du backlog
+    (`backlog_store.BacklogStore`) et retourne une décision par US :
+      - {"decision": "new"} : aucune US proche ;
+      - {"decision": "merge-into", "target_id": id} : proche d'une US existante (un champ au-delà
+        de `threshold`, comme consolidate_user_stories) et apporte
+        des critères d'acceptation nouveaux ;
+      - {"decision": "duplicate", "target_id": id} : titre et idée quasi identiques
+        (ratio ≥ `duplicate_threshold`), ou proche sans rien de nouveau.
+    Seules les candidates LSH du backlog sont vérifiées : le coût dépend du lot, pas du backlog.
+    `session_id` : session exclue de la comparaison (relancer une analyse ne se retrouve pas elle-même).
+    """
+    decisions = []
+    for s, candidates in zip(stories, backlog.similar_stories(stories, exclude_session=session_id)):
+        norms = {field: normalize(s.get(field) or "") for field in MATCH_FIELDS}
+        best, best_ratio = None, 0.0
+        for candidate in candidates:
+            score = max(
+                ratio(norms[field], normalize(candidate[field] or "")) if norms[field] else 0.0
+                for field in MATCH_FIELDS
+            )
+            if score > best_ratio:
+                best, best_ratio = candidate, score
+
+        if best is None or best_ratio <= threshold:
+            decisions.append({"decision": "new", "target_id": None, "similarity": round(best_ratio, 3)})
+            continue
+        # Doublon : titre + idée quasi identiques (le gabarit « En tant que… » gonfle le ratio du texte complet)
+        identical = ratio(f"{norms['title']} {norms['idea']}", normalize(f"{best['title']} {best['idea']}"))
+        known = {_normalize(c) for c in best["acceptance_criteria"]}
+        novel = [c for c in s.get("acceptance_criteria") or [] if _normalize(c) not in known]
+        decision = "duplicate" if identical >= duplicate_threshold or not novel else "merge-into"
+        decisions.append({"decision": decision, "target_id": best["id"], "similarity": round(best_ratio, 3)})
+    return decisions
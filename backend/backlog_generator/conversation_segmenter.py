@@ -6,15 +6,8 @@ Chaque bloc correspond à un thème, un intervenant, ou un besoin.
 """
 
 import re
-from groq import Groq
-from dotenv import load_dotenv
-from pathlib import Path
-import os
 
-# Charger la clé API
-env_path = Path(__file__).resolve().parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+from .llm_client import chat_completion
 
 # -------------------------
 # 🧩 Segmentation automatique
@@ -57,14 +50,12 @@ Pour chaque thème, fournis :
 Aucun texte, introduction, ni explication avant ou après.
     """
 
-    response = client.chat.completions.create(
+    text = chat_completion(
         model="mixtral-8x7b-32768",  # ✅ modèle le plus stable pour ce type de tâche
         messages=[{"role": "user", "content": prompt}],
         temperature=0.1,
         max_tokens=800,
-    )
-
-    text = response.choices[0].message.content.strip()
+    ).strip()
 
     # Extraction robuste du JSON
     try:
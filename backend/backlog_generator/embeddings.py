@@ -0,0 +1,197 @@
+"""
+embeddings.py
+-------------
+Représentations vectorielles locales des textes (aucun appel réseau, résultats déterministes).
+
+- "hashing" (défaut) : sac de mots, bigrammes et n-grammes de caractères hachés (CRC32)
+  dans un espace de dimension fixe ; la pondération TF-IDF est appliquée sur le lot comparé
+- "sentence-transformers" : petit modèle CPU si le paquet et le modèle sont présents localement
+  (EMBEDDING_MODEL), sinon repli automatique sur "hashing"
+
+VectorStore met en cache les vecteurs d'une session dans un fichier `.npz`
+(clé = empreinte SHA-1 du texte) pour ne jamais recalculer un même texte ;
+un cache produit par un autre backend est ignoré.
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import os
+import re
+import zlib
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .logger_manager import warn
+
+try:  # dépendance optionnelle (modèle CPU local)
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+
+STOPWORDS = set("""
+a à afin ai aie au aux avec avoir c ça ce ces cet cette ci d dans de des du donc elle elles en est et
+être eu fait faut il ils j je l la le les leur leurs lui m ma mais me même mes moi mon n ne ni nos notre
+nous on ou où par pas peu peut plus pour qu quand que quel quelle qui s sa sans se ses si son sont sur
+t ta te tes toi ton tous tout très tu un une vos votre vous y euh ben bah bon alors voilà genre truc
+aussi encore souvent maintenant déjà vraiment bien merci bonjour parlons côté serait seraient pourrait
+pourraient devrait devraient faudrait aimerais voudrais veux voudrait veut aime
+""".split())
+
+_WORD_RE = re.compile(r"[0-9a-zà-öø-ÿœæ]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Mots en minuscules, sans mots vides."""
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in STOPWORDS and len(w) > 1]
+
+
+# -------------------------
+# #️⃣ Backend haché (défaut)
+# -------------------------
+class HashingEmbedder:
+    """
+    Vecteur TF sous-linéaire de caractéristiques hachées :
+    mots (poids 1), bigrammes de mots (poids 1) et n-grammes de caractères
+    à l'intérieur des mots (poids 0.3, rapprochent « alerte » / « alertes » / « alerter »).
+    """
+
+    def __init__(self, dim: int = 2048, char_ngrams: tuple[int, ...] = (3, 4)):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+        self.key = f"hashing-{dim}-{'-'.join(map(str, char_ngrams))}"
+
+    def _features(self, text: str) -> dict[int, float]:
+        words = tokenize(text)
+        feats: dict[int, float] = {}
+
+        def add(feature: str, weight: float):
+            h = zlib.crc32(feature.encode("utf-8")) % self.dim
+            feats[h] = feats.get(h, 0.0) + weight
+
+        for w in words:
+            add(f"w:{w}", 1.0)
+            padded = f"<{w}>"
+            for n in self.char_ngrams:
+                for i in range(len(padded) - n + 1):
+                    add(f"c:{padded[i:i + n]}", 0.3)
+        for a, b in zip(words, words[1:]):
+            add(f"b:{a} {b}", 1.0)
+        return feats
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for col, count in self._features(text).items():
+                out[row, col] = 1.0 + np.log(count) if count >= 1 else count
+        return _l2_normalize(out)
+
+
+# -------------------------
+# 🤖 Backend modèle local (optionnel)
+# -------------------------
+class SentenceTransformerEmbedder:
+    """Modèle sentence-transformers chargé depuis le cache local uniquement (pas de téléchargement)."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        self.model = SentenceTransformer(model_name, device="cpu", local_files_only=True)
+        self.key = f"st-{model_name}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=32, show_progress_bar=False, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def get_embedder(backend: str | None = None):
+    """Backend d'embeddings configuré ; repli sur "hashing" si le modèle local est indisponible."""
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "sentence-transformers":
+        if SentenceTransformer is None:
+            warn("sentence-transformers non installé : repli sur les embeddings hachés", event="embeddings_fallback")
+        else:
+            try:
+                return SentenceTransformerEmbedder()
+            except Exception as e:  # modèle absent du cache local
+                warn(f"Modèle d'embeddings indisponible ({e}) : repli sur les embeddings hachés",
+                     event="embeddings_fallback")
+    elif backend != "hashing":
+        raise ValueError(f"❌ Backend d'embeddings inconnu : {backend} (attendu : hashing, sentence-transformers)")
+    return HashingEmbedder()
+
+
+# -------------------------
+# 🗄️ Cache de vecteurs par session
+# -------------------------
+class VectorStore:
+    """
+    Cache texte → vecteur d'une session, persistant dans un `.npz` si `path` est fourni
+    (sinon en mémoire seulement). Partageable entre threads.
+    """
+
+    def __init__(self, path: str | Path | None = None, embedder=None):
+        self.path = Path(path) if path else None
+        self.embedder = embedder or get_embedder()
+        self.computed = 0
+        self._lock = threading.Lock()
+        self._rows: dict[str, int] = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        if self.path and self.path.exists():
+            data = np.load(self.path, allow_pickle=False)
+            if str(data["backend"]) == self.embedder.key:
+                self._rows = {key: i for i, key in enumerate(data["keys"].tolist())}
+                self._vectors = data["vectors"]
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Vecteurs (normalisés L2) des textes, dans l'ordre ; seuls les textes inconnus sont calculés."""
+        keys = [self._key(t) for t in texts]
+        with self._lock:
+            missing = list(dict.fromkeys(k for k in keys if k not in self._rows))
+            if missing:
+                first_text = dict(zip(keys, texts))
+                fresh = self.embedder.embed([first_text[k] for k in missing])
+                base = len(self._rows)
+                self._vectors = fresh if base == 0 else np.vstack([self._vectors, fresh])
+                self._rows.update({k: base + i for i, k in enumerate(missing)})
+                self.computed += len(missing)
+                self._save()
+            if not keys:
+                return np.zeros((0, self._vectors.shape[1] if self._vectors.size else 0), dtype=np.float32)
+            return self._vectors[[self._rows[k] for k in keys]]
+
+    def _save(self):
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.stem + ".tmp.npz")
+        keys = sorted(self._rows, key=self._rows.get)
+        np.savez(tmp, backend=np.array(self.embedder.key), keys=np.array(keys), vectors=self._vectors)
+        os.replace(tmp, self.path)
+
+
+# -------------------------
+# 📐 Pondération et similarité
+# -------------------------
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def tfidf_weight(matrix: np.ndarray) -> np.ndarray:
+    """
+    Pondère des vecteurs TF par l'IDF calculée sur le lot lui-même (les caractéristiques
+    présentes partout, comme « en tant qu'utilisateur », pèsent moins), puis renormalise.
+    Sans effet notable sur des embeddings denses de modèle.
+    """
+    if len(matrix) == 0:
+        return matrix
+    df = (matrix != 0).sum(axis=0)
+    idf = np.log((1 + len(matrix)) / (1 + df)) + 1.0
+    return _l2_normalize(matrix * idf.astype(np.float32))
@@ -2,40 +2,85 @@
 exporter.py
 -----------
 Module responsable de l'export du backlog généré par l'IA.
-Permet d'exporter les User Stories au format Markdown et CSV.
+Permet d'exporter les User Stories au format Markdown, CSV, JSON Lines et Parquet.
 Fait partie du projet : AI Scrum PO Assistant
 Auteur : Djamil
+
+Les exports acceptent n'importe quel itérable (liste, générateur, BacklogStore.iter_stories)
+et écrivent au fil de l'eau dans un fichier bufferisé : la mémoire reste constante quelle
+que soit la taille du backlog. `compress=True` produit un fichier gzip (`.md.gz`, `.csv.gz`,
+`.jsonl.gz`) ; pour Parquet, la compression gzip est celle des pages du fichier.
+
+Usage : python -m backlog_generator.exporter --format jsonl --gzip [--session <id>]
 """
 
 import os
-from typing import List, Dict
-from datetime import datetime
 import csv
+import gzip
+import json
+import argparse
+from typing import Dict, Iterable, Iterator, List
+from datetime import datetime
+from itertools import islice
+
+EXTENSIONS = {"markdown": "md", "csv": "csv", "jsonl": "jsonl", "parquet": "parquet"}
+CSV_FIELDS = ["ID", "Idea", "User Story", "Priority", "Acceptance Criteria"]
+WRITE_BUFFER = 1 << 20
+GZIP_LEVEL = 3
+PARQUET_BATCH_SIZE = 10_000
+
+
+# -----------------------------
+# 🧰 Fichiers de sortie
+# -----------------------------
+def _output_path(output_dir: str, fmt: str, compress: bool = False) -> str:
+    os.makedirs(output_dir, exist_ok=True)
+    suffix = ".gz" if compress and fmt != "parquet" else ""
+    return f"{output_dir}/user_stories_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{EXTENSIONS[fmt]}{suffix}"
+
+
+def _open_output(filename: str, compress: bool = False, newline: str | None = None):
+    """Fichier texte UTF-8 bufferisé, compressé gzip si demandé."""
+    if compress:
+        return gzip.open(filename, "wt", encoding="utf-8", newline=newline, compresslevel=GZIP_LEVEL)
+    return open(filename, "w", encoding="utf-8", newline=newline, buffering=WRITE_BUFFER)
+
+
+def _criteria(story: Dict) -> List[str]:
+    criteria = story.get("acceptance_criteria") or []
+    return [criteria] if isinstance(criteria, str) else list(criteria)
+
+
+def _batches(stories: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    iterator = iter(stories)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 
 # -----------------------------
 # 🧩 1️⃣ Export au format Markdown
 # -----------------------------
 
-def export_to_markdown(stories: List[Dict], output_dir: str = "exports") -> str:
+def export_to_markdown(stories: Iterable[Dict], output_dir: str = "exports", compress: bool = False) -> str:
     """
     Exporte les User Stories générées dans un fichier Markdown.
     """
-    os.makedirs(output_dir, exist_ok=True)
-    filename = f"{output_dir}/user_stories_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+    filename = _output_path(output_dir, "markdown", compress)
 
-    with open(filename, "w", encoding="utf-8") as f:
+    with _open_output(filename, compress) as f:
         f.write("# 📘 Backlog généré automatiquement\n\n")
         f.write(f"_Date de génération : {datetime.now().strftime('%d/%m/%Y %H:%M')}_\n\n")
 
         for i, s in enumerate(stories, start=1):
-            f.write(f"## 🧩 User Story {i}\n")
-            f.write(f"**Idée :** {s.get('idea', 'Non spécifiée')}\n\n")
-            f.write(f"**User Story :** {s.get('user_story', 'Non générée')}\n\n")
-            f.write(f"**Priorité :** {s.get('priority', 'Non définie')}\n\n")
-            f.write("**Critères d’acceptation :**\n")
-            for c in s.get("acceptance_criteria", []):
-                f.write(f"- {c}\n")
-            f.write("\n---\n\n")
+            criteria = "".join(f"- {c}\n" for c in _criteria(s))
+            f.write(
+                f"## 🧩 User Story {i}\n"
+                f"**Idée :** {s.get('idea', 'Non spécifiée')}\n\n"
+                f"**User Story :** {s.get('user_story', 'Non générée')}\n\n"
+                f"**Priorité :** {s.get('priority', 'Non définie')}\n\n"
+                "**Critères d’acceptation :**\n"
+                f"{criteria}\n---\n\n"
+            )
 
     print(f"✅ Fichier Markdown généré : {filename}")
     return filename
@@ -44,26 +89,120 @@ def export_to_markdown(stories: List[Dict], output_dir: str = "exports") -> str:
 # 🧩 2️⃣ Export au format CSV
 # -----------------------------
 
-def export_to_csv(stories: List[Dict], output_dir: str = "exports") -> str:
+def export_to_csv(stories: Iterable[Dict], output_dir: str = "exports", compress: bool = False) -> str:
     """
     Exporte les User Stories générées dans un fichier CSV.
     """
-    os.makedirs(output_dir, exist_ok=True)
-    filename = f"{output_dir}/user_stories_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    filename = _output_path(output_dir, "csv", compress)
 
-    with open(filename, "w", encoding="utf-8", newline="") as csvfile:
-        fieldnames = ["ID", "Idea", "User Story", "Priority", "Acceptance Criteria"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    with _open_output(filename, compress, newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(
+            (i, s.get("idea", ""), s.get("user_story", ""), s.get("priority", ""), " | ".join(_criteria(s)))
+            for i, s in enumerate(stories, start=1)
+        )
 
-        for i, s in enumerate(stories, start=1):
-            writer.writerow({
-                "ID": i,
-                "Idea": s.get("idea", ""),
-                "User Story": s.get("user_story", ""),
-                "Priority": s.get("priority", ""),
-                "Acceptance Criteria": " | ".join(s.get("acceptance_criteria", [])),
+    print(f"✅ Fichier CSV généré : {filename}")
+    return filename
+
+# -----------------------------
+# 🧩 3️⃣ Export au format JSON Lines
+# -----------------------------
+
+def export_to_jsonl(stories: Iterable[Dict], output_dir: str = "exports", compress: bool = False) -> str:
+    """
+    Exporte les User Stories complètes, une par ligne JSON (tous les champs conservés).
+    """
+    filename = _output_path(output_dir, "jsonl", compress)
+
+    with _open_output(filename, compress) as f:
+        for s in stories:
+            f.write(json.dumps(s, ensure_ascii=False, default=str))
+            f.write("\n")
+
+    print(f"✅ Fichier JSON Lines généré : {filename}")
+    return filename
+
+# -----------------------------
+# 🧩 4️⃣ Export au format Parquet
+# -----------------------------
+
+def export_to_parquet(
+    stories: Iterable[Dict], output_dir: str = "exports", compress: bool = False,
+    batch_size: int = PARQUET_BATCH_SIZE,
+) -> str:
+    """
+    Exporte les User Stories dans un fichier Parquet, un row group par lot de `batch_size` US
+    (DataFrame pandas converti par pyarrow). Colonnes : celles du CSV + thème et pertinence.
+    """
+    import pandas as pd
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("❌ Export Parquet indisponible : installer pyarrow (pip install pyarrow)") from None
+
+    filename = _output_path(output_dir, "parquet", compress)
+    schema = pa.schema([
+        ("id", pa.int64()), ("theme", pa.string()), ("idea", pa.string()), ("user_story", pa.string()),
+        ("priority", pa.string()), ("relevance_score", pa.float64()),
+        ("acceptance_criteria", pa.list_(pa.string())),
+    ])
+    count = 0
+    with pq.ParquetWriter(filename, schema, compression="gzip" if compress else "snappy") as writer:
+        for batch in _batches(stories, batch_size):
+            frame = pd.DataFrame({
+                "id": range(count + 1, count + len(batch) + 1),
+                "theme": [s.get("theme", "") for s in batch],
+                "idea": [s.get("idea", "") for s in batch],
+                "user_story": [s.get("user_story", "") for s in batch],
+                "priority": [s.get("priority", "") for s in batch],
+                "relevance_score": [s.get("relevance_score") for s in batch],
+                "acceptance_criteria": [[str(c) for c in _criteria(s)] for s in batch],
             })
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            count += len(batch)
 
-    print(f"✅ Fichier CSV généré : {filename}")
+    print(f"✅ Fichier Parquet généré : {filename}")
     return filename
+
+
+EXPORTERS = {
+    "markdown": export_to_markdown,
+    "csv": export_to_csv,
+    "jsonl": export_to_jsonl,
+    "parquet": export_to_parquet,
+}
+
+
+def export_stories(stories: Iterable[Dict], fmt: str = "markdown", output_dir: str = "exports",
+                   compress: bool = False) -> str:
+    """Exporte dans le format demandé (markdown, csv, jsonl, parquet) et retourne le chemin du fichier."""
+    if fmt not in EXPORTERS:
+        raise ValueError(f"❌ Format d'export inconnu : {fmt} (attendu : {', '.join(EXPORTERS)})")
+    return EXPORTERS[fmt](stories, output_dir=output_dir, compress=compress)
+
+
+# -----------------------------
+# 🖥️ CLI : export du backlog persistant
+# -----------------------------
+def main():
+    from .backlog_store import get_backlog_store
+
+    parser = argparse.ArgumentParser(description="Exporte le backlog persistant (flux constant en mémoire)")
+    parser.add_argument("--format", choices=list(EXPORTERS), default="markdown")
+    parser.add_argument("--output-dir", default="exports")
+    parser.add_argument("--gzip", action="store_true", help="Compresse la sortie (gzip)")
+    parser.add_argument("--session", dest="session_id", help="Limite l'export à une session")
+    parser.add_argument("--theme")
+    parser.add_argument("--priority")
+    args = parser.parse_args()
+
+    filters = {k: v for k, v in {"session_id": args.session_id, "theme": args.theme, "priority": args.priority}.items() if v}
+    export_stories(get_backlog_store().iter_stories(**filters), args.format, args.output_dir, args.gzip)
+
+
+if __name__ == "__main__":
+    main()
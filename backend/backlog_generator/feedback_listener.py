@@ -8,21 +8,19 @@ Analyse un texte (issu d'un feedback ou d'une transcription audio)
 """
 
 import os
-from typing import Dict, List
-from groq import Groq
-from dotenv import load_dotenv
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, List
 
-from .generator import generate_user_story
+from .backlog_store import record_stories
+from .generator import generate_user_stories_batch
 from .jira_client import export_user_stories_to_jira
+from .jira_ledger import SyncLedger
+from .llm_client import chat_completion
+from .storage import DATA_DIR
 
-
-# Charger les variables d’environnement
-env_path = Path(__file__).resolve().parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
-
-# Initialiser le client Groq
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Registre Jira partagé des jobs "text" (une portée par job : une relance ne recrée pas les tickets)
+TEXT_JOBS_JIRA_LEDGER_PATH = Path(os.getenv("TEXT_JOBS_JIRA_LEDGER_PATH", str(DATA_DIR / "text_jobs_jira.sqlite")))
 
 # -------------------------
 # 🧠 1️⃣ Extraction d'idées multiples depuis un texte
@@ -47,16 +45,13 @@ def extract_ideas_from_text(feedback_text: str) -> List[str]:
     - Idée 3 : ...
     """
 
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
+    text = chat_completion(
         messages=[
             {"role": "system", "content": "Tu es un assistant produit expert qui extrait des besoins utilisateurs clairs à partir d’un texte libre."},
             {"role": "user", "content": prompt}
         ],
         temperature=0.5,
-    )
-
-    text = response.choices[0].message.content.strip()
+    ).strip()
 
     # Nettoyer les idées extraites
     ideas = []
@@ -73,17 +68,29 @@ def extract_ideas_from_text(feedback_text: str) -> List[str]:
 # -------------------------
 # ⚙️ 2️⃣ Pipeline complet : texte → idées → US → Jira
 # -------------------------
-def process_text_feedback(feedback_text: str, push_to_jira: bool = False) -> List[Dict]:
+def process_text_feedback(
+    feedback_text: str, push_to_jira: bool = False, progress=None, session_id: str | None = None,
+    jira_ledger: SyncLedger | None = None,
+) -> List[Dict]:
     """
     Exécute le pipeline complet :
       - Extraction d'idées
       - Génération des User Stories
-      - Export Jira (si activé)
+      - Consolidation avec le backlog persistant puis enregistrement
+      - Export Jira des seules US nouvelles (si activé)
+    `progress(event, **data)` : notifié à la fin de chaque étape (suivi d'un job).
+    `session_id` : identifiant du feedback dans le backlog (défaut : horodatage).
+    `jira_ledger` : registre de synchronisation Jira (une relance ne recrée pas les tickets déjà poussés).
     """
+    def notify(event: str, **data):
+        if progress is not None:
+            progress(event, **data)
+
     print("\n🚀 Lancement du traitement IA...")
 
     # Étape 1 : Extraction d'idées
     ideas = extract_ideas_from_text(feedback_text)
+    notify("stage_completed", stage="ideas", items=len(ideas))
     print(f"\n💡 {len(ideas)} idée(s) détectée(s) :")
     for i, idea in enumerate(ideas, start=1):
         print(f"   {i}. {idea}")
@@ -95,19 +102,41 @@ def process_text_feedback(feedback_text: str, push_to_jira: bool = False) -> Lis
     # Étape 2 : Génération des User Stories
     print("\n🧩 Génération des User Stories correspondantes...\n")
     stories = []
-    for idea in ideas:
-        story = generate_user_story(idea)
+    for idea, story in zip(ideas, generate_user_stories_batch(ideas)):
         story["idea"] = idea
         stories.append(story)
         print(f"✅ {story['user_story']}\n")
 
+    notify("stage_completed", stage="stories", items=len(stories))
     print(f"🎯 Génération terminée — {len(stories)} User Stories produites.\n")
+    session_id = session_id or datetime.now().strftime("text_%Y-%m-%d_%H%M%S")
+    decisions = record_stories(session_id, stories, source="text")
+    to_export = stories if decisions is None else [s for s, d in zip(stories, decisions) if d["decision"] == "new"]
 
     # Étape 3 : Export Jira
-    if push_to_jira:
+    if push_to_jira and to_export:
         print("🚀 Export des User Stories vers Jira...\n")
-        export_user_stories_to_jira(stories)
+        export_user_stories_to_jira(to_export, ledger=jira_ledger)
     else:
         print("ℹ️ Export Jira désactivé (push_to_jira=False).\n")
 
     return stories
+
+
+# -------------------------
+# 📥 3️⃣ Traitement via la file de jobs
+# -------------------------
+def text_job(payload: dict, ctx) -> dict:
+    """Handler du job "text" (file de jobs) : feedback écrit → User Stories."""
+    push_to_jira = payload.get("push_to_jira", False)
+    session_id = f"text_job_{ctx.job.id}"
+    ledger = SyncLedger(TEXT_JOBS_JIRA_LEDGER_PATH) if push_to_jira else None
+    try:
+        stories = process_text_feedback(
+            payload["text"], push_to_jira=push_to_jira, progress=ctx.event, session_id=session_id,
+            jira_ledger=ledger.scoped(session_id) if ledger is not None else None,
+        )
+    finally:
+        if ledger is not None:
+            ledger.close()
+    return {"user_story_count": len(stories), "user_stories": stories}
@@ -7,19 +7,16 @@ Auteur : Djamil
 """
 
 import os
-import time
+import re
+import json
 from typing import List, Dict
-from dotenv import load_dotenv
-from pathlib import Path
-from groq import Groq
 
-# -------------------------
-# ⚙️ Configuration environnement
-# -------------------------
-env_path = Path(__file__).resolve().parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
+from .llm_client import chat_completion
+
+# Nombre d'idées envoyées dans une même requête de génération groupée
+GENERATION_BATCH_SIZE = int(os.getenv("GENERATION_BATCH_SIZE", "8"))
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+PRIORITIES = ("Haute", "Moyenne", "Basse")
 
 # -------------------------
 # 🧩 1️⃣ Génération d'une seule User Story
@@ -47,16 +44,13 @@ Critères d’acceptation :
 Priorité : Haute / Moyenne / Basse
     """
 
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
+    text = chat_completion(
         messages=[
             {"role": "system", "content": "Tu es un assistant agile qui rédige des User Stories professionnelles et bien structurées."},
             {"role": "user", "content": prompt}
         ],
         temperature=0.5,
-    )
-
-    text = response.choices[0].message.content.strip()
+    ).strip()
     lines = [l.strip() for l in text.split("\n") if l.strip()]
 
     user_story = ""
@@ -92,23 +86,22 @@ Priorité : Haute / Moyenne / Basse
             "La fonctionnalité répond à un besoin utilisateur concret."
         ]
 
-    # ✅ Génération d’un résumé lisible pour Jira
-    summary = ""
-    if "je veux" in user_story.lower():
-        try:
-            summary = user_story.split("je veux", 1)[1].split("afin")[0].strip().capitalize()
-        except Exception:
-            summary = idea.capitalize()
-    else:
-        summary = idea.capitalize()
-
     return {
-        "summary": summary,
+        "summary": _summary_from(user_story, idea),
         "user_story": user_story or f"En tant qu’utilisateur, je veux {idea.lower()} afin d’obtenir une valeur ajoutée.",
         "acceptance_criteria": criteria,
         "priority": priority,
     }
 
+def _summary_from(user_story: str, idea: str) -> str:
+    """Résumé lisible pour Jira : l'objectif (« je veux … ») de la User Story."""
+    if "je veux" in user_story.lower():
+        try:
+            return user_story.split("je veux", 1)[1].split("afin")[0].strip().capitalize()
+        except Exception:
+            return idea.capitalize()
+    return idea.capitalize()
+
 # -------------------------
 # 🧩 2️⃣ Génération en lot (plusieurs idées)
 # -------------------------
@@ -116,41 +109,138 @@ Priorité : Haute / Moyenne / Basse
 def generate_user_stories(ideas: List[str]) -> List[Dict]:
     """
     Génère plusieurs User Stories à partir d'une liste d'idées.
-    Appelle generate_user_story() pour chacune.
+    Les idées sont envoyées par lots (generate_user_stories_batch).
     """
-    all_stories = []
     total = len(ideas)
     print(f"🧠 Génération de {total} User Stories via Groq...\n")
 
-    for i, idea in enumerate(ideas, start=1):
+    stories = generate_user_stories_batch(ideas, raise_errors=False)
+    all_stories = []
+    for i, (idea, story) in enumerate(zip(ideas, stories), start=1):
         print(f"➡️ ({i}/{total}) Idée : {idea}")
-        try:
-            story = generate_user_story(idea)
-            all_stories.append({"idea": idea, **story})
-            print(f"   ✅ Générée ({story['priority']}) : {story['summary']}\n")
-        except Exception as e:
-            print(f"   ❌ Erreur sur '{idea}' : {e}\n")
+        if story is None:
+            print(f"   ❌ Erreur sur '{idea}'\n")
             all_stories.append({
                 "idea": idea,
                 "user_story": "",
                 "acceptance_criteria": [],
                 "priority": "Erreur"
             })
-        time.sleep(1)
+            continue
+        all_stories.append({"idea": idea, **story})
+        print(f"   ✅ Générée ({story['priority']}) : {story['summary']}\n")
 
     print("🎯 Génération terminée.")
     return all_stories
 
+
+def generate_user_stories_batch(
+    ideas: List[str],
+    batch_size: int | None = None,
+    raise_errors: bool = True,
+) -> List[Dict | None]:
+    """
+    Génère US + critères + priorité + titre court pour plusieurs idées
+    en UNE requête JSON par lot de `batch_size` idées (au lieu de deux appels par idée).
+    Chaque élément de la réponse est validé ; seules les idées invalides ou absentes
+    sont redemandées individuellement (generate_user_story + generate_short_title).
+    Le résultat suit l'ordre des idées ; avec `raise_errors=False`, une idée en échec vaut None.
+    """
+    size = max(1, batch_size or GENERATION_BATCH_SIZE)
+    results: List[Dict | None] = []
+    for start in range(0, len(ideas), size):
+        chunk = ideas[start:start + size]
+        parsed = _request_batch(chunk)
+        for idea, story in zip(chunk, parsed):
+            if story is None:
+                story = _generate_single(idea, raise_errors)
+            results.append(story)
+    return results
+
+
+def _request_batch(ideas: List[str]) -> List[Dict | None]:
+    """Une requête pour tout le lot ; None pour chaque idée sans réponse valide."""
+    numbered = "\n".join(f"{i}. {idea}" for i, idea in enumerate(ideas, start=1))
+    prompt = f"""
+Tu es un Product Owner expert en agilité.
+Pour CHACUNE des idées numérotées ci-dessous, rédige une User Story exploitable.
+
+Idées :
+{numbered}
+
+Pour chaque idée, fournis :
+- "id" : le numéro de l'idée
+- "user_story" : « En tant que [type d’utilisateur], je veux [objectif] afin de [bénéfice]. »
+- "acceptance_criteria" : trois à cinq critères mesurables et vérifiables
+- "priority" : "Haute", "Moyenne" ou "Basse"
+- "title" : titre court et explicite (5 à 10 mots max), sans "En tant que" ni "afin de"
+
+Réponds STRICTEMENT en JSON valide au format :
+{{"stories":[{{"id":1,"user_story":"...","acceptance_criteria":["..."],"priority":"Moyenne","title":"..."}}]}}
+    """
+    try:
+        raw = chat_completion(
+            messages=[
+                {"role": "system", "content": "Tu es un assistant agile qui rédige des User Stories professionnelles. Réponds UNIQUEMENT en JSON valide."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.5,
+            max_tokens=300 * len(ideas) + 200,
+        )
+        match = re.search(r"\{.*\}", raw, re.DOTALL)
+        items = json.loads(match.group(0) if match else raw).get("stories", [])
+    except Exception as e:
+        print(f"⚠️ Réponse groupée inexploitable ({e}) : génération idée par idée.")
+        return [None] * len(ideas)
+
+    by_id = {}
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("id"), int):
+            by_id.setdefault(item["id"], item)
+    return [_validate_item(by_id.get(i), idea) for i, idea in enumerate(ideas, start=1)]
+
+
+def _validate_item(item: Dict | None, idea: str) -> Dict | None:
+    """Élément de réponse groupée → US normalisée, ou None s'il est incomplet."""
+    if not item:
+        return None
+    user_story = str(item.get("user_story") or "").strip().strip("–-• ").strip()
+    criteria = [
+        str(c).lstrip("-•1234567890. ").strip()
+        for c in item.get("acceptance_criteria") or []
+        if isinstance(c, str) and c.strip()
+    ]
+    priority = str(item.get("priority") or "").strip().capitalize()
+    title = _clean_title(str(item.get("title") or ""))
+    if not user_story.lower().startswith("en tant") or "je veux" not in user_story.lower():
+        return None
+    if not criteria or priority not in PRIORITIES or not title or len(title.split()) > 12:
+        return None
+    return {
+        "summary": _summary_from(user_story, idea),
+        "user_story": user_story,
+        "acceptance_criteria": criteria,
+        "priority": priority,
+        "title": title,
+    }
+
+
+def _generate_single(idea: str, raise_errors: bool = True) -> Dict | None:
+    """Repli individuel (deux appels) pour une idée rejetée par la validation du lot."""
+    try:
+        story = generate_user_story(idea)
+        return {**story, "title": generate_short_title(story["user_story"])}
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"   ❌ Erreur sur '{idea}' : {e}")
+        return None
+
 def generate_short_title(user_story_text: str) -> str:
     """
     Génère un titre court et clair à partir d'une User Story complète,
     en se basant sur son intention principale.
     """
-    from groq import Groq
-    import os
-
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
     prompt = f"""
     Voici une User Story :
     ---
@@ -164,15 +254,15 @@ def generate_short_title(user_story_text: str) -> str:
       → "Alerte météo automatique"
     """
 
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
+    title = chat_completion(
         messages=[
             {"role": "system", "content": "Tu es un expert Jira et rédacteur de backlog agile."},
             {"role": "user", "content": prompt}
         ],
         temperature=0.4,
-    )
+    ).strip()
+    return _clean_title(title)
+
 
-    title = response.choices[0].message.content.strip()
-    title = title.replace('"', '').replace("'", "")
-    return title
+def _clean_title(title: str) -> str:
+    return title.strip().replace('"', '').replace("'", "")
@@ -2,14 +2,29 @@
 jira_client.py
 --------------
 Gestion de la création automatique de User Stories dans Jira Cloud.
+
+- une session HTTP persistante (keep-alive) partagée par tous les appels
+- création en masse via /rest/api/3/issue/bulk (lots de 50 au plus) :
+  seuls les éléments en échec transitoire (429 / 5xx) sont renvoyés
+- mode concurrent (une requête par US) à concurrence adaptative AIMD :
+  montée en charge jusqu'aux 429, respect de `Retry-After`, clés dans l'ordre des US
+- export idempotent avec un registre de synchronisation (jira_ledger.SyncLedger) :
+  US inchangées ignorées, US modifiées mises à jour, reprise après interruption
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from pathlib import Path
 import time
 
+from .jira_ledger import SyncLedger, content_hash, story_identities
+from .rate_limit import AdaptiveConcurrency, retry_after_seconds, retry_delay
+
 # -------------------------
 # 🔧 Chargement de la configuration Jira
 # -------------------------
@@ -21,6 +36,13 @@ JIRA_EMAIL = os.getenv("JIRA_EMAIL")  # <-- on standardise sur JIRA_EMAIL
 JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
 JIRA_PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY")
 
+JIRA_BULK_SIZE = 50          # maximum accepté par l'endpoint bulk de Jira Cloud
+JIRA_MAX_ATTEMPTS = int(os.getenv("JIRA_MAX_ATTEMPTS", "4"))
+JIRA_POOL_SIZE = int(os.getenv("JIRA_POOL_SIZE", "16"))  # connexions keep-alive = concurrence max.
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
 def _ensure_config():
     missing = [k for k, v in {
         "JIRA_URL": JIRA_URL,
@@ -32,6 +54,47 @@ def _ensure_config():
         raise RuntimeError(f"Variables d'environnement manquantes: {', '.join(missing)}. "
                            f"Vérifie ton fichier .env à la racine du projet ({ENV_PATH}).")
 
+def _config_ok() -> bool:
+    if not all([JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN, JIRA_PROJECT_KEY]):
+        print("❌ Variables d'environnement Jira manquantes. Vérifie ton .env.")
+        return False
+    return True
+
+
+def get_session() -> requests.Session:
+    """Session HTTP partagée (pool de connexions keep-alive, authentification et en-têtes fixés)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=JIRA_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
+            _session = session
+        _session.auth = (JIRA_EMAIL, JIRA_API_TOKEN)
+        return _session
+
+
+def _issue_fields(summary: str, description_md: str) -> dict:
+    return {
+        "project": {"key": JIRA_PROJECT_KEY},
+        "summary": summary,
+        "issuetype": {"name": "Story"},
+        "description": {
+            "type": "doc",
+            "version": 1,
+            "content": [
+                {
+                    "type": "paragraph",
+                    "content": [
+                        {"type": "text", "text": description_md}
+                    ]
+                }
+            ]
+        }
+    }
+
 # -------------------------
 # 🧱 Création d'une User Story unique
 # -------------------------
@@ -39,38 +102,15 @@ def create_jira_issue(summary: str, description_md: str):
     """
     Crée une User Story dans Jira Cloud avec description en format texte.
     """
-    if not all([JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN, JIRA_PROJECT_KEY]):
-        print("❌ Variables d'environnement Jira manquantes. Vérifie ton .env.")
+    if not _config_ok():
         return None
+    return create_issue(_issue_fields(summary, description_md))
 
-    url = f"{JIRA_URL}/rest/api/3/issue"
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
-    auth = (JIRA_EMAIL, JIRA_API_TOKEN)
-
-    payload = {
-        "fields": {
-            "project": {"key": JIRA_PROJECT_KEY},
-            "summary": summary,
-            "issuetype": {"name": "Story"},
-            "description": {
-                "type": "doc",
-                "version": 1,
-                "content": [
-                    {
-                        "type": "paragraph",
-                        "content": [
-                            {"type": "text", "text": description_md}
-                        ]
-                    }
-                ]
-            }
-        }
-    }
 
-    response = requests.post(url, json=payload, headers=headers, auth=auth)
+def create_issue(fields: dict) -> str | None:
+    """POST /rest/api/3/issue sur la session partagée ; retourne la clé créée (ou None)."""
+    url = f"{JIRA_URL}/rest/api/3/issue"
+    response = get_session().post(url, json={"fields": fields})
 
     if response.status_code == 201:
         issue_key = response.json()["key"]
@@ -80,56 +120,251 @@ def create_jira_issue(summary: str, description_md: str):
         return None
 
 
+def update_issue(issue_key: str, fields: dict) -> bool:
+    """PUT /rest/api/3/issue/{key} : remplace résumé et description (projet et type inchangés)."""
+    url = f"{JIRA_URL}/rest/api/3/issue/{issue_key}"
+    editable = {k: v for k, v in fields.items() if k not in ("project", "issuetype")}
+    try:
+        response = get_session().put(url, json={"fields": editable})
+    except requests.RequestException as e:
+        print(f"❌ Jira injoignable : {e}")
+        return False
+    if response.status_code == 204:
+        return True
+    print(f"❌ Erreur Jira ({response.status_code}) sur {issue_key} : {response.text}")
+    return False
+
+
 # -------------------------
-# 🚀 Export en lot vers Jira
+# ⚡ Création concurrente adaptative
 # -------------------------
-def export_user_stories_to_jira(stories):
+def _create_adaptive(fields: dict, limiter: AdaptiveConcurrency) -> str | None:
+    """Crée une issue sous le contrôle du limiteur AIMD ; 429 / 5xx / réseau → nouvelle tentative."""
+    url = f"{JIRA_URL}/rest/api/3/issue"
+    for attempt in range(JIRA_MAX_ATTEMPTS):
+        ticket = limiter.acquire()
+        try:
+            response = get_session().post(url, json={"fields": fields})
+        except requests.RequestException as e:
+            limiter.release(ticket, throttled=True)
+            print(f"❌ Jira injoignable : {e}")
+            time.sleep(retry_delay(attempt))
+            continue
+
+        if response.status_code == 429 or response.status_code >= 500:
+            wait = retry_after_seconds(response.headers)
+            limiter.release(ticket, throttled=True, retry_after=wait)
+            if wait is None:  # pas de consigne du serveur : backoff local
+                time.sleep(retry_delay(attempt))
+            continue
+
+        limiter.release(ticket)
+        if response.status_code == 201:
+            return response.json()["key"]
+        print(f"❌ Erreur Jira ({response.status_code}) : {response.text}")
+        return None
+
+    print(f"❌ Abandon après {JIRA_MAX_ATTEMPTS} tentatives : {fields.get('summary')}")
+    return None
+
+
+def create_issues_concurrently(
+    issue_fields: list[dict],
+    limiter: AdaptiveConcurrency | None = None,
+    max_workers: int = JIRA_POOL_SIZE,
+    on_created: Callable[[int, str], None] | None = None,
+) -> list[str | None]:
     """
-    Exporte plusieurs User Stories vers Jira.
-    stories : liste d'objets { idea, user_story, acceptance_criteria, priority }
+    Crée les issues une par une mais en parallèle (au plus `max_workers` threads),
+    la concurrence effective étant pilotée par `limiter` (AIMD).
+    `on_created(index, clé)` est appelé dès qu'une issue est créée (depuis le thread qui l'a créée).
+    Retourne les clés dans l'ordre des entrées (None en cas d'échec).
     """
-    created_issues = []
-    print("🚀 Export des User Stories vers Jira...\n")
+    limiter = limiter or AdaptiveConcurrency(maximum=max_workers)
 
-    for i, s in enumerate(stories, start=1):
-       # 🧠 Titre prioritaire généré par le modèle
-        summary = (s.get("title") or "").strip()
+    def create(index: int, fields: dict) -> str | None:
+        issue_key = _create_adaptive(fields, limiter)
+        if issue_key and on_created is not None:
+            on_created(index, issue_key)
+        return issue_key
 
-        # Si vide, fallback sur l'idée ou la première phrase de l'US
-        if not summary:
-            summary = s.get("idea", "").strip() or s.get("user_story", "").split(".")[0]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(create, range(len(issue_fields)), issue_fields))
 
-        #   Limitation et nettoyage
-        summary = summary.strip()
-        if len(summary) > 250:
-            summary = summary[:247] + "..."
-        if not summary:
-            summary = "User Story sans titre"
 
-        description_md = (
-            f"## 🎯 User Story\n"
-            f"{s['user_story']}\n\n"
-            f"## 💡 Idée d’origine\n"
-            f"{s.get('idea', '—')}\n\n"
-            f"## ✅ Critères d’acceptation\n"
-            + "\n".join(f"- {c}" for c in s.get("acceptance_criteria", []))
-            + f"\n\n⭐ **Priorité : {s.get('priority', 'Non définie')}**"
-        )
+# -------------------------
+# 📦 Création en masse
+# -------------------------
+def bulk_create_issues(issue_fields: list[dict], batch_size: int = JIRA_BULK_SIZE) -> list[str | None]:
+    """
+    Crée les issues par lots via /rest/api/3/issue/bulk.
+    Retourne les clés dans l'ordre des entrées (None pour un élément définitivement en échec).
+    Une réponse partielle indique les éléments rejetés (`failedElementNumber`) :
+    seuls ceux en erreur transitoire (429 / 5xx) sont renvoyés, avec backoff.
+    """
+    keys: list[str | None] = [None] * len(issue_fields)
+    for start in range(0, len(issue_fields), batch_size):
+        pending = list(range(start, min(start + batch_size, len(issue_fields))))
+        for attempt in range(JIRA_MAX_ATTEMPTS):
+            pending, wait = _post_bulk(issue_fields, pending, keys)
+            if not pending:
+                break
+            if attempt < JIRA_MAX_ATTEMPTS - 1:
+                delay = retry_delay(attempt, wait)
+                print(f"   🔁 {len(pending)} élément(s) à renvoyer dans {delay:.1f} s")
+                time.sleep(delay)
+    return keys
+
 
+def _post_bulk(issue_fields: list[dict], pending: list[int], keys: list) -> tuple[list[int], float | None]:
+    """Envoie un lot ; renseigne `keys` et retourne (indices à retenter, retry-after éventuel)."""
+    url = f"{JIRA_URL}/rest/api/3/issue/bulk"
+    payload = {"issueUpdates": [{"fields": issue_fields[i]} for i in pending]}
+    try:
+        response = get_session().post(url, json=payload)
+    except requests.RequestException as e:
+        print(f"❌ Jira injoignable : {e}")
+        return pending, None
 
-        print(f"➡️ ({i}/{len(stories)}) Création de l’US : {summary}")
+    if response.status_code == 429 or response.status_code >= 500:
+        print(f"❌ Erreur Jira ({response.status_code}) sur un lot de {len(pending)}")
+        return pending, retry_after_seconds(response.headers)
 
-        issue_key = create_jira_issue(summary=summary, description_md=description_md)
+    try:
+        body = response.json()
+    except ValueError:
+        print(f"❌ Réponse Jira illisible ({response.status_code}) : {response.text[:200]}")
+        return [], None
 
-        if issue_key:
-            print(f"   ✅ Créée avec succès → {issue_key}\n")
-            created_issues.append(issue_key)
+    retry, failed = [], set()
+    for err in body.get("errors", []):
+        number = err.get("failedElementNumber")
+        if number is None or not 0 <= number < len(pending):
+            continue
+        failed.add(number)
+        status = err.get("status") or 400
+        if status == 429 or status >= 500:
+            retry.append(pending[number])
         else:
-            print(f"   ❌ Erreur sur la création de {summary}\n")
+            print(f"❌ Issue rejetée par Jira ({status}) : {err.get('elementErrors', {}).get('errors')}")
+
+    # Jira renvoie les issues créées dans l'ordre des éléments acceptés
+    created = iter(body.get("issues", []))
+    for number, index in enumerate(pending):
+        if number not in failed:
+            issue = next(created, None)
+            if issue:
+                keys[index] = issue["key"]
+    return sorted(retry), retry_after_seconds(response.headers)
+
+
+# -------------------------
+# 🚀 Export en lot vers Jira
+# -------------------------
+def _build_issue_fields(s: dict) -> dict:
+    """Champs Jira (résumé + description) d'une User Story consolidée."""
+    # 🧠 Titre prioritaire généré par le modèle
+    summary = (s.get("title") or "").strip()
+
+    # Si vide, fallback sur l'idée ou la première phrase de l'US
+    if not summary:
+        summary = s.get("idea", "").strip() or s.get("user_story", "").split(".")[0]
+
+    #   Limitation et nettoyage
+    summary = summary.strip()
+    if len(summary) > 250:
+        summary = summary[:247] + "..."
+    if not summary:
+        summary = "User Story sans titre"
+
+    description_md = (
+        f"## 🎯 User Story\n"
+        f"{s['user_story']}\n\n"
+        f"## 💡 Idée d’origine\n"
+        f"{s.get('idea', '—')}\n\n"
+        f"## ✅ Critères d’acceptation\n"
+        + "\n".join(f"- {c}" for c in s.get("acceptance_criteria", []))
+        + f"\n\n⭐ **Priorité : {s.get('priority', 'Non définie')}**"
+    )
+    return _issue_fields(summary, description_md)
 
-        time.sleep(1)
 
+def export_user_stories_to_jira(
+    stories,
+    bulk: bool = True,
+    ledger: SyncLedger | None = None,
+    concurrency: int = 1,
+):
+    """
+    Exporte plusieurs User Stories vers Jira.
+    stories : liste d'objets { idea, user_story, acceptance_criteria, priority }
+    `bulk=True` : lots de 50 via l'endpoint bulk ; sinon une requête par US (même session),
+    en parallèle si `concurrency` > 1 (plafond de la concurrence adaptative AIMD).
+    `ledger` : registre de synchronisation de la session ; les US déjà poussées à l'identique
+    sont ignorées, les US modifiées mises à jour, et chaque lot créé (chaque US en mode
+    concurrent) est enregistré aussitôt.
+    Retourne les clés Jira des US synchronisées, dans l'ordre.
+    """
+    created_issues = []
+    print("🚀 Export des User Stories vers Jira...\n")
+    if not _config_ok():
+        return created_issues
+
+    fields = [_build_issue_fields(s) for s in stories]
+    keys: list[str | None] = [None] * len(fields)
+    to_create = list(range(len(fields)))
+    updated = unchanged = 0
+
+    if ledger is not None:
+        identities = story_identities(stories)
+        digests = [content_hash(f) for f in fields]
+        known = ledger.lookup(identities)
+        to_create = [i for i in to_create if identities[i] not in known]
+        for i, identity in enumerate(identities):
+            if identity not in known:
+                continue
+            issue_key, digest = known[identity]
+            if digest == digests[i]:
+                keys[i] = issue_key
+                unchanged += 1
+            elif update_issue(issue_key, fields[i]):
+                keys[i] = issue_key
+                updated += 1
+                ledger.record([(identity, issue_key, digests[i])])
+        print(f"📒 Registre : {unchanged} US inchangée(s), {updated} mise(s) à jour, "
+              f"{len(to_create)} à créer\n")
+
+    concurrent = not bulk and concurrency > 1
+    limiter = AdaptiveConcurrency(maximum=concurrency) if concurrent else None
+    step = JIRA_BULK_SIZE if bulk or concurrent else 1
+    for start in range(0, len(to_create), step):
+        chunk = to_create[start:start + step]
+        if bulk:
+            chunk_keys = bulk_create_issues([fields[i] for i in chunk])
+        elif concurrent:
+            # Chaque clé est enregistrée dès sa création : une interruption en cours de lot ne perd rien
+            record = None if ledger is None else (
+                lambda j, issue_key: ledger.record([(identities[chunk[j]], issue_key, digests[chunk[j]])])
+            )
+            chunk_keys = create_issues_concurrently(
+                [fields[i] for i in chunk], limiter, max_workers=concurrency, on_created=record
+            )
+        else:
+            chunk_keys = [create_issue(fields[chunk[0]])]
+        for i, issue_key in zip(chunk, chunk_keys):
+            keys[i] = issue_key
+            print(f"➡️ ({i + 1}/{len(stories)}) Création de l’US : {fields[i]['summary']}")
+            if issue_key:
+                print(f"   ✅ Créée avec succès → {issue_key}\n")
+            else:
+                print(f"   ❌ Erreur sur la création de {fields[i]['summary']}\n")
+        if ledger is not None and not concurrent:
+            ledger.record([(identities[i], k, digests[i]) for i, k in zip(chunk, chunk_keys) if k])
+
+    created_issues = [k for k in keys if k]
+    if limiter is not None:
+        print(f"⚡ Concurrence : pic {limiter.peak}, limite finale {limiter.limit:.1f}, {limiter.throttled} réponse(s) 429")
     print("🎯 Export terminé !")
-    print(f"Total : {len(created_issues)} User Stories créées ✅")
+    print(f"Total : {len(created_issues)} User Stories synchronisées ✅")
 
     return created_issues
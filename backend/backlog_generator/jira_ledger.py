@@ -0,0 +1,129 @@
+"""
+jira_ledger.py
+--------------
+Registre local de synchronisation Jira d'une session (SQLite dans le dossier de session).
+
+Chaque User Story reçoit une identité stable (empreinte de son idée normalisée) associée
+à la clé Jira créée et à l'empreinte du contenu poussé. Un nouvel export :
+- ignore les US déjà poussées à l'identique
+- met à jour (PUT) celles dont le contenu a changé
+- ne crée que les US absentes du registre
+
+Le registre est écrit après chaque lot accepté par Jira : un export interrompu
+reprend au premier élément non enregistré, sans créer de doublons.
+Un registre peut être partagé entre plusieurs sources (ex. import en masse) :
+`ledger.scoped(id)` préfixe les identités par celle de la source.
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+from .similarity import normalize
+from .storage import connect_sqlite
+
+LEDGER_FILENAME = "jira_sync.sqlite"
+
+
+def story_identities(stories: list[dict]) -> list[str]:
+    """
+    Identité stable de chaque US : SHA-1 de l'idée normalisée (à défaut titre / US),
+    suffixée du rang d'occurrence pour distinguer deux US de même idée.
+    """
+    seen: dict[str, int] = {}
+    identities = []
+    for s in stories:
+        base = normalize(s.get("idea") or s.get("title") or s.get("user_story") or "")
+        rank = seen.get(base, 0)
+        seen[base] = rank + 1
+        identities.append(hashlib.sha1(f"{base}#{rank}".encode("utf-8")).hexdigest())
+    return identities
+
+
+def content_hash(fields: dict) -> str:
+    """Empreinte des champs Jira envoyés (indépendante de l'ordre des clés)."""
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SyncLedger:
+    """Identité d'US → (clé Jira, empreinte du contenu) ; partageable entre threads."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.path)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jira_sync (
+                    identity TEXT PRIMARY KEY,
+                    issue_key TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    synced_at REAL NOT NULL
+                )
+                """
+            )
+
+    @classmethod
+    def for_session(cls, session_dir: str | Path) -> "SyncLedger":
+        return cls(Path(session_dir) / LEDGER_FILENAME)
+
+    def lookup(self, identities: list[str]) -> dict[str, tuple[str, str]]:
+        """Entrées connues parmi `identities` : {identité: (clé Jira, empreinte)}."""
+        found: dict[str, tuple[str, str]] = {}
+        with self._lock:
+            for start in range(0, len(identities), 500):
+                chunk = identities[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT identity, issue_key, content_hash FROM jira_sync "
+                    f"WHERE identity IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                found.update({r["identity"]: (r["issue_key"], r["content_hash"]) for r in rows})
+        return found
+
+    def record(self, entries: list[tuple[str, str, str]]):
+        """Enregistre (identité, clé Jira, empreinte) en une seule transaction."""
+        if not entries:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO jira_sync (identity, issue_key, content_hash, synced_at) VALUES (?, ?, ?, ?)",
+                [(identity, key, digest, now) for identity, key, digest in entries],
+            )
+
+    def scoped(self, scope: str) -> "ScopedLedger":
+        """Vue du registre dont les identités sont propres à `scope` (ex. un feedback)."""
+        return ScopedLedger(self, scope)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jira_sync").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ScopedLedger:
+    """Registre partagé vu depuis une source : mêmes `lookup` / `record`, identités préfixées."""
+
+    def __init__(self, ledger: SyncLedger, scope: str):
+        self.ledger = ledger
+        self.scope = scope
+
+    def _key(self, identity: str) -> str:
+        return f"{self.scope}:{identity}"
+
+    def lookup(self, identities: list[str]) -> dict[str, tuple[str, str]]:
+        found = self.ledger.lookup([self._key(i) for i in identities])
+        return {i: found[self._key(i)] for i in identities if self._key(i) in found}
+
+    def record(self, entries: list[tuple[str, str, str]]):
+        self.ledger.record([(self._key(identity), key, digest) for identity, key, digest in entries])
@@ -0,0 +1,473 @@
+"""
+job_queue.py
+------------
+File de jobs locale et durable (SQLite) et pool de workers multi-process.
+
+- un job = (type, charge utile JSON) ; états : queued → running → succeeded / failed
+- un worker prend un job avec un bail (lease) prolongé par un battement de cœur :
+  si le process meurt, le bail expire et le job est repris par un autre worker
+- un échec est retenté avec backoff jusqu'à `max_attempts`, puis marqué "failed" ;
+  le hook d'échec du type de job (FAIL_HOOKS) est alors appelé, y compris sur un bail expiré
+- chaque transition est journalisée dans la table `job_events` (suivi en direct)
+
+Usage :
+    PYTHONPATH=backend python -m backlog_generator.job_queue worker --processes 4
+    PYTHONPATH=backend python -m backlog_generator.job_queue enqueue input/sessions/session_x
+    PYTHONPATH=backend python -m backlog_generator.job_queue status
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import os
+import json
+import time
+import socket
+import argparse
+import importlib
+import threading
+import multiprocessing
+from pathlib import Path
+from dataclasses import dataclass
+
+from .storage import DATA_DIR, connect_sqlite
+from .rate_limit import retry_delay
+from .logger_manager import info, warn, error
+
+JOB_QUEUE_PATH = Path(os.getenv("JOB_QUEUE_PATH", str(DATA_DIR / "jobs.sqlite")))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(min(4, os.cpu_count() or 1))))
+JOB_LEASE_SEC = float(os.getenv("JOB_LEASE_SEC", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Type de job → "module:fonction" (résolu dans chaque worker, compatible multiprocessing "spawn")
+HANDLERS = {
+    "session": "backlog_generator.session_processing:session_job",
+    "text": "backlog_generator.feedback_listener:text_job",
+    "batch": "backlog_generator.batch_ingest:batch_job",
+}
+
+# Type de job → "module:fonction(payload, message)" appelée quand le job passe définitivement en "failed"
+FAIL_HOOKS = {
+    "session": "backlog_generator.session_processing:session_job_failed",
+}
+
+
+# -------------------------
+# 📄 Job
+# -------------------------
+@dataclass
+class Job:
+    id: int
+    kind: str
+    payload: dict
+    status: str
+    attempts: int
+    max_attempts: int
+    result: dict | None = None
+    error: str | None = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @classmethod
+    def from_row(cls, row) -> "Job":
+        return cls(
+            id=row["id"],
+            kind=row["kind"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    def to_json(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "payload": self.payload,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+# -------------------------
+# 🗃️ File SQLite
+# -------------------------
+class JobQueue:
+    """File de jobs partagée entre threads et process (une connexion par instance)."""
+
+    def __init__(
+        self,
+        path: str | Path = JOB_QUEUE_PATH,
+        lease_sec: float = JOB_LEASE_SEC,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_base_sec: float = 5.0,
+        clock=time.time,
+        fail_hooks: dict[str, str] | None = None,
+    ):
+        self.path = Path(path)
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self.retry_base_sec = retry_base_sec
+        self.clock = clock
+        self.fail_hooks = FAIL_HOOKS if fail_hooks is None else fail_hooks
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.path)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_until REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(status, available_at);
+                CREATE TABLE IF NOT EXISTS job_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id INTEGER NOT NULL,
+                    at REAL NOT NULL,
+                    kind TEXT NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, id);
+                """
+            )
+
+    def _event(self, job_id: int, event: str, now: float, **data):
+        self._conn.execute(
+            "INSERT INTO job_events (job_id, at, kind, data) VALUES (?, ?, ?, ?)",
+            (job_id, now, event, json.dumps(data, ensure_ascii=False, default=str)),
+        )
+
+    def _on_failed(self, job_id: int, kind: str, payload: str, message: str):
+        """Hook d'échec définitif du type de job (appelé hors transaction)."""
+        if kind not in self.fail_hooks:
+            return
+        try:
+            resolve_handler(self.fail_hooks[kind])(json.loads(payload), message)
+        except Exception as e:
+            warn("Échec du hook d'échec", job_id=job_id, kind=kind, details=str(e), event="job_fail_hook_error")
+
+    # ------------------------------------------------------------
+    def enqueue(self, kind: str, payload: dict, max_attempts: int | None = None) -> int:
+        """Ajoute un job prêt à être pris ; retourne son identifiant."""
+        now = self.clock()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (kind, payload, status, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (kind, json.dumps(payload, ensure_ascii=False), max_attempts or self.max_attempts, now, now, now),
+            )
+            self._event(cursor.lastrowid, "queued", now, job_kind=kind)
+        return cursor.lastrowid
+
+    def claim(self, worker_id: str) -> Job | None:
+        """
+        Prend le plus ancien job prêt (ou dont le bail a expiré) et le passe en "running".
+        Un job au bail expiré sans tentative restante est marqué "failed" (hook d'échec appelé).
+        """
+        now = self.clock()
+        with self._lock, self._conn:
+            expired = self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'bail expiré', lease_owner = NULL, updated_at = ? "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts "
+                "RETURNING id, kind, payload",
+                (now, now),
+            ).fetchall()
+            for row in expired:
+                self._event(row["id"], "failed", now, error="bail expiré")
+        for row in expired:
+            self._on_failed(row["id"], row["kind"], row["payload"], "bail expiré")
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                """
+                UPDATE jobs SET status = 'running', attempts = attempts + 1,
+                       lease_owner = ?, lease_until = ?, updated_at = ?
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_until < ?)
+                    ORDER BY available_at, id LIMIT 1
+                )
+                RETURNING *
+                """,
+                (worker_id, now + self.lease_sec, now, now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._event(row["id"], "started", now, worker=worker_id, attempt=row["attempts"])
+            return Job.from_row(row)
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Prolonge le bail ; False si le job a été repris par un autre worker."""
+        now = self.clock()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (now + self.lease_sec, now, job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: dict | None = None) -> bool:
+        """Marque le job réussi (ignoré si le worker n'en détient plus le bail)."""
+        now = self.clock()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (json.dumps(result, ensure_ascii=False, default=str), now, job_id, worker_id),
+            )
+            if cursor.rowcount == 1:
+                self._event(job_id, "succeeded", now, result=result)
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, message: str) -> str | None:
+        """
+        Échec d'une tentative : remise en file avec backoff, ou "failed" si les tentatives
+        sont épuisées (hook d'échec appelé).
+        """
+        now = self.clock()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT kind, payload, attempts, max_attempts FROM jobs "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["attempts"] < row["max_attempts"]:
+                delay = retry_delay(row["attempts"] - 1, base=self.retry_base_sec, cap=600)
+                status, available_at = "queued", now + delay
+            else:
+                status, available_at = "failed", now
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (status, message, available_at, now, job_id),
+            )
+            self._event(job_id, "retry" if status == "queued" else "failed", now,
+                        error=message, attempt=row["attempts"], available_at=available_at)
+        if status == "failed":
+            self._on_failed(job_id, row["kind"], row["payload"], message)
+        return status
+
+    def add_event(self, job_id: int, event: str, **data):
+        """Événement libre émis par un job (progression, étape...)."""
+        with self._lock, self._conn:
+            self._event(job_id, event, self.clock(), **data)
+
+    # ------------------------------------------------------------
+    def get(self, job_id: int) -> Job | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def events(self, job_id: int, after_id: int = 0) -> list[dict]:
+        """Événements du job postérieurs à `after_id`, dans l'ordre."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, at, kind, data FROM job_events WHERE job_id = ? AND id > ? ORDER BY id",
+                (job_id, after_id),
+            ).fetchall()
+        return [{**json.loads(r["data"]), "id": r["id"], "at": r["at"], "event": r["kind"]} for r in rows]
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# -------------------------
+# 👷 Exécution des jobs
+# -------------------------
+@dataclass
+class JobContext:
+    """Passé au handler : identifiants du job et émission d'événements de progression."""
+    queue: JobQueue
+    job: Job
+    worker_id: str
+
+    @property
+    def will_retry(self) -> bool:
+        return self.job.attempts < self.job.max_attempts
+
+    def event(self, event: str, **data):
+        self.queue.add_event(self.job.id, event, **data)
+
+
+def resolve_handler(path: str):
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def run_job(queue: JobQueue, job: Job, worker_id: str, handlers: dict[str, str] | None = None) -> str | None:
+    """Exécute un job pris par `worker_id`, bail entretenu par un thread de battement de cœur."""
+    handlers = handlers or HANDLERS
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(queue.lease_sec / 3):
+            if not queue.heartbeat(job.id, worker_id):
+                warn("Bail perdu pendant l'exécution", job_id=job.id, worker=worker_id, event="job_lease_lost")
+                return
+
+    beater = threading.Thread(target=beat, daemon=True)
+    beater.start()
+    try:
+        if job.kind not in handlers:
+            raise ValueError(f"Type de job inconnu : {job.kind}")
+        result = resolve_handler(handlers[job.kind])(job.payload, JobContext(queue, job, worker_id))
+    except Exception as e:
+        error("Échec d'un job", job_id=job.id, kind=job.kind, attempt=job.attempts, details=str(e), event="job_failed")
+        return queue.fail(job.id, worker_id, str(e))
+    finally:
+        stop.set()
+        beater.join()
+    queue.complete(job.id, worker_id, result)
+    info("Job terminé", job_id=job.id, kind=job.kind, event="job_succeeded")
+    return "succeeded"
+
+
+def worker_loop(
+    queue: JobQueue | str | Path = JOB_QUEUE_PATH,
+    worker_id: str | None = None,
+    stop_event=None,
+    poll_sec: float = 1.0,
+    lease_sec: float = JOB_LEASE_SEC,
+    handlers: dict[str, str] | None = None,
+    exit_when_idle: bool = False,
+) -> int:
+    """
+    Boucle d'un worker : prend et exécute les jobs jusqu'à `stop_event`
+    (ou, si `exit_when_idle`, jusqu'à ce qu'il ne reste aucun job en attente ni en cours).
+    `queue` : file déjà ouverte ou chemin de la base (cas des process du pool).
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    owned = not isinstance(queue, JobQueue)
+    if owned:
+        queue = JobQueue(queue, lease_sec=lease_sec)
+    done = 0
+    try:
+        while stop_event is None or not stop_event.is_set():
+            job = queue.claim(worker_id)
+            if job is None:
+                counts = queue.counts()
+                if exit_when_idle and not counts.get("queued") and not counts.get("running"):
+                    break
+                if stop_event is not None:
+                    stop_event.wait(poll_sec)
+                else:
+                    time.sleep(poll_sec)
+                continue
+            print(f"👷 [{worker_id}] Job {job.id} ({job.kind}), tentative {job.attempts}/{job.max_attempts}")
+            run_job(queue, job, worker_id, handlers)
+            done += 1
+    finally:
+        if owned:
+            queue.close()
+    return done
+
+
+class WorkerPool:
+    """Pool de `processes` workers indépendants (multiprocessing "spawn") sur une même file."""
+
+    def __init__(
+        self,
+        queue_path: str | Path = JOB_QUEUE_PATH,
+        processes: int = JOB_WORKERS,
+        poll_sec: float = 1.0,
+        lease_sec: float = JOB_LEASE_SEC,
+        handlers: dict[str, str] | None = None,
+        exit_when_idle: bool = False,
+    ):
+        self.queue_path = Path(queue_path)
+        self.processes = processes
+        self.poll_sec = poll_sec
+        self.lease_sec = lease_sec
+        self.handlers = handlers
+        self.exit_when_idle = exit_when_idle
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._procs: list = []
+
+    def start(self):
+        JobQueue(self.queue_path).close()  # crée le schéma avant le démarrage concurrent des workers
+        for i in range(self.processes):
+            proc = self._ctx.Process(
+                target=worker_loop,
+                args=(str(self.queue_path), f"{socket.gethostname()}-w{i}", self._stop,
+                      self.poll_sec, self.lease_sec, self.handlers, self.exit_when_idle),
+                daemon=False,
+            )
+            proc.start()
+            self._procs.append(proc)
+        info("Pool de workers démarré", processes=self.processes, queue=str(self.queue_path), event="workers_start")
+
+    def join(self, timeout: float | None = None):
+        for proc in self._procs:
+            proc.join(timeout)
+
+    def stop(self, timeout: float | None = 30):
+        """Arrêt propre : chaque worker termine son job en cours puis sort."""
+        self._stop.set()
+        self.join(timeout)
+        for proc in self._procs:
+            if proc.is_alive():
+                proc.terminate()
+        self._procs = []
+
+
+# ============================================================
+# 🧪 Ligne de commande
+# ============================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="File de jobs d'analyse de sessions.")
+    parser.add_argument("--queue", default=str(JOB_QUEUE_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="démarre un pool de workers")
+    worker.add_argument("--processes", type=int, default=JOB_WORKERS)
+    worker.add_argument("--drain", action="store_true", help="s'arrête quand la file est vide")
+    enqueue = sub.add_parser("enqueue", help="ajoute des sessions enregistrées à la file")
+    enqueue.add_argument("folders", nargs="+")
+    enqueue.add_argument("--push-to-jira", action="store_true")
+    sub.add_parser("status", help="nombre de jobs par état")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        pool = WorkerPool(args.queue, processes=args.processes, exit_when_idle=args.drain)
+        pool.start()
+        try:
+            pool.join()
+        except KeyboardInterrupt:
+            print("\n⚠️ Interruption — arrêt des workers après leur job en cours...")
+            pool.stop()
+    elif args.command == "enqueue":
+        from .session_processing import enqueue_session
+
+        queue = JobQueue(args.queue)
+        for folder in args.folders:
+            job_id = enqueue_session(queue, folder, push_to_jira=args.push_to_jira)
+            print(f"📥 {folder} → job {job_id}")
+    else:
+        print(json.dumps(JobQueue(args.queue).counts(), indent=2))
@@ -0,0 +1,119 @@
+"""
+live_pipeline.py
+----------------
+Pipeline incrémental exécuté PENDANT l'enregistrement (mode live).
+
+Le thread de capture transmet des fenêtres audio glissantes (ex. toutes les 60 s) ;
+un worker en arrière-plan les transcrit, segmente le texte accumulé puis extrait
+idées et User Stories. À l'arrêt de la réunion, il ne reste qu'à traiter la
+dernière fenêtre et à lancer la consolidation finale.
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import queue
+import threading
+
+import numpy as np
+
+from .audio_chunker import encode_wav_bytes, stitch_transcripts
+from .audio_preprocess import prepare_for_asr
+from .audio_transcriber import analyze_segments, finalize_user_stories, segment_transcript
+from .llm_client import transcribe_bytes
+from .logger_manager import info, error
+
+
+class LiveSessionPipeline:
+    """Worker d'analyse incrémentale alimenté par le thread de capture audio."""
+
+    def __init__(
+        self,
+        fs: int,
+        session_id: str | None = None,
+        min_segment_words: int = 120,
+        max_workers: int | None = None,
+    ):
+        self.fs = fs
+        self.session_id = session_id
+        self.min_segment_words = min_segment_words
+        self.max_workers = max_workers
+        self.transcript = ""
+        self.user_stories: list[dict] = []
+        self.windows_processed = 0
+        self.original_bytes = 0
+        self.uploaded_bytes = 0
+        self._pending_text = ""
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="live-pipeline", daemon=True)
+
+    # ------------------------------------------------------------
+    def start(self):
+        self._thread.start()
+        info("Pipeline live démarré", session_id=self.session_id, event="live_start")
+
+    def submit_window(self, samples: np.ndarray):
+        """Appelé par le thread de capture : ne bloque jamais (simple mise en file)."""
+        self._queue.put(samples)
+
+    def finish(self, tail: np.ndarray | None = None, push_to_jira: bool = False, report: dict | None = None) -> list[dict]:
+        """Traite la dernière fenêtre, vide le texte restant puis consolide toutes les US."""
+        if tail is not None and len(tail):
+            self.submit_window(tail)
+        self._queue.put(None)
+        self._thread.join()
+        self._analyze_text(self._pending_text)
+        self._pending_text = ""
+        info(
+            "Pipeline live terminé",
+            session_id=self.session_id,
+            windows=self.windows_processed,
+            user_stories=len(self.user_stories),
+        )
+        if report is not None and self.original_bytes:
+            report["audio"] = {
+                "original_bytes": self.original_bytes,
+                "uploaded_bytes": self.uploaded_bytes,
+                "bytes_saved_ratio": round(1 - self.uploaded_bytes / self.original_bytes, 3),
+            }
+        return finalize_user_stories(
+            self.user_stories, push_to_jira=push_to_jira, report=report, session_id=self.session_id
+        )
+
+    # ------------------------------------------------------------
+    def _run(self):
+        while True:
+            samples = self._queue.get()
+            if samples is None:
+                break
+            try:
+                self._process_window(samples)
+            except Exception as e:
+                # Une fenêtre en échec ne doit pas interrompre la réunion
+                print(f"⚠️ Fenêtre live ignorée : {e}")
+                error("Erreur dans live_pipeline", session_id=self.session_id, details=str(e))
+
+    def _process_window(self, samples: np.ndarray):
+        self.windows_processed += 1
+        prepared = prepare_for_asr(samples, self.fs)
+        self.original_bytes += prepared.original_bytes
+        self.uploaded_bytes += prepared.prepared_bytes
+        if not len(prepared.samples):
+            return  # fenêtre entièrement silencieuse : rien à transcrire
+        wav = encode_wav_bytes(prepared.samples, prepared.fs)
+        text = stitch_transcripts(self.transcript, transcribe_bytes(wav, f"live_{self.windows_processed:04d}.wav").strip())
+        if not text:
+            return
+        self.transcript = f"{self.transcript} {text}".strip()
+        self._pending_text = f"{self._pending_text} {text}".strip()
+        print(f"🎧 Fenêtre live {self.windows_processed} transcrite ({len(text.split())} mots)")
+
+        # On attend d'avoir assez de texte pour que la segmentation thématique ait du sens
+        if len(self._pending_text.split()) >= self.min_segment_words:
+            self._analyze_text(self._pending_text)
+            self._pending_text = ""
+
+    def _analyze_text(self, text: str):
+        if len(text.split()) <= 5:
+            return
+        segments = segment_transcript(text)
+        self.user_stories.extend(analyze_segments(segments, max_workers=self.max_workers))
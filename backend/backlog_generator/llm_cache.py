@@ -0,0 +1,143 @@
+"""
+llm_cache.py
+------------
+Cache persistant des réponses LLM, adressé par le contenu de la requête
+(modèle, messages, température, max_tokens).
+
+Stocké dans une base SQLite locale avec :
+- expiration (TTL)
+- éviction LRU au-delà d'un nombre d'entrées ou d'une taille maximale
+- compteurs hits / misses
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+from .storage import DATA_DIR, connect_sqlite
+
+DEFAULT_CACHE_PATH = DATA_DIR / "llm_cache.sqlite"
+
+
+def make_cache_key(**request) -> str:
+    """Clé stable (SHA-256) d'une requête LLM, indépendante de l'ordre des paramètres."""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Cache clé → réponse texte, partagé entre threads (et process via WAL)."""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        ttl_sec: float = 30 * 24 * 3600,
+        max_entries: int = 20_000,
+        max_bytes: int = 200 * 1024 * 1024,
+    ):
+        self.path = Path(path)
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.path)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+
+    # ------------------------------------------------------------
+    def get(self, key: str) -> str | None:
+        """Retourne la réponse en cache (ou None si absente / expirée)."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row["created_at"] > self.ttl_sec:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row["value"]
+
+    def set(self, key: str, value: str):
+        """Enregistre une réponse puis applique TTL et plafonds (LRU)."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache(key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_sec,))
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Supprime les entrées les moins récemment utilisées jusqu'à repasser sous les plafonds
+        for row in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (row["key"],))
+            count -= 1
+            total -= row["size"]
+
+    # ------------------------------------------------------------
+    def stats(self) -> dict:
+        """Compteurs du process courant + volumétrie du cache sur disque."""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 2) if lookups else 0.0,
+            "entries": count,
+            "size_bytes": total,
+        }
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+        self.hits = self.misses = 0
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache | None:
+    """Cache partagé du process, configuré par variables d'environnement (None si désactivé)."""
+    global _cache
+    if os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(
+                path=os.getenv("LLM_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+                ttl_sec=float(os.getenv("LLM_CACHE_TTL_DAYS", "30")) * 24 * 3600,
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000")),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024),
+            )
+        return _cache
@@ -0,0 +1,183 @@
+"""
+llm_client.py
+-------------
+Point d'accès unique à l'API Groq pour tous les modules du pipeline
+(génération, segmentation, extraction d'idées, transcription).
+
+- un seul client Groq par process, créé à la première utilisation,
+  sur un pool de connexions HTTP keep-alive partagé entre threads
+- cache persistant des réponses (voir llm_cache.py) : rejouer une session
+  déjà traitée ne renvoie aucune requête identique au fournisseur
+- limitation de débit par seaux à jetons (tokens/min recalés sur les en-têtes `x-ratelimit-*-tokens`)
+  et reprise exponentielle avec gigue sur 429 / 5xx / erreurs réseau (voir rate_limit.py)
+"""
+
+import os
+import hashlib
+import threading
+from pathlib import Path
+from dotenv import load_dotenv
+
+import httpx
+from groq import Groq, APIConnectionError, APIStatusError, RateLimitError
+
+from .llm_cache import get_cache, make_cache_key
+from .logger_manager import warn
+from .rate_limit import RateLimiter, retry_after_seconds, retry_delay
+
+# -------------------------
+# ⚙️ Configuration
+# -------------------------
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+CHAT_MODEL = "llama-3.3-70b-versatile"
+TRANSCRIPTION_MODEL = "whisper-large-v3-turbo"
+
+# Connexions HTTP gardées ouvertes (≥ nombre de threads du pipeline)
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "16"))
+LLM_TIMEOUT_SEC = float(os.getenv("LLM_TIMEOUT_SEC", "120"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+
+# Quotas de départ, recalés ensuite sur les en-têtes du fournisseur
+LLM_REQUESTS_PER_MIN = float(os.getenv("LLM_REQUESTS_PER_MIN", "30"))
+LLM_TOKENS_PER_MIN = float(os.getenv("LLM_TOKENS_PER_MIN", "12000"))
+
+_client: Groq | None = None
+_client_lock = threading.Lock()
+limiter = RateLimiter(LLM_REQUESTS_PER_MIN, LLM_TOKENS_PER_MIN)
+_stats = {"requests": 0, "retries": 0}
+
+
+def get_client() -> Groq:
+    """Retourne le client Groq partagé (instancié une seule fois, pool HTTP keep-alive)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=LLM_POOL_SIZE, max_keepalive_connections=LLM_POOL_SIZE),
+                timeout=LLM_TIMEOUT_SEC,
+            )
+            # max_retries=0 : les reprises sont gérées ici, avec le limiteur partagé
+            _client = Groq(api_key=os.getenv("GROQ_API_KEY"), http_client=http_client, max_retries=0)
+        return _client
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+def call_with_retries(create, model: str, tokens: float = 0.0):
+    """
+    Exécute `create()` (un appel `with_raw_response` du SDK) sous le limiteur de débit :
+    attend un jeton, met à jour les seaux avec les en-têtes de réponse et retente
+    les 429 / 5xx / erreurs réseau avec un backoff exponentiel à gigue complète.
+    """
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        limiter.acquire(model, tokens)
+        try:
+            raw = create()
+        except Exception as e:
+            if not _is_retryable(e) or attempt == LLM_MAX_RETRIES:
+                raise
+            headers = e.response.headers if isinstance(e, APIStatusError) else None
+            limiter.observe(model, headers)
+            delay = retry_delay(attempt, retry_after_seconds(headers))
+            if isinstance(e, RateLimitError):
+                limiter.pause(model, delay)  # tous les threads du modèle attendent
+            else:
+                limiter.sleep(delay)
+            with _client_lock:
+                _stats["retries"] += 1
+            warn(f"Appel LLM retenté ({type(e).__name__}), tentative {attempt + 2}", model=model,
+                 delay_sec=round(delay, 2), event="llm_retry")
+            continue
+        limiter.observe(model, raw.headers)
+        with _client_lock:
+            _stats["requests"] += 1
+        return raw.parse()
+
+
+def _estimate_tokens(messages: list[dict], max_tokens: int | None) -> float:
+    """Estimation grossière (≈ 4 caractères par token) pour le seau de tokens."""
+    return sum(len(str(m.get("content", ""))) for m in messages) / 4 + (max_tokens or 0)
+
+
+# -------------------------
+# 💬 Chat completions
+# -------------------------
+def chat_completion(
+    messages: list[dict],
+    model: str = CHAT_MODEL,
+    temperature: float = 0.0,
+    max_tokens: int | None = None,
+    use_cache: bool = True,
+) -> str:
+    """Envoie une requête de chat et retourne le texte de la réponse (servi depuis le cache si possible)."""
+    cache = get_cache() if use_cache else None
+    key = make_cache_key(
+        kind="chat", model=model, messages=messages, temperature=temperature, max_tokens=max_tokens
+    )
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    params = {"model": model, "messages": messages, "temperature": temperature}
+    if max_tokens is not None:
+        params["max_tokens"] = max_tokens
+    client = get_client()
+    response = call_with_retries(
+        lambda: client.chat.completions.with_raw_response.create(**params),
+        model,
+        _estimate_tokens(messages, max_tokens),
+    )
+    text = response.choices[0].message.content or ""
+
+    if cache is not None:
+        cache.set(key, text)
+    return text
+
+
+# -------------------------
+# 🎧 Transcription
+# -------------------------
+def transcribe_file(file_path: str, model: str = TRANSCRIPTION_MODEL, use_cache: bool = True) -> str:
+    """Transcrit un fichier audio ; le cache est adressé par l'empreinte SHA-256 du fichier."""
+    with open(file_path, "rb") as audio_file:
+        return transcribe_bytes(audio_file.read(), Path(file_path).name, model=model, use_cache=use_cache)
+
+
+def transcribe_bytes(data: bytes, filename: str, model: str = TRANSCRIPTION_MODEL, use_cache: bool = True) -> str:
+    """Transcrit un contenu audio déjà en mémoire (ex. un extrait WAV)."""
+    cache = get_cache() if use_cache else None
+    key = make_cache_key(kind="transcription", model=model, audio_sha256=hashlib.sha256(data).hexdigest())
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    client = get_client()
+    response = call_with_retries(
+        lambda: client.audio.transcriptions.with_raw_response.create(model=model, file=(filename, data)),
+        model,
+    )
+    text = response.text
+
+    if cache is not None:
+        cache.set(key, text)
+    return text
+
+
+def client_stats() -> dict:
+    """Requêtes envoyées, reprises et temps passé à attendre le limiteur de débit."""
+    with _client_lock:
+        return {**_stats, "throttled_sec": round(limiter.waited_sec, 2)}
+
+
+def cache_stats() -> dict:
+    """Compteurs hits/misses du cache LLM partagé (vide si désactivé)."""
+    cache = get_cache()
+    return cache.stats() if cache is not None else {}
@@ -8,7 +8,8 @@ Utilitaires de qualité :
 """
 
 import re
-from difflib import SequenceMatcher
+
+from .similarity import dedupe_indices
 
 META_PATTERNS = [
     r"\b(j(e|’)\s*suis prêt|veuillez fournir|pas de texte|merci de fournir|j'aurais besoin du texte)\b",
@@ -66,21 +67,13 @@ def filter_relevant_ideas(ideas: list[str], min_len: int = 10, max_len: int = 22
     return cleaned
 
 
-def _similar(a: str, b: str) -> float:
-    # Similarité simple (stdlib) — suffisant pour un MVP
-    return SequenceMatcher(None, _normalize(a), _normalize(b)).ratio()
-
-
-def semantic_deduplicate(ideas: list[str], threshold: float = 0.82) -> list[str]:
+def semantic_deduplicate(ideas: list[str], threshold: float = 0.82, method: str = "auto") -> list[str]:
     """
     Supprime les doublons sémantiques (idées quasi identiques).
     Conserve la première occurrence.
+    `method` : voir similarity.dedupe_indices ("exact", "shingle" pour les gros volumes).
     """
-    result = []
-    for idea in ideas:
-        if not any(_similar(idea, kept) >= threshold for kept in result):
-            result.append(idea)
-    return result
+    return [ideas[i] for i in dedupe_indices(ideas, threshold, method=method)]
 
 
 def validate_user_story_format(story: dict) -> bool:
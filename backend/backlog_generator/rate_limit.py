@@ -0,0 +1,218 @@
+"""
+rate_limit.py
+-------------
+Ordonnancement des appels au fournisseur LLM :
+
+- seaux à jetons par modèle : requêtes/min (configuration, fixe) et tokens/min recalé
+  sur les en-têtes `x-ratelimit-*-tokens` renvoyés par l'API ; les en-têtes
+  `*-requests` de Groq sont un quota journalier, traité comme un plafond (pause à 0)
+- pause partagée sur `retry-after` : un 429 suspend tous les threads du modèle
+- délais de reprise exponentiels avec gigue complète (« full jitter »)
+- concurrence adaptative AIMD (export Jira) : +1 requête simultanée par fenêtre réussie,
+  division par deux au premier 429 d'une fenêtre, pause sur `Retry-After`
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import re
+import time
+import random
+import threading
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Durée Groq (« 2m59.56s », « 7.66s », « 120ms ») ou nombre de secondes → secondes."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    return sum(float(n) * _UNITS[u] for n, u in parts) if parts else None
+
+
+def retry_after_seconds(headers) -> float | None:
+    """Délai imposé par `retry-after` (secondes), si présent."""
+    if not headers:
+        return None
+    return parse_duration(headers.get("retry-after"))
+
+
+def retry_delay(attempt: int, retry_after: float | None = None, base: float = 0.5, cap: float = 30.0,
+                rng: random.Random | None = None) -> float:
+    """Backoff exponentiel à gigue complète, jamais inférieur au `retry-after` du fournisseur."""
+    jittered = (rng or random).uniform(0, min(cap, base * (2 ** attempt)))
+    return max(jittered, retry_after or 0.0)
+
+
+# -------------------------
+# 🪣 Seau à jetons
+# -------------------------
+class TokenBucket:
+    """Seau de `capacity` jetons rechargé à `rate` jetons/s ; partagé entre threads."""
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.paused_until = 0.0
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Prélève `amount` jetons (bloquant) et retourne le temps d'attente total."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                else:
+                    delay = (amount - self.tokens) / self.rate if self.rate > 0 else 1.0
+            self.sleep(delay)
+            waited += delay
+
+    def sync(self, limit: float | None, remaining: float | None, reset_sec: float | None):
+        """Recale le seau sur l'état annoncé par le fournisseur (limite, restant, remise à plein)."""
+        with self._lock:
+            self._refill(self.clock())
+            if limit:
+                self.capacity = float(limit)
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if reset_sec and limit and float(limit) > float(remaining):
+                    self.rate = (float(limit) - float(remaining)) / reset_sec
+
+    def pause(self, seconds: float):
+        """Suspend toutes les acquisitions pendant `seconds` (ex. `retry-after`)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+            self.tokens = 0.0
+
+
+# -------------------------
+# 🚦 Limiteur par modèle
+# -------------------------
+class RateLimiter:
+    """Un seau « requêtes/min » (fixe) et un seau « tokens/min » (recalé sur les en-têtes) par modèle."""
+
+    def __init__(self, requests_per_min: float, tokens_per_min: float, clock=time.monotonic, sleep=time.sleep):
+        self.requests_per_min = requests_per_min
+        self.tokens_per_min = tokens_per_min
+        self.clock = clock
+        self.sleep = sleep
+        self.waited_sec = 0.0
+        self._buckets: dict[str, tuple[TokenBucket, TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    def buckets(self, model: str) -> tuple[TokenBucket, TokenBucket]:
+        with self._lock:
+            if model not in self._buckets:
+                self._buckets[model] = (
+                    TokenBucket(self.requests_per_min / 60, self.requests_per_min, self.clock, self.sleep),
+                    TokenBucket(self.tokens_per_min / 60, self.tokens_per_min, self.clock, self.sleep),
+                )
+            return self._buckets[model]
+
+    def acquire(self, model: str, tokens: float = 0.0):
+        requests, budget = self.buckets(model)
+        waited = requests.acquire(1)
+        if tokens:
+            waited += budget.acquire(tokens)
+        with self._lock:
+            self.waited_sec += waited
+
+    def observe(self, model: str, headers):
+        """
+        Met à jour les seaux avec les en-têtes `x-ratelimit-*` d'une réponse (succès ou 429).
+        Seuls les en-têtes « tokens » (fenêtre d'une minute) recalent le seau de tokens. Les en-têtes
+        « requests » de Groq comptent des requêtes par jour : ils ne modifient pas le débit par minute
+        et ne servent que de plafond (pause jusqu'à la remise à zéro quand il ne reste plus rien).
+        """
+        if not headers:
+            return
+        requests, budget = self.buckets(model)
+        limit = headers.get("x-ratelimit-limit-tokens")
+        remaining = headers.get("x-ratelimit-remaining-tokens")
+        if limit is not None or remaining is not None:
+            budget.sync(
+                float(limit) if limit is not None else None,
+                float(remaining) if remaining is not None else None,
+                parse_duration(headers.get("x-ratelimit-reset-tokens")),
+            )
+        daily_remaining = headers.get("x-ratelimit-remaining-requests")
+        if daily_remaining is not None and float(daily_remaining) <= 0:
+            requests.pause(parse_duration(headers.get("x-ratelimit-reset-requests")) or 60.0)
+
+    def pause(self, model: str, seconds: float):
+        for bucket in self.buckets(model):
+            bucket.pause(seconds)
+
+
+# -------------------------
+# 📈 Concurrence adaptative (AIMD)
+# -------------------------
+class AdaptiveConcurrency:
+    """
+    Nombre de requêtes simultanées autorisées, ajusté en AIMD :
+    chaque succès ajoute 1/limite (≈ +1 par fenêtre complète), un 429 divise la limite par deux
+    et suspend les nouveaux départs pendant `retry_after`. Les 429 de requêtes parties avant
+    la dernière réduction n'entraînent pas de nouvelle division (une réduction par fenêtre).
+    """
+
+    def __init__(self, initial: int = 2, minimum: int = 1, maximum: int = 16, clock=time.monotonic):
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.clock = clock
+        self.in_flight = 0
+        self.peak = 0
+        self.throttled = 0
+        self.paused_until = 0.0
+        self._epoch = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> int:
+        """Attend un créneau libre (et la fin d'une pause éventuelle) ; retourne le jeton de fenêtre."""
+        with self._cond:
+            while True:
+                delay = self.paused_until - self.clock()
+                if delay > 0:
+                    self._cond.wait(delay)
+                elif self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    self.peak = max(self.peak, self.in_flight)
+                    return self._epoch
+                else:
+                    self._cond.wait()
+
+    def release(self, ticket: int, throttled: bool = False, retry_after: float | None = None):
+        """Libère le créneau et ajuste la limite selon l'issue de la requête."""
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                if ticket == self._epoch:
+                    self.limit = max(float(self.minimum), self.limit / 2)
+                    self._epoch += 1
+                if retry_after:
+                    self.paused_until = max(self.paused_until, self.clock() + retry_after)
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self._cond.notify_all()
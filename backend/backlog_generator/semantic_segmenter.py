@@ -0,0 +1,115 @@
+"""
+semantic_segmenter.py
+---------------------
+Segmentation thématique locale d'une transcription, sans appel LLM :
+
+1. découpage en phrases
+2. embeddings des phrases (embeddings.VectorStore, pondération TF-IDF)
+3. frontières de thème aux creux de cohésion entre fenêtres de phrases voisines (TextTiling)
+4. regroupement des blocs non contigus qui parlent du même sujet
+5. titre de thème = mots-clés les plus distinctifs du segment
+
+Même format de sortie que `segment_conversation_llm` : [{"theme": ..., "content": ...}].
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+from .embeddings import VectorStore, tfidf_weight, tokenize
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if len(s.strip().split()) >= 2]
+
+
+def _cohesion(vectors: np.ndarray, window: int) -> np.ndarray:
+    """Cosinus entre les `window` phrases avant et après chaque frontière possible (1 … n-1)."""
+    gaps = np.zeros(len(vectors) - 1)
+    for i in range(1, len(vectors)):
+        left = vectors[max(0, i - window):i].mean(axis=0)
+        right = vectors[i:i + window].mean(axis=0)
+        denom = np.linalg.norm(left) * np.linalg.norm(right)
+        gaps[i - 1] = float(left @ right / denom) if denom else 0.0
+    return gaps
+
+
+def topic_boundaries(vectors: np.ndarray, max_segments: int = 8, min_sentences: int = 2, window: int = 3) -> list[int]:
+    """
+    Indices de phrase où commence un nouveau thème. Une frontière est retenue si la
+    profondeur du creux de cohésion dépasse moyenne − écart-type / 2 (critère TextTiling),
+    en gardant les plus profondes et au moins `min_sentences` phrases par segment.
+    """
+    if len(vectors) < 2 * min_sentences:
+        return []
+    gaps = _cohesion(vectors, window)
+    depth = np.array([
+        (gaps[:i + 1].max() - g) + (gaps[i:].max() - g) for i, g in enumerate(gaps)
+    ])
+    cutoff = depth.mean() - depth.std() / 2
+    chosen: list[int] = []
+    for i in np.argsort(-depth, kind="stable"):
+        start = int(i) + 1
+        if depth[i] <= 0 or depth[i] < cutoff or len(chosen) >= max_segments - 1:
+            break
+        edges = sorted(chosen + [0, len(vectors)])
+        if all(abs(start - e) >= min_sentences for e in edges):
+            chosen.append(start)
+    return sorted(chosen)
+
+
+def _theme_titles(blocks: list[str], max_words: int = 3) -> list[str]:
+    """Titre de chaque bloc : ses mots les plus fréquents ET les moins partagés avec les autres blocs."""
+    counts = [Counter(tokenize(b)) for b in blocks]
+    df = Counter(w for c in counts for w in c)
+    titles = []
+    for c in counts:
+        ranked = sorted(c, key=lambda w: (-c[w] * np.log((1 + len(blocks)) / df[w]), w))
+        titles.append(" · ".join(w.capitalize() for w in ranked[:max_words]) or "Discussion générale")
+    return titles
+
+
+def segment_conversation_local(
+    text: str,
+    store: VectorStore | None = None,
+    max_segments: int = 8,
+    min_sentences: int = 2,
+    merge_threshold: float = 0.35,
+) -> list[dict]:
+    """
+    Découpe le texte transcrit en segments thématiques par clustering local des phrases.
+    `merge_threshold` : similarité minimale (cosinus des centroïdes) pour réunir deux blocs non contigus.
+    """
+    sentences = split_sentences(text)
+    if len(sentences) < 2 * min_sentences:
+        return [{"theme": "Discussion générale", "content": text.strip()}] if text and text.strip() else []
+
+    store = store or VectorStore()
+    vectors = tfidf_weight(store.embed(sentences))
+    cuts = [0] + topic_boundaries(vectors, max_segments, min_sentences) + [len(sentences)]
+    blocks = [(cuts[i], cuts[i + 1]) for i in range(len(cuts) - 1)]
+
+    # Regroupement : chaque bloc rejoint le premier cluster antérieur assez proche
+    clusters: list[list[tuple[int, int]]] = []
+    centroids: list[np.ndarray] = []
+    for start, end in blocks:
+        centroid = vectors[start:end].mean(axis=0)
+        centroid /= max(np.linalg.norm(centroid), 1e-12)
+        target = next((k for k, c in enumerate(centroids) if float(c @ centroid) >= merge_threshold), None)
+        if target is None:
+            clusters.append([(start, end)])
+            centroids.append(centroid)
+        else:
+            clusters[target].append((start, end))
+
+    contents = [" ".join(" ".join(sentences[s:e]) for s, e in cluster) for cluster in clusters]
+    return [
+        {"theme": theme, "content": content}
+        for theme, content in zip(_theme_titles(contents), contents)
+        if len(content.split()) > 5
+    ]
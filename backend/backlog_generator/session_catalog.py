@@ -0,0 +1,288 @@
+"""
+session_catalog.py
+------------------
+Catalogue indexé des sessions (SQLite) : une ligne par session avec ses métadonnées,
+son résumé et les champs filtrables (date, statut, score, thèmes).
+
+Le catalogue est alimenté au fil de l'eau par les écritures existantes
+(AudioSession.save_metadata, session_processing.update_metadata, generate_session_summary) :
+l'API n'a plus à parcourir ni à lire les dossiers de session à chaque requête.
+
+Chaque écriture effective incrémente un compteur de révision global ; l'API s'en sert
+pour invalider son cache de réponses (ETag / 304).
+
+Usage (reconstruction depuis les dossiers existants) :
+    PYTHONPATH=backend python -m backlog_generator.session_catalog rebuild input/sessions
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+
+from .storage import DATA_DIR, connect_sqlite
+from .logger_manager import info, warn
+
+SESSION_CATALOG_PATH = Path(os.getenv("SESSION_CATALOG_PATH", str(DATA_DIR / "sessions.sqlite")))
+
+# Colonnes renvoyées par les listes (le détail complet reste dans summary / metadata)
+LIST_COLUMNS = "session_id, started_at, ended_at, duration_sec, status, score_global, user_story_count, themes"
+
+
+def _dumps(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, sort_keys=True)
+
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# -------------------------
+# 🗂️ Catalogue SQLite
+# -------------------------
+class SessionCatalog:
+    """Index des sessions partagé entre threads (et entre process via SQLite WAL)."""
+
+    def __init__(self, path: str | Path = SESSION_CATALOG_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.path)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    folder_path TEXT NOT NULL,
+                    started_at TEXT NOT NULL DEFAULT '',
+                    ended_at TEXT NOT NULL DEFAULT '',
+                    duration_sec REAL NOT NULL DEFAULT 0,
+                    status TEXT,
+                    score_global REAL,
+                    user_story_count INTEGER NOT NULL DEFAULT 0,
+                    themes TEXT NOT NULL DEFAULT '[]',
+                    metadata TEXT,
+                    summary TEXT,
+                    revision INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at DESC, session_id DESC);
+                CREATE INDEX IF NOT EXISTS idx_sessions_score ON sessions(score_global);
+                CREATE TABLE IF NOT EXISTS session_themes (
+                    theme TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    PRIMARY KEY (theme, session_id)
+                );
+                CREATE TABLE IF NOT EXISTS catalog_state (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    revision INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO catalog_state (id, revision) VALUES (1, 0);
+                """
+            )
+
+    # -------------------------
+    # ✍️ Écritures
+    # -------------------------
+    def _bump(self) -> int:
+        return self._conn.execute(
+            "UPDATE catalog_state SET revision = revision + 1 WHERE id = 1 RETURNING revision"
+        ).fetchone()[0]
+
+    def _upsert(self, folder_path: Path, metadata: dict | None, summary: dict | None) -> bool:
+        """Fusionne métadonnées et/ou résumé d'une session ; False si rien n'a changé."""
+        folder_path = Path(folder_path)
+        session_id = (summary or metadata or {}).get("session_id")
+        if session_id in (None, "", "unknown"):
+            session_id = folder_path.name
+        row = self._conn.execute("SELECT metadata, summary FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        meta_json = _dumps(metadata) if metadata is not None else (row["metadata"] if row else None)
+        summary_json = _dumps(summary) if summary is not None else (row["summary"] if row else None)
+        if row is not None and row["metadata"] == meta_json and row["summary"] == summary_json:
+            return False
+
+        meta = json.loads(meta_json) if meta_json else {}
+        summ = json.loads(summary_json) if summary_json else {}
+        themes = sorted(t for t in summ.get("themes_detected", []) if t)
+        score = (summ.get("quality") or {}).get("global_score")
+        revision = self._bump()
+        self._conn.execute(
+            """
+            INSERT INTO sessions (session_id, folder_path, started_at, ended_at, duration_sec, status,
+                                  score_global, user_story_count, themes, metadata, summary, revision, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                folder_path = excluded.folder_path, started_at = excluded.started_at,
+                ended_at = excluded.ended_at, duration_sec = excluded.duration_sec,
+                status = excluded.status, score_global = excluded.score_global,
+                user_story_count = excluded.user_story_count, themes = excluded.themes,
+                metadata = excluded.metadata, summary = excluded.summary,
+                revision = excluded.revision, updated_at = excluded.updated_at
+            """,
+            (
+                session_id, str(folder_path),
+                meta.get("start_time") or summ.get("started_at") or "",
+                meta.get("end_time") or summ.get("ended_at") or "",
+                meta.get("duration_sec") or summ.get("duration_sec") or 0,
+                meta.get("status"), score, summ.get("user_story_count", 0),
+                json.dumps(themes, ensure_ascii=False), meta_json, summary_json, revision, time.time(),
+            ),
+        )
+        self._conn.execute("DELETE FROM session_themes WHERE session_id = ?", (session_id,))
+        self._conn.executemany(
+            "INSERT INTO session_themes (theme, session_id) VALUES (?, ?)",
+            [(theme.lower(), session_id) for theme in themes],
+        )
+        return True
+
+    def record_metadata(self, folder_path: str | Path, metadata: dict) -> bool:
+        with self._lock, self._conn:
+            return self._upsert(Path(folder_path), metadata, None)
+
+    def record_summary(self, folder_path: str | Path, summary: dict) -> bool:
+        with self._lock, self._conn:
+            return self._upsert(Path(folder_path), None, summary)
+
+    def rebuild(self, sessions_dir: str | Path) -> int:
+        """Indexe (en une transaction) tous les dossiers `session_*` existants ; retourne leur nombre."""
+        count = 0
+        with self._lock, self._conn:
+            for folder in sorted(Path(sessions_dir).glob("session_*")):
+                metadata = _read_json(folder / "metadata.json")
+                summary = _read_json(folder / "summary.json")
+                if metadata is None and summary is None:
+                    continue
+                self._upsert(folder, metadata, summary)
+                count += 1
+        info("Catalogue de sessions reconstruit", sessions=count, event="catalog_rebuilt")
+        return count
+
+    # -------------------------
+    # 🔎 Lectures
+    # -------------------------
+    def revision(self) -> int:
+        """Révision globale : change à chaque écriture effective (clé d'invalidation des caches)."""
+        with self._lock:
+            return self._conn.execute("SELECT revision FROM catalog_state WHERE id = 1").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    @staticmethod
+    def _detail(row) -> dict:
+        """Format de /api/sessions/latest : summary.json + clé "metadata"."""
+        detail = json.loads(row["summary"]) if row["summary"] else {"session_id": row["session_id"]}
+        if row["metadata"]:
+            detail["metadata"] = json.loads(row["metadata"])
+        return detail
+
+    def get(self, session_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_id, metadata, summary FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return self._detail(row) if row else None
+
+    def latest(self) -> dict | None:
+        """Session résumée la plus récente."""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT session_id, metadata, summary FROM sessions WHERE summary IS NOT NULL
+                ORDER BY started_at DESC, session_id DESC LIMIT 1
+                """
+            ).fetchone()
+        return self._detail(row) if row else None
+
+    def search(
+        self,
+        since: str | None = None,
+        theme: str | None = None,
+        min_score: float | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> tuple[list[dict], int]:
+        """Sessions filtrées (plus récentes d'abord) et nombre total de résultats."""
+        where, params = [], []
+        if since:
+            where.append("started_at >= ?")
+            params.append(since)
+        if theme:
+            where.append("session_id IN (SELECT session_id FROM session_themes WHERE theme = ?)")
+            params.append(theme.lower())
+        if min_score is not None:
+            where.append("score_global >= ?")
+            params.append(min_score)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM sessions {clause}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {LIST_COLUMNS} FROM sessions {clause} "
+                "ORDER BY started_at DESC, session_id DESC LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        items = [{**dict(row), "themes": json.loads(row["themes"])} for row in rows]
+        return items, total
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# -------------------------
+# 🔌 Catalogue partagé du process
+# -------------------------
+_catalogs: dict[Path, SessionCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog() -> SessionCatalog:
+    """Catalogue du process, ouvert à la première utilisation (chemin : SESSION_CATALOG_PATH)."""
+    path = Path(SESSION_CATALOG_PATH)
+    with _catalogs_lock:
+        if path not in _catalogs:
+            _catalogs[path] = SessionCatalog(path)
+        return _catalogs[path]
+
+
+def catalog_metadata(folder_path: str | Path, metadata: dict):
+    """Indexe des métadonnées de session ; un échec du catalogue n'interrompt jamais l'écriture du fichier."""
+    try:
+        get_catalog().record_metadata(folder_path, metadata)
+    except Exception as e:
+        warn("Catalogue de sessions non mis à jour", folder=str(folder_path), details=str(e), event="catalog_error")
+
+
+def catalog_summary(folder_path: str | Path, summary: dict):
+    """Indexe un résumé de session (même tolérance aux erreurs que catalog_metadata)."""
+    try:
+        get_catalog().record_summary(folder_path, summary)
+    except Exception as e:
+        warn("Catalogue de sessions non mis à jour", folder=str(folder_path), details=str(e), event="catalog_error")
+
+
+# -------------------------
+# 🖥️ CLI
+# -------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Catalogue indexé des sessions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="Réindexer les dossiers de session existants")
+    rebuild.add_argument("sessions_dir", nargs="?", default="input/sessions")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        count = get_catalog().rebuild(args.sessions_dir)
+        print(f"🗂️ {count} session(s) indexée(s) dans {SESSION_CATALOG_PATH}")
+
+
+if __name__ == "__main__":
+    main()
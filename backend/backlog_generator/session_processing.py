@@ -0,0 +1,140 @@
+"""
+session_processing.py
+---------------------
+Analyse post-session d'un enregistrement (dossier contenant metadata.json et l'audio) :
+pipeline audio → User Stories, mise à jour de metadata.json, résumé de session.
+
+Utilisé en direct par AudioListener comme par les workers de la file de jobs
+(job_queue.WorkerPool) : ne dépend pas du micro (sounddevice).
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Callable
+
+from .audio_transcriber import process_audio_feedback
+from .job_queue import JobContext, JobQueue
+from .session_catalog import catalog_metadata
+from .session_summary import generate_session_summary, print_session_summary
+from .logger_manager import info, error
+
+
+def read_metadata(folder_path: str | Path) -> dict:
+    with open(Path(folder_path) / "metadata.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def update_metadata(folder_path: str | Path, /, **fields) -> dict:
+    """
+    Met à jour quelques champs de metadata.json (écriture atomique), répercute la
+    modification dans le catalogue des sessions et retourne le contenu complet.
+    """
+    meta_path = Path(folder_path) / "metadata.json"
+    meta = read_metadata(folder_path) if meta_path.exists() else {}
+    meta.update(fields)
+    tmp = meta_path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=4)
+    os.replace(tmp, meta_path)
+    catalog_metadata(folder_path, meta)
+    return meta
+
+
+def process_session(
+    folder_path: str | Path,
+    push_to_jira: bool = False,
+    analyze: Callable[[dict], list[dict]] | None = None,
+    progress=None,
+) -> dict:
+    """
+    Analyse une session enregistrée et retourne son résumé.
+    `analyze(report)` remplace le pipeline audio complet (ex. fin du pipeline live) ;
+    par défaut : process_audio_feedback sur l'audio référencé par metadata.json, avec les
+    points de reprise d'étapes dans le dossier de session (une relance ne refait que la fin).
+    En cas d'échec, metadata.json passe en "failed", un résumé vide est écrit
+    et l'exception est relancée (pour que la file de jobs puisse retenter).
+    `progress(event, **data)` : transmis au pipeline (événements d'étapes d'un job).
+    """
+    folder_path = Path(folder_path)
+    meta = update_metadata(folder_path, status="processing")
+    session_id = meta.get("session_id", folder_path.name)
+    if analyze is None:
+        def analyze(report):
+            return process_audio_feedback(
+                meta["audio_file"], push_to_jira=push_to_jira, report=report,
+                checkpoint_dir=folder_path, progress=progress, session_id=session_id,
+            )
+
+    info("Lancement du pipeline d’analyse post-session", session_id=session_id)
+    print("🚀 Lancement du pipeline d’analyse post-session...")
+    report = {}
+    failure = None
+    try:
+        user_stories = analyze(report)
+        update_metadata(folder_path, processed=True, status="completed", error=None)
+        info("Pipeline terminé avec succès", session_id=session_id, processed=True)
+        print("✅ Session terminée et analysée.")
+        quality = report.get("quality") or {"global_score": 0.85}  # Valeur temporaire si non renvoyée
+    except Exception as e:
+        print(f"❌ Erreur pendant le pipeline : {e}")
+        error("Erreur dans le pipeline de session", session_id=session_id, details=str(e))
+        update_metadata(folder_path, processed=False, status="failed", error=str(e))
+        user_stories, quality, failure = [], {"global_score": 0.0}, e
+
+    summary = None
+    try:
+        summary = generate_session_summary(
+            metadata_path=folder_path / "metadata.json",
+            user_stories=user_stories,
+            quality=quality,
+            audio_stats=report.get("audio"),
+        )
+        print_session_summary(summary)
+    except Exception as e:
+        print(f"⚠️ Erreur lors de la génération du résumé : {e}")
+        error("Erreur lors du résumé de session", session_id=session_id, details=str(e))
+
+    if failure is not None:
+        raise failure
+    return summary
+
+
+# -------------------------
+# 📥 Traitement via la file de jobs
+# -------------------------
+def enqueue_session(queue: JobQueue, folder_path: str | Path, push_to_jira: bool = False) -> int:
+    """Ajoute une session enregistrée à la file ; metadata.json passe en "queued"."""
+    job_id = queue.enqueue("session", {"folder_path": str(folder_path), "push_to_jira": push_to_jira})
+    update_metadata(folder_path, status="queued", job_id=job_id)
+    info("Session mise en file d'analyse", session_id=Path(folder_path).name, job_id=job_id, event="session_queued")
+    return job_id
+
+
+def session_job(payload: dict, ctx: JobContext) -> dict:
+    """Handler du job "session" (exécuté par un worker de job_queue)."""
+    folder_path = payload["folder_path"]
+    update_metadata(folder_path, job_id=ctx.job.id, job_attempt=ctx.job.attempts, worker=ctx.worker_id)
+    try:
+        summary = process_session(folder_path, push_to_jira=payload.get("push_to_jira", False), progress=ctx.event)
+    except Exception:
+        if ctx.will_retry:
+            update_metadata(folder_path, status="queued")
+        raise
+    return {
+        "session_id": (summary or {}).get("session_id"),
+        "user_story_count": (summary or {}).get("user_story_count", 0),
+        "folder_path": str(folder_path),
+    }
+
+
+def session_job_failed(payload: dict, message: str):
+    """
+    Hook d'échec définitif du job "session" (job_queue.FAIL_HOOKS) : metadata.json passe en
+    "failed", y compris quand le worker a disparu (bail expiré) sans pouvoir le faire lui-même.
+    """
+    folder_path = payload["folder_path"]
+    if (Path(folder_path) / "metadata.json").exists():
+        update_metadata(folder_path, processed=False, status="failed", error=message)
@@ -7,12 +7,23 @@ Utilisé après chaque enregistrement audio et pipeline d'analyse.
 Auteur : Djamil
 """
 
+import os
 import json
 from pathlib import Path
 from datetime import datetime
 
-def generate_session_summary(metadata_path: str, user_stories: list[dict], quality: dict) -> dict:
-    """Construit un résumé structuré d'une session analysée."""
+from .session_catalog import catalog_summary
+
+def generate_session_summary(
+    metadata_path: str,
+    user_stories: list[dict],
+    quality: dict,
+    audio_stats: dict | None = None,
+) -> dict:
+    """
+    Construit un résumé structuré d'une session analysée.
+    `audio_stats` : statistiques du prétraitement audio (silences retirés, octets économisés).
+    """
     meta = {}
     try:
         with open(metadata_path, "r", encoding="utf-8") as f:
@@ -35,11 +46,11 @@ def generate_session_summary(metadata_path: str, user_stories: list[dict], quali
             for us in user_stories[:3]
         ],
     }
+    if audio_stats:
+        summary["audio_preprocessing"] = {k: v for k, v in audio_stats.items() if k != "offset_map"}
 
     # Sauvegarde du résumé à côté du metadata
-    summary_path = Path(metadata_path).parent / "summary.json"
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, ensure_ascii=False, indent=4)
+    summary_path = save_summary(Path(metadata_path).parent, summary)
     print(f"📊 Résumé sauvegardé : {summary_path}")
 
     return summary
@@ -53,6 +64,9 @@ def print_session_summary(summary: dict):
     print(f"⏱️ Durée : {summary['duration_sec']} sec")
     print(f"📊 Score global : {summary['quality']['global_score']:.2f}")
     print(f"💡 {summary['user_story_count']} User Stories générées")
+    audio = summary.get("audio_preprocessing")
+    if audio:
+        print(f"🔇 Octets économisés à l'envoi : {audio['bytes_saved_ratio']:.0%}")
     print(f"🏷️ Thèmes détectés : {', '.join(summary['themes_detected']) or 'Aucun'}")
 
     print("\n✨ Principales User Stories :")
@@ -60,3 +74,14 @@ def print_session_summary(summary: dict):
         print(f"   • {us['title']} ({us['priority']})")
 
     print("---------------------------------------\n")
+
+
+def save_summary(folder_path, summary: dict) -> Path:
+    """Écrit summary.json de façon atomique (fichier temporaire + os.replace) puis l'indexe au catalogue."""
+    summary_path = Path(folder_path) / "summary.json"
+    tmp = summary_path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=4)
+    os.replace(tmp, summary_path)
+    catalog_summary(summary_path.parent, summary)
+    return summary_path
@@ -0,0 +1,469 @@
+"""
+similarity.py
+-------------
+Index de similarité textuelle pour la consolidation et la déduplication.
+
+Le critère de référence reste `SequenceMatcher(None, a, b).ratio()` sur les textes normalisés ;
+les index ne servent qu'à limiter les comparaisons exactes aux seuls candidats plausibles :
+
+- "brute" : tous les éléments sont candidats (comportement historique, O(n²))
+- "exact" : borne supérieure du ratio calculée en NumPy (bigrammes communs, histogrammes
+            de caractères, puis plus longue sous-séquence commune) ; un élément écarté
+            ne pouvait PAS dépasser le seuil → décisions identiques
+- "lsh"   : MinHash + LSH sur les n-grammes de caractères ; candidats en temps ~constant,
+            approximatif (une paire très réarrangée peut être manquée)
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import re
+import zlib
+from array import array
+from collections import Counter
+from difflib import SequenceMatcher
+
+import numpy as np
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+def ratio(a_norm: str, b_norm: str) -> float:
+    """Ratio SequenceMatcher entre deux textes déjà normalisés (a = nouveau, b = existant)."""
+    return SequenceMatcher(None, a_norm, b_norm).ratio()
+
+
+# -------------------------
+# 📏 Index brut (historique)
+# -------------------------
+class BruteForceIndex:
+    """Aucun filtrage : chaque élément indexé est candidat."""
+
+    def __init__(self, threshold: float = 0.0):
+        self.threshold = threshold
+        self.texts: list[str] = []
+        self._matchers: list[SequenceMatcher | None] = []
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add(self, text_norm: str) -> int:
+        self.texts.append(text_norm)
+        self._matchers.append(None)
+        return len(self.texts) - 1
+
+    def candidates(self, text_norm: str) -> np.ndarray:
+        return np.arange(len(self.texts))
+
+    def ratio(self, text_norm: str, pos: int) -> float:
+        """ratio(text_norm, texts[pos]) ; l'index du texte stocké (b2j) n'est construit qu'une fois."""
+        matcher = self._matchers[pos]
+        if matcher is None:
+            matcher = self._matchers[pos] = SequenceMatcher(None, "", self.texts[pos])
+        matcher.set_seq1(text_norm)
+        return matcher.ratio()
+
+
+# -------------------------
+# 🎯 Index exact par bornes
+# -------------------------
+def char_histogram(text: str, buckets: int = 64) -> np.ndarray:
+    """Histogramme des caractères (codes regroupés modulo `buckets`)."""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    return np.bincount(codes % buckets, minlength=buckets).astype(np.int32)
+
+
+def bigram_counts(text: str) -> Counter:
+    """Occurrences de chaque paire de caractères consécutifs."""
+    return Counter(text[i:i + 2] for i in range(len(text) - 1))
+
+
+LCS_MIN_SURVIVORS = 32  # en deçà, BoundedIndex vérifie directement les survivants avec SequenceMatcher
+
+
+class BoundedIndex(BruteForceIndex):
+    """
+    Filtre exact : ratio(a, b) = 2·M / S avec S = |a| + |b| et M = Σ tailles des k blocs communs.
+    Deux bornes de M, calculées en NumPy pour tous les éléments à la fois :
+    - histogrammes : M ≤ Σ min(hist_a, hist_b) (regrouper des caractères dans un même
+      bucket ne peut qu'augmenter cette somme) ;
+    - bigrammes : un bloc de taille s contient s − 1 bigrammes communs (B ≥ M − k) et deux blocs
+      consécutifs sont séparés par au moins un caractère non apparié (k ≤ S − 2M + 1),
+      d'où M ≤ (B + S + 1) / 3 avec B = Σ min(bigrammes_a, bigrammes_b) (index inversé) ;
+    - sous-séquence : les blocs communs, dans l'ordre, forment une sous-séquence commune,
+      donc M ≤ LCS(a, b), calculée bit à bit pour tous les survivants à la fois.
+    Les deux premières bornes sont lâches sur des textes à gabarit commun (« En tant que…,
+    je veux… ») ; la LCS écarte encore ces paires. Seuls les éléments dont la borne dépasse
+    le seuil sont vérifiés avec SequenceMatcher.
+    """
+
+    def __init__(self, threshold: float, buckets: int = 64, strict: bool = True):
+        super().__init__(threshold)
+        self.buckets = buckets
+        self.strict = strict  # True : critère `> seuil` ; False : `>= seuil`
+        self._hist = np.zeros((64, buckets), dtype=np.int32)
+        self._lengths = np.zeros(64, dtype=np.int32)
+        self._postings: dict[str, tuple[array, array]] = {}  # bigramme → (positions, occurrences)
+        self._alphabet: dict[str, int] = {}  # caractère → code (0 = remplissage)
+        self._codes = np.zeros((64, 64), dtype=np.int32)  # codes des caractères, une ligne par texte
+
+    def add(self, text_norm: str) -> int:
+        idx = super().add(text_norm)
+        if idx == len(self._lengths):
+            self._hist = np.concatenate([self._hist, np.zeros_like(self._hist)])
+            self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+            self._codes = np.concatenate([self._codes, np.zeros_like(self._codes)])
+        if len(text_norm) > self._codes.shape[1]:
+            width = max(len(text_norm), 2 * self._codes.shape[1])
+            self._codes = np.pad(self._codes, ((0, 0), (0, width - self._codes.shape[1])))
+        self._hist[idx] = char_histogram(text_norm, self.buckets)
+        self._lengths[idx] = len(text_norm)
+        self._codes[idx, :len(text_norm)] = [self._alphabet.setdefault(c, len(self._alphabet) + 1) for c in text_norm]
+        for gram, count in bigram_counts(text_norm).items():
+            ids, counts = self._postings.setdefault(gram, (array("i"), array("i")))
+            ids.append(idx)
+            counts.append(count)
+        return idx
+
+    def shared_bigrams(self, text_norm: str) -> np.ndarray:
+        """B = Σ min(occurrences) des bigrammes communs avec chaque élément indexé."""
+        n = len(self.texts)
+        found = [(self._postings[g], c) for g, c in bigram_counts(text_norm).items() if g in self._postings]
+        if not found:
+            return np.zeros(n, dtype=np.int64)
+        ids = np.concatenate([np.frombuffer(p[0], dtype=np.int32) for p, _ in found])
+        counts = np.concatenate([np.frombuffer(p[1], dtype=np.int32) for p, _ in found])
+        query = np.repeat([c for _, c in found], [len(p[0]) for p, _ in found])
+        return np.bincount(ids, weights=np.minimum(counts, query), minlength=n).astype(np.int64)
+
+    def _bigram_bounds(self, text_norm: str) -> np.ndarray:
+        total = self._lengths[:len(self.texts)] + len(text_norm)
+        return (self.shared_bigrams(text_norm) + total + 1) // 3
+
+    def _histogram_bounds(self, text_norm: str, positions: np.ndarray) -> np.ndarray:
+        return np.minimum(self._hist[positions], char_histogram(text_norm, self.buckets)).sum(axis=1)
+
+    def lcs_lengths(self, text_norm: str, positions: np.ndarray) -> np.ndarray:
+        """
+        Longueur de la plus longue sous-séquence commune entre `text_norm` et chaque texte de `positions`
+        (algorithme bit-parallèle de Hyyrö : `text_norm` en masques de bits sur W mots de 64 bits,
+        les textes stockés parcourus colonne par colonne, tous à la fois).
+        """
+        length = len(text_norm)
+        if length == 0 or len(positions) == 0:
+            return np.zeros(len(positions), dtype=np.int64)
+        words = (length + 63) // 64
+        masks = np.zeros((words, len(self._alphabet) + 1), dtype=np.uint64)  # mot → code → bits de text_norm
+        for i, c in enumerate(text_norm):
+            if c in self._alphabet:
+                masks[i // 64, self._alphabet[c]] |= np.uint64(1 << (i % 64))
+        codes = np.ascontiguousarray(self._codes[positions, :int(self._lengths[positions].max())].T)
+        v = np.full((words, len(positions)), np.iinfo(np.uint64).max, dtype=np.uint64)
+        for column in codes:
+            carry = None
+            for w in range(words):  # v ← (v + (v & M)) | (v & ~M), addition sur W mots
+                u = v[w] & masks[w][column]
+                kept = v[w] ^ u
+                total = v[w] + u
+                if carry is None:
+                    overflow = total < u
+                else:
+                    total += carry
+                    overflow = (total < u) | ((total == u) & (carry == 1))
+                carry = overflow.astype(np.uint64)
+                np.bitwise_or(total, kept, out=v[w])
+        if length % 64:
+            v[-1] |= ~np.uint64((1 << (length % 64)) - 1)  # bits au-delà du texte : ignorés
+        return 64 * words - np.bitwise_count(v).sum(axis=0, dtype=np.int64)
+
+    def upper_bounds(self, text_norm: str) -> np.ndarray:
+        n = len(self.texts)
+        if n == 0:
+            return np.zeros(0)
+        positions = np.arange(n)
+        total = self._lengths[:n] + len(text_norm)
+        common = np.minimum(self._bigram_bounds(text_norm), self._histogram_bounds(text_norm, positions))
+        common = np.minimum(common, self.lcs_lengths(text_norm, positions))
+        return np.where(total > 0, 2.0 * common / np.maximum(total, 1), 1.0)
+
+    def _passes(self, common: np.ndarray, total: np.ndarray) -> np.ndarray:
+        bounds = np.where(total > 0, 2.0 * common / np.maximum(total, 1), 1.0)
+        # petite marge pour les arrondis flottants : on ne doit jamais écarter un vrai doublon
+        return bounds > self.threshold - 1e-9 if self.strict else bounds >= self.threshold - 1e-9
+
+    def candidates(self, text_norm: str) -> np.ndarray:
+        n = len(self.texts)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        # de la borne la moins chère à la plus fine, chacune sur les seuls survivants de la précédente
+        total = self._lengths[:n] + len(text_norm)
+        survivors = np.flatnonzero(self._passes(self._bigram_bounds(text_norm), total))
+        survivors = survivors[self._passes(self._histogram_bounds(text_norm, survivors), total[survivors])]
+        if len(survivors) < LCS_MIN_SURVIVORS:
+            return survivors  # quelques ratios exacts coûtent moins qu'un passage bit à bit
+        return survivors[self._passes(self.lcs_lengths(text_norm, survivors), total[survivors])]
+
+
+# -------------------------
+# 🪣 MinHash + LSH (approximatif)
+# -------------------------
+_MERSENNE = (1 << 61) - 1
+
+
+def shingles(text_norm: str, n: int = 3) -> np.ndarray:
+    """Empreintes CRC32 (stables entre process) des n-grammes de caractères."""
+    if len(text_norm) < n:
+        grams = [text_norm] if text_norm else []
+    else:
+        grams = {text_norm[i:i + n] for i in range(len(text_norm) - n + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64)
+
+
+class MinHasher:
+    """Signatures MinHash déterministes (graine fixe) : persistables et comparables entre sessions."""
+
+    def __init__(self, num_perm: int = 64, ngram: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text_norm: str) -> np.ndarray:
+        hashes = shingles(text_norm, self.ngram)
+        if len(hashes) == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        # (a·x + b) mod p, calculé pour toutes les permutations d'un coup
+        mixed = (hashes[:, None] * self._a[None, :] + self._b[None, :]) % _MERSENNE
+        return mixed.min(axis=0)
+
+
+class MinHashLSHIndex(BruteForceIndex):
+    """Candidats = éléments partageant au moins une bande de signature MinHash."""
+
+    def __init__(self, threshold: float, num_perm: int = 120, bands: int = 20, ngram: int = 3):
+        super().__init__(threshold)
+        self.hasher = MinHasher(num_perm=num_perm, ngram=ngram)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+
+    def band_keys(self, text_norm: str) -> list[bytes]:
+        sig = self.hasher.signature(text_norm)
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, text_norm: str) -> int:
+        idx = super().add(text_norm)
+        for band, key in enumerate(self.band_keys(text_norm)):
+            self._buckets[band].setdefault(key, []).append(idx)
+        return idx
+
+    def candidates(self, text_norm: str) -> np.ndarray:
+        found = set()
+        for band, key in enumerate(self.band_keys(text_norm)):
+            found.update(self._buckets[band].get(key, ()))
+        return np.array(sorted(found), dtype=np.int64)
+
+
+INDEXES = {"brute": BruteForceIndex, "exact": BoundedIndex, "lsh": MinHashLSHIndex}
+
+
+def make_index(kind: str, threshold: float):
+    """Fabrique un index de similarité par nom ("brute", "exact" ou "lsh")."""
+    try:
+        return INDEXES[kind](threshold)
+    except KeyError:
+        raise ValueError(f"❌ Index de similarité inconnu : {kind} (attendu : {', '.join(INDEXES)})") from None
+
+
+# -------------------------
+# 🧹 Déduplication par lot (ordre conservé)
+# -------------------------
+EXACT_DEDUPE_MAX = 1000  # au-delà, dedupe_indices(method="auto") passe aux vecteurs de n-grammes
+
+def shingle_matrix(texts_norm: list[str], n: int = 3) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vecteurs binaires creux (format CSR : indptr, indices) des n-grammes de caractères,
+    construits en NumPy sur la concaténation des textes (sans boucle par n-gramme).
+    Un texte plus court que `n` est représenté par un unique "n-gramme" : lui-même.
+    """
+    lengths = np.fromiter((len(t) for t in texts_norm), dtype=np.int64, count=len(texts_norm))
+    codes = np.frombuffer("".join(texts_norm).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    doc = np.repeat(np.arange(len(texts_norm)), lengths)
+
+    # n-gramme = points de code concaténés sur 21 bits ; ne doit pas chevaucher deux textes
+    starts = np.arange(max(len(codes) - n + 1, 0))
+    starts = starts[doc[starts] == doc[starts + n - 1]]
+    grams = np.zeros(len(starts), dtype=np.int64)
+    for k in range(n):
+        grams = (grams << 21) | codes[starts + k]
+    rows = doc[starts]
+
+    short = np.flatnonzero(lengths < n)
+    if len(short):
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        extra = np.full(len(short), 1 << 62, dtype=np.int64)  # bit de marquage : jamais un vrai n-gramme
+        for k in range(n - 1):
+            has = lengths[short] > k
+            extra[has] |= codes[offsets[short[has]] + k] << (21 * k)
+        grams = np.concatenate([grams, extra])
+        rows = np.concatenate([rows, short])
+
+    order = np.lexsort((grams, rows))
+    grams, rows = grams[order], rows[order]
+    first = np.r_[True, (grams[1:] != grams[:-1]) | (rows[1:] != rows[:-1])]
+    grams, rows = grams[first], rows[first]
+    _, indices = np.unique(grams, return_inverse=True)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(texts_norm)))])
+    return indptr, indices.astype(np.int64)
+
+
+def minhash_signatures(indptr: np.ndarray, indices: np.ndarray, num_perm: int = 128,
+                       seed: int = 1, block_size: int = 1 << 15) -> np.ndarray:
+    """Signatures MinHash 32 bits (une ligne par texte), calculées par blocs de textes entiers."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+    b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64).astype(np.uint32)
+    n_rows = len(indptr) - 1
+    sig = np.empty((n_rows, num_perm), dtype=np.uint32)
+    row = 0
+    while row < n_rows:
+        end = int(np.searchsorted(indptr, indptr[row] + block_size, side="right")) - 1
+        end = min(max(end, row + 1), n_rows)
+        tokens = indices[indptr[row]:indptr[end]].astype(np.uint32)
+        hashed = tokens[:, None] * a + b  # hachage affine modulo 2^32
+        sig[row:end] = np.minimum.reduceat(hashed, indptr[row:end] - indptr[row], axis=0)
+        row = end
+    return sig
+
+
+def _group_pairs(keys: np.ndarray, docs: np.ndarray) -> np.ndarray:
+    """Toutes les paires (a < b) de documents partageant la même clé."""
+    order = np.lexsort((docs, keys))
+    keys, docs = keys[order], docs[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    counts = np.repeat(ends, ends - starts) - np.arange(len(keys)) - 1
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+    first = np.repeat(np.arange(len(keys)), counts)
+    offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.stack([docs[first], docs[first + 1 + offset]], axis=1)
+
+
+def lsh_pairs(sig: np.ndarray, bands: int) -> np.ndarray:
+    """Paires candidates : textes dont au moins une bande de signature est identique."""
+    n, num_perm = sig.shape
+    rows = num_perm // bands
+    mix = np.random.default_rng(7).integers(1, np.iinfo(np.int64).max, size=rows, dtype=np.uint64) | np.uint64(1)
+    docs = np.arange(n)
+    found = []
+    for band in range(bands):
+        keys = (sig[:, band * rows:(band + 1) * rows] * mix).sum(axis=1)
+        found.append(_group_pairs(keys.view(np.int64), docs))
+    pairs = np.concatenate(found)
+    if len(pairs) == 0:
+        return pairs
+    return np.unique(pairs[:, 0] * n + pairs[:, 1])[:, None] // np.array([n, 1]) % n
+
+
+def signature_agreement(sig: np.ndarray, pairs: np.ndarray, block_size: int = 1 << 16) -> np.ndarray:
+    """Part des valeurs MinHash identiques entre deux textes : estimation de leur Jaccard."""
+    out = np.empty(len(pairs))
+    for start in range(0, len(pairs), block_size):
+        block = pairs[start:start + block_size]
+        out[start:start + len(block)] = (sig[block[:, 0]] == sig[block[:, 1]]).mean(axis=1)
+    return out
+
+
+def jaccard_floor(cosine: float, margin: float = 0.15) -> float:
+    """Jaccard minimal (moins une marge d'estimation) de deux ensembles de même taille au cosinus donné."""
+    return max(cosine / (2.0 - cosine) - margin, 0.0)
+
+
+def pair_cosines(indptr: np.ndarray, indices: np.ndarray, pairs: np.ndarray, block_size: int = 1 << 16) -> np.ndarray:
+    """Cosinus exact entre vecteurs binaires creux, calculé par blocs de paires."""
+    lengths = np.diff(indptr)
+    vocab = int(indices.max()) + 1 if len(indices) else 1
+    out = np.zeros(len(pairs))
+    for start in range(0, len(pairs), block_size):
+        block = pairs[start:start + block_size]
+        keys = []
+        for side in (0, 1):
+            docs = block[:, side]
+            sizes = lengths[docs]
+            pos = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            tokens = indices[np.repeat(indptr[docs], sizes) + pos]
+            keys.append(np.repeat(np.arange(len(block)), sizes) * vocab + tokens)
+        keys = np.sort(np.concatenate(keys))
+        shared = keys[1:][keys[1:] == keys[:-1]] // vocab
+        overlap = np.bincount(shared, minlength=len(block))
+        out[start:start + len(block)] = overlap / np.sqrt(lengths[block[:, 0]] * lengths[block[:, 1]])
+    return out
+
+
+def dedupe_indices(
+    texts: list[str],
+    threshold: float,
+    method: str = "auto",
+    confirm: bool = True,
+    gate: float | None = None,
+    num_perm: int = 128,
+    bands: int = 32,
+) -> list[int]:
+    """
+    Positions des textes à conserver : un texte est écarté dès que son ratio
+    SequenceMatcher avec un texte DÉJÀ conservé atteint `threshold` (≥).
+
+    - method="auto"    : "exact" jusqu'à EXACT_DEDUPE_MAX textes, "shingle" au-delà
+    - method="exact"   : bornes d'histogrammes (BoundedIndex) ; résultat identique à la boucle historique
+    - method="shingle" : vecteurs creux de 3-grammes, paires candidates MinHash/LSH puis cosinus
+                         exact par blocs NumPy (≥ `gate`, défaut : threshold − 0.2) ;
+                         `confirm=True` vérifie chaque paire retenue avec le ratio exact,
+                         sinon un cosinus ≥ `threshold` suffit à écarter le texte.
+    """
+    norms = [normalize(t) for t in texts]
+    if method == "auto":
+        method = "exact" if len(norms) <= EXACT_DEDUPE_MAX else "shingle"
+
+    if method == "exact":
+        index = BoundedIndex(threshold, strict=False)
+        kept = []
+        for i, text in enumerate(norms):
+            if not any(index.ratio(text, pos) >= threshold for pos in index.candidates(text)):
+                index.add(text)
+                kept.append(i)
+        return kept
+    if method != "shingle":
+        raise ValueError(f"❌ Méthode de déduplication inconnue : {method} (attendu : auto, exact, shingle)")
+
+    # Copies exactes : toujours écartées après la première occurrence (ratio = 1)
+    first_seen: dict[str, int] = {}
+    positions = [i for i, text in enumerate(norms) if first_seen.setdefault(text, i) == i]
+    if not positions:
+        return []
+    gate = (max(threshold - 0.2, 0.0) if confirm else threshold) if gate is None else gate
+
+    indptr, indices = shingle_matrix([norms[i] for i in positions])
+    sig = minhash_signatures(indptr, indices, num_perm)
+    pairs = lsh_pairs(sig, bands)
+    if len(pairs):
+        # préfiltre sur la similarité de Jaccard estimée, puis cosinus exact
+        pairs = pairs[signature_agreement(sig, pairs) >= jaccard_floor(gate)]
+        pairs = pairs[pair_cosines(indptr, indices, pairs) >= gate - 1e-9]
+    # voisins antérieurs de chaque texte, regroupés par texte le plus récent
+    pairs = pairs[np.lexsort((pairs[:, 0], pairs[:, 1]))]
+    bounds = np.searchsorted(pairs[:, 1], np.arange(len(positions) + 1))
+
+    keep = np.zeros(len(positions), dtype=bool)
+    for j in range(len(positions)):
+        earlier = pairs[bounds[j]:bounds[j + 1], 0]
+        earlier = earlier[keep[earlier]]
+        if confirm:
+            text = norms[positions[j]]
+            keep[j] = not any(ratio(text, norms[positions[i]]) >= threshold for i in earlier)
+        else:
+            keep[j] = len(earlier) == 0
+    return [positions[j] for j in np.flatnonzero(keep)]
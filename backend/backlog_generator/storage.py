@@ -0,0 +1,27 @@
+"""
+storage.py
+----------
+Helpers communs pour les bases SQLite locales (cache LLM, files de jobs, catalogues...).
+Chaque base est ouverte en mode WAL pour supporter lecteurs et écrivain concurrents.
+"""
+
+import sqlite3
+from pathlib import Path
+
+DATA_DIR = Path("data")
+
+
+def connect_sqlite(path: str | Path) -> sqlite3.Connection:
+    """
+    Ouvre (et crée si besoin) une base SQLite partageable entre threads.
+    L'appelant reste responsable de sérialiser les écritures (verrou ou transaction).
+    """
+    path = Path(path)
+    if str(path) != ":memory:":
+        path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
@@ -0,0 +1,146 @@
+"""
+wav_writer.py
+-------------
+Écriture d'un WAV PCM 16 bits au fil de l'enregistrement (mode « stream to disk »).
+
+- l'audio part sur disque depuis le thread de capture : la RAM reste constante
+- l'en-tête RIFF est corrigé périodiquement : après un crash, le fichier est lisible
+  jusqu'à la dernière correction
+- `recover_wav` reconstruit un en-tête valide à partir de la taille réelle du fichier
+
+Usage (récupération après crash) :
+    PYTHONPATH=backend python -m backlog_generator.wav_writer input/sessions
+    PYTHONPATH=backend python -m backlog_generator.wav_writer input/sessions/session_x/audio.wav
+
+Fait partie du projet : AI Scrum PO Assistant
+"""
+
+import os
+import sys
+import time
+import struct
+from pathlib import Path
+
+import numpy as np
+
+HEADER_SIZE = 44
+SAMPLE_WIDTH = 2
+
+
+def _wav_header(fs: int, channels: int, data_bytes: int) -> bytes:
+    """En-tête WAV canonique (RIFF / fmt PCM / data) de 44 octets."""
+    block_align = channels * SAMPLE_WIDTH
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, fs, fs * block_align, block_align, SAMPLE_WIDTH * 8,
+        b"data", data_bytes,
+    )
+
+
+class StreamingWavWriter:
+    """Ajoute des blocs int16 à un fichier WAV ouvert, avec mise à jour périodique de l'en-tête."""
+
+    def __init__(self, path: str | Path, fs: int, channels: int = 1, header_interval_sec: float = 5.0, fsync: bool = True):
+        self.path = Path(path)
+        self.fs = fs
+        self.channels = channels
+        self.header_interval_sec = header_interval_sec
+        self.fsync = fsync
+        self._frames = 0
+        self._last_fixup = time.monotonic()
+        self._file = open(self.path, "wb")
+        self._file.write(_wav_header(fs, channels, 0))
+
+    def __len__(self) -> int:
+        return self._frames
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write(self, data: np.ndarray):
+        data = np.ascontiguousarray(data, dtype="<i2").reshape(-1, self.channels)
+        self._file.write(memoryview(data).cast("B"))
+        self._frames += len(data)
+        if time.monotonic() - self._last_fixup >= self.header_interval_sec:
+            self._fix_header()
+
+    def read(self, start: int = 0, end: int | None = None) -> np.ndarray:
+        """Relit les échantillons [start, end) déjà écrits (ex. fenêtre du mode live)."""
+        end = self._frames if end is None else min(end, self._frames)
+        if end <= start:
+            return np.zeros((0, self.channels), dtype=np.int16)
+        if not self._file.closed:
+            self._file.flush()
+        frame_bytes = self.channels * SAMPLE_WIDTH
+        with open(self.path, "rb") as f:
+            f.seek(HEADER_SIZE + start * frame_bytes)
+            raw = f.read((end - start) * frame_bytes)
+        return np.frombuffer(raw, dtype="<i2").reshape(-1, self.channels).copy()
+
+    def _fix_header(self):
+        """Réécrit les tailles RIFF/data pour que le fichier soit valide à tout instant."""
+        data_bytes = self._frames * self.channels * SAMPLE_WIDTH
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(_wav_header(self.fs, self.channels, data_bytes))
+        self._file.seek(position)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._last_fixup = time.monotonic()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._fix_header()
+        self._file.close()
+
+
+# -------------------------
+# 🛟 Récupération après crash
+# -------------------------
+def recover_wav(path: str | Path) -> int | None:
+    """
+    Corrige l'en-tête d'un WAV interrompu d'après la taille réelle des données.
+    Retourne le nombre d'échantillons récupérés (None si le fichier n'est pas un WAV PCM 16 bits).
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    if size < HEADER_SIZE:
+        return None
+    with open(path, "r+b") as f:
+        header = f.read(HEADER_SIZE)
+        riff, _, wave_id, fmt_id, _, _, channels, fs, _, _, bits, data_id, declared = struct.unpack(
+            "<4sI4s4sIHHIIHH4sI", header
+        )
+        if riff != b"RIFF" or wave_id != b"WAVE" or fmt_id != b"fmt " or data_id != b"data" or bits != 16:
+            return None
+        frame_bytes = channels * SAMPLE_WIDTH
+        data_bytes = (size - HEADER_SIZE) // frame_bytes * frame_bytes
+        if data_bytes != declared:
+            f.seek(0)
+            f.write(_wav_header(fs, channels, data_bytes))
+        f.truncate(HEADER_SIZE + data_bytes)
+    return data_bytes // frame_bytes
+
+
+def recover_sessions(target: str | Path) -> list[Path]:
+    """Répare un fichier WAV, ou tous les `session_*/audio.wav` d'un répertoire."""
+    target = Path(target)
+    files = [target] if target.is_file() else sorted(target.glob("session_*/audio.wav"))
+    repaired = []
+    for wav in files:
+        frames = recover_wav(wav)
+        if frames is None:
+            print(f"⚠️ Fichier ignoré (pas un WAV PCM 16 bits) : {wav}")
+            continue
+        print(f"🛟 {wav} : {frames} échantillons récupérés")
+        repaired.append(wav)
+    return repaired
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or ["input/sessions"]:
+        recover_sessions(arg)
@@ -0,0 +1,70 @@
+"""
+bench_audio_buffer.py
+---------------------
+Compare, sur un flux synthétique (2 h à 44,1 kHz par défaut, lectures de 1024 échantillons) :
+- l'ancienne capture : liste de `data.copy()` + `np.concatenate` + wavio à l'arrêt
+- PCMBuffer : blocs préalloués + écriture WAV bloc par bloc
+
+Mesures : pic mémoire (tracemalloc, suivi natif des allocations NumPy) et latence du stop.
+
+Usage : PYTHONPATH=backend python -m benchmarks.bench_audio_buffer [--minutes 120]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import wavio
+
+from backlog_generator.audio_buffer import PCMBuffer
+
+FS = 44100
+READ = 1024
+
+
+def _stream(minutes: float):
+    block = (np.random.default_rng(0).standard_normal((READ, 1)) * 3000).astype(np.int16)
+    for _ in range(int(minutes * 60 * FS) // READ):
+        yield block
+
+
+def bench_frames_list(minutes: float, out: Path) -> tuple[float, float]:
+    tracemalloc.start()
+    frames = []
+    for data in _stream(minutes):
+        frames.append(data.copy())
+    t0 = time.perf_counter()
+    full_audio = np.concatenate(frames, axis=0)
+    wavio.write(str(out), full_audio, FS, sampwidth=2)
+    stop_latency = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6, stop_latency
+
+
+def bench_pcm_buffer(minutes: float, out: Path) -> tuple[float, float]:
+    tracemalloc.start()
+    buffer = PCMBuffer(channels=1, block_frames=FS * 60)
+    for data in _stream(minutes):
+        buffer.write(data)
+    t0 = time.perf_counter()
+    buffer.write_wav(str(out), FS)
+    stop_latency = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6, stop_latency
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=float, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🎧 Flux synthétique : {args.minutes:.0f} min à {FS} Hz")
+        for name, bench in [("liste + concatenate", bench_frames_list), ("PCMBuffer", bench_pcm_buffer)]:
+            peak_mb, latency = bench(args.minutes, Path(tmp) / "audio.wav")
+            print(f"   {name:<22} pic mémoire : {peak_mb:8.1f} Mo | latence stop : {latency:6.2f} s")
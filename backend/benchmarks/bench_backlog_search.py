@@ -0,0 +1,106 @@
+"""
+bench_backlog_search.py
+-----------------------
+Latence des recherches du backlog persistant (SQLite FTS5) sur un corpus synthétique :
+- import : une transaction par session
+- recherche plein texte classée bm25, avec et sans filtre, requêtes sans texte, facettes
+- requêtes larges à froid (classement complet) puis relues du cache de classement
+
+Usage : PYTHONPATH=backend python -m benchmarks.bench_backlog_search [--stories 100000 --per-session 20]
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from backlog_generator.backlog_store import BacklogStore
+
+THEMES = ["Alertes météo", "Cartographie", "Paiement", "Notifications", "Profil", "Recherche", "Hors ligne", "Sécurité"]
+PRIORITIES = ["Haute", "Moyenne", "Basse"]
+SYLLABLES = ["ma", "rée", "hou", "le", "vent", "car", "te", "spot", "pré", "vi", "sion", "pai", "ment",
+             "no", "ti", "fi", "pro", "fil", "syn", "chro", "ni", "sa", "zoom", "fa", "vo", "ri"]
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list[str]:
+    """Vocabulaire synthétique ; tiré ensuite selon une loi de Zipf (quelques mots très fréquents)."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def make_session(rng: random.Random, n: int, vocabulary: list[str], cum_weights: list[float]) -> list[dict]:
+    stories = []
+    for _ in range(n):
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=6)
+        stories.append({
+            "theme": rng.choice(THEMES),
+            "priority": rng.choice(PRIORITIES),
+            "relevance_score": round(rng.random(), 2),
+            "title": " ".join(words[:3]).capitalize(),
+            "idea": " ".join(words),
+            "user_story": f"En tant qu'utilisateur, je veux {' '.join(words[:4])} afin de {' '.join(words[4:])}.",
+            "acceptance_criteria": [f"Étant donné {w}, alors le système répond." for w in words[:3]],
+        })
+    return stories
+
+
+def timed(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stories", type=int, default=100_000)
+    parser.add_argument("--per-session", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    frequent, medium, rare = vocabulary[0], vocabulary[100], vocabulary[2000]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BacklogStore(Path(tmp) / "backlog.sqlite")
+        t0 = time.perf_counter()
+        for i in range(args.stories // args.per_session):
+            store.add_session(f"session_{i:06d}", make_session(rng, args.per_session, vocabulary, cum_weights))
+        store.optimize()
+        elapsed = time.perf_counter() - t0
+        print(f"📥 {len(store)} US importées en {elapsed:.1f} s ({len(store) / elapsed:,.0f} US/s)\n")
+
+        cases = {
+            "mot rare": lambda: store.search(rare),
+            "mot moyen": lambda: store.search(medium),
+            "mot fréquent": lambda: store.search(frequent),
+            "mot fréquent (froid)": lambda: (store._rank_cache.clear(), store.search(frequent)),
+            "mot du gabarit": lambda: store.search("utilisateur"),
+            "gabarit (froid)": lambda: (store._rank_cache.clear(), store.search("utilisateur")),
+            "2 mots + préfixe": lambda: store.search(f"{medium} {rare[:4]}"),
+            "texte + filtres": lambda: store.search(medium, theme="Cartographie", priority="Haute"),
+            "filtres seuls": lambda: store.search(theme="Paiement", min_relevance=0.5),
+            "page 20 (offset)": lambda: store.search(medium, offset=400),
+            "facettes texte": lambda: store.facets(medium),
+            "facettes globales": lambda: store.facets(),
+        }
+        for name, word in (("rare", rare), ("moyen", medium), ("fréquent", frequent)):
+            print(f"mot {name:<9} « {word} » : {store.search(word, limit=1)[1]} US")
+        print()
+        print(f"{'requête':<22} {'médiane (ms)':>13} {'p95 (ms)':>10}")
+        for name, fn in cases.items():
+            median, p95 = timed(fn, args.repeat)
+            print(f"{name:<22} {median:>13.2f} {p95:>10.2f}")
+        store.close()
@@ -0,0 +1,35 @@
+"""
+bench_consolidator.py
+---------------------
+Temps de consolidate_user_stories selon l'index de similarité, de 100 à 20 000 US synthétiques
+(30 % de variantes d'US précédentes) :
+- "brute" : comparaison exhaustive historique (limitée à --brute-max US, O(n²))
+- "exact" : bornes NumPy (bigrammes, histogrammes, sous-séquence commune), mêmes fusions que "brute"
+- "lsh"   : MinHash + LSH, approximatif et quasi linéaire
+
+Usage : PYTHONPATH=backend python -m benchmarks.bench_consolidator [--sizes 100 500 5000 20000]
+"""
+
+import argparse
+import copy
+import time
+
+from backlog_generator.consolidator import consolidate_user_stories
+from benchmarks.synthetic import synthetic_stories
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000, 5000, 20000])
+    parser.add_argument("--brute-max", type=int, default=500, help="taille max. pour brute")
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        stories = synthetic_stories(n)
+        print(f"🧮 {n} US synthétiques")
+        for kind in ("brute", "exact", "lsh"):
+            if kind == "brute" and n > args.brute_max:
+                print(f"   {kind:<6} (ignoré au-delà de {args.brute_max} US)")
+                continue
+            t0 = time.perf_counter()
+            kept = consolidate_user_stories(copy.deepcopy(stories), index=kind)
+            print(f"   {kind:<6} {len(kept):6d} US retenues en {time.perf_counter() - t0:8.2f} s")
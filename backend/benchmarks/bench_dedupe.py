@@ -0,0 +1,37 @@
+"""
+bench_dedupe.py
+---------------
+Temps de similarity.dedupe_indices sur des idées synthétiques (30 % de variantes) :
+- "exact"   : bornes d'histogrammes + SequenceMatcher (limité aux petites tailles)
+- "shingle" : n-grammes creux + MinHash/LSH + cosinus par blocs, avec et sans confirmation exacte
+
+Usage : PYTHONPATH=backend python -m benchmarks.bench_dedupe [--sizes 1000 10000 50000]
+"""
+
+import argparse
+import time
+
+from backlog_generator.similarity import dedupe_indices
+from benchmarks.synthetic import synthetic_ideas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--threshold", type=float, default=0.82)
+    parser.add_argument("--exact-max", type=int, default=2000, help="taille max. pour la méthode exacte")
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        ideas = synthetic_ideas(n, vocab_size=20000)
+        print(f"🧮 {n} idées synthétiques (seuil {args.threshold})")
+        for label, kwargs in [
+            ("exact", {"method": "exact"}),
+            ("shingle + confirmation", {"method": "shingle"}),
+            ("shingle (cosinus seul)", {"method": "shingle", "confirm": False}),
+        ]:
+            if kwargs["method"] == "exact" and n > args.exact_max:
+                print(f"   {label:<24} (ignoré au-delà de {args.exact_max} idées)")
+                continue
+            t0 = time.perf_counter()
+            kept = dedupe_indices(ideas, args.threshold, **kwargs)
+            print(f"   {label:<24} {len(kept):6d} idées retenues en {time.perf_counter() - t0:7.2f} s")
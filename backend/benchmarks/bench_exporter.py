@@ -0,0 +1,84 @@
+"""
+bench_exporter.py
+-----------------
+Durée et pic mémoire des exports du backlog, alimentés par un générateur :
+Markdown, CSV, JSON Lines (brut et gzip) et Parquet (si pyarrow est installé).
+La durée inclut la génération des US (ligne « génération seule ») ; le pic mémoire est
+mesuré par tracemalloc lors d'une seconde passe (--memory), plus lente.
+
+Usage : PYTHONPATH=backend python -m benchmarks.bench_exporter [--stories 200000 --memory]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from backlog_generator import exporter
+
+from .bench_backlog_search import SYLLABLES, THEMES, PRIORITIES
+
+
+def generate_stories(n: int, seed: int = 7):
+    """US synthétiques produites à la demande (le générateur ne garde rien en mémoire)."""
+    rng = random.Random(seed)
+    for i in range(n):
+        words = ["".join(rng.choices(SYLLABLES, k=3)) for _ in range(6)]
+        yield {
+            "theme": rng.choice(THEMES),
+            "priority": rng.choice(PRIORITIES),
+            "relevance_score": round(rng.random() * 5, 2),
+            "title": " ".join(words[:3]).capitalize(),
+            "idea": " ".join(words),
+            "user_story": f"En tant qu'utilisateur, je veux {' '.join(words[:4])} afin de {' '.join(words[4:])}.",
+            "acceptance_criteria": [f"Étant donné {w}, alors le système répond." for w in words[:3]],
+        }
+
+
+def run(fmt: str, compress: bool, n: int, directory: str, trace: bool = False) -> tuple[float, float, str]:
+    if trace:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        path = exporter.export_stories(generate_stories(n), fmt, directory, compress)
+        return time.perf_counter() - t0, tracemalloc.get_traced_memory()[1] / 1e6 if trace else 0.0, path
+    finally:
+        if trace:
+            tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=200_000)
+    parser.add_argument("--memory", action="store_true", help="Mesure aussi le pic mémoire (tracemalloc)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    for _ in generate_stories(args.stories):
+        pass
+    results = [("génération seule", time.perf_counter() - t0, None, None)]
+
+    modes = [("markdown", False), ("csv", False), ("jsonl", False), ("jsonl", True), ("parquet", False), ("parquet", True)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, compress in modes:
+            label = f"{fmt}{' + gzip' if compress else ''}"
+            directory = os.path.join(tmp, label.replace(" + ", "_"))
+            try:
+                elapsed, _, path = run(fmt, compress, args.stories, directory)
+                peak = run(fmt, compress, args.stories, directory, trace=True)[1] if args.memory else None
+            except RuntimeError as e:
+                results.append((label, None, None, str(e)))
+                continue
+            results.append((label, elapsed, peak, f"{os.path.getsize(path) / 1e6:.1f}"))
+
+    print(f"\n{args.stories} US")
+    print(f"{'format':<18}{'durée (s)':>10}{'pic mémoire (Mo)':>18}   taille (Mo)")
+    for label, elapsed, peak, size in results:
+        elapsed = f"{elapsed:.2f}" if elapsed is not None else "—"
+        peak = f"{peak:.1f}" if peak is not None else "—"
+        print(f"{label:<18}{elapsed:>10}{peak:>18}   {size or ''}")
+
+if __name__ == "__main__":
+    main()
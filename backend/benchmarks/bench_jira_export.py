@@ -0,0 +1,51 @@
+"""
+bench_jira_export.py
+--------------------
+Débit de l'export Jira contre un faux serveur local qui simule la latence réseau
+et une limite de requêtes simultanées (429 + Retry-After au-delà) :
+- "séquentiel" : une requête par US, l'une après l'autre
+- "concurrent" : une requête par US, concurrence adaptative AIMD
+- "bulk"       : lots de 50 via /rest/api/3/issue/bulk
+
+Usage : PYTHONPATH=backend python -m benchmarks.bench_jira_export [--stories 200 --latency 0.03 --server-limit 6]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from backlog_generator import jira_client
+from benchmarks.jira_stub import JiraStub
+from benchmarks.synthetic import make_stories
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stories", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.03, help="latence simulée par requête (s)")
+    parser.add_argument("--server-limit", type=int, default=6, help="requêtes simultanées tolérées par le serveur")
+    parser.add_argument("--concurrency", type=int, default=16, help="plafond de la concurrence adaptative")
+    args = parser.parse_args()
+
+    stories = make_stories(args.stories)
+    print(f"{'mode':<12} {'US/s':>8} {'durée (s)':>10} {'429':>6} {'pic simultané':>14}")
+    for mode, kwargs in (
+        ("séquentiel", {"bulk": False}),
+        ("concurrent", {"bulk": False, "concurrency": args.concurrency}),
+        ("bulk", {"bulk": True}),
+    ):
+        stub = JiraStub()
+        stub.latency = args.latency
+        stub.max_in_flight = args.server_limit
+        jira_client.JIRA_URL, jira_client.JIRA_EMAIL = stub.url, "bench@example.com"
+        jira_client.JIRA_API_TOKEN, jira_client.JIRA_PROJECT_KEY = "token", "BENCH"
+        jira_client._session = None
+
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            keys = jira_client.export_user_stories_to_jira(stories, **kwargs)
+        elapsed = time.perf_counter() - t0
+        assert len(keys) == len(stories), f"{mode} : {len(keys)}/{len(stories)} US créées"
+        print(f"{mode:<12} {len(keys) / elapsed:>8.0f} {elapsed:>10.2f} {stub.throttled:>6} {stub.peak_in_flight:>14}")
+        stub.close()
@@ -0,0 +1,124 @@
+"""
+jira_stub.py
+------------
+Faux serveur Jira Cloud local (http.server), partagé par les tests et les benchmarks d'export :
+créations unitaires et en masse, mises à jour, pannes injectées et limite de requêtes simultanées
+(au-delà, réponse 429 avec `Retry-After`, comme le limiteur de Jira Cloud).
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class JiraStub:
+    """
+    Serveur Jira Cloud minimal (http.server) :
+    - POST /rest/api/3/issue et /rest/api/3/issue/bulk, PUT /rest/api/3/issue/{key}
+    - `latency` : délai simulé par requête
+    - `fail_summaries` : {résumé: [statuts]} → l'élément échoue avec ces statuts, un par tentative
+    - `throttle` : liste de retry-after (s) ; chaque requête en consomme un et répond 429
+    - `max_in_flight` : au-delà de ce nombre de requêtes simultanées, 429 avec `Retry-After: retry_after`
+    Compte les requêtes, les connexions TCP, les 429 et les issues créées.
+    """
+
+    def __init__(self):
+        self.latency = 0.0
+        self.fail_summaries: dict[str, list[int]] = {}
+        self.throttle: list[float] = []
+        self.max_in_flight: int | None = None
+        self.retry_after = 0.05
+        self.throttled = 0
+        self.issues: dict[str, dict] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.connections: set = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _create(self, fields: dict) -> tuple[int, dict]:
+        statuses = self.fail_summaries.get(fields.get("summary"))
+        if statuses:
+            status = statuses.pop(0)
+            return status, {"status": status, "elementErrors": {"errors": {"summary": "rejeté"}}}
+        key = f"SCRUM-{len(self.issues) + 1}"
+        self.issues[key] = fields
+        return 201, {"id": str(len(self.issues)), "key": key, "self": f"{self.url}/rest/api/3/issue/{key}"}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: dict | None = None, headers: dict | None = None):
+                data = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests.append((self.command, self.path))
+                    stub.connections.add(self.client_address)
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                    overloaded = stub.max_in_flight is not None and stub.in_flight > stub.max_in_flight
+                    if overloaded:
+                        stub.throttled += 1
+                try:
+                    if overloaded:
+                        return self._reply(429, {"errorMessages": ["rate limited"]},
+                                           {"Retry-After": str(stub.retry_after)})
+                    time.sleep(stub.latency)
+                    with stub._lock:
+                        if stub.throttle:
+                            return self._reply(429, {"errorMessages": ["rate limited"]},
+                                               {"Retry-After": str(stub.throttle.pop(0))})
+                        return self._route(body)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _route(self, body: dict):
+                if self.command == "POST" and self.path == "/rest/api/3/issue/bulk":
+                    issues, errors = [], []
+                    for number, update in enumerate(body.get("issueUpdates", [])):
+                        status, result = stub._create(update["fields"])
+                        if status == 201:
+                            issues.append(result)
+                        else:
+                            errors.append({**result, "failedElementNumber": number})
+                    return self._reply(400 if errors and not issues else 201,
+                                       {"issues": issues, "errors": errors})
+                if self.command == "POST" and self.path == "/rest/api/3/issue":
+                    status, result = stub._create(body["fields"])
+                    return self._reply(status, result if status == 201 else {"errors": result["elementErrors"]})
+                match = re.fullmatch(r"/rest/api/3/issue/([A-Z]+-\d+)", self.path)
+                if self.command == "PUT" and match and match.group(1) in stub.issues:
+                    stub.issues[match.group(1)] = {**stub.issues[match.group(1)], **body["fields"]}
+                    return self._reply(204)
+                return self._reply(404, {"errorMessages": ["not found"]})
+
+            do_POST = _handle
+            do_PUT = _handle
+
+        return Handler
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,79 @@
+"""
+synthetic.py
+------------
+Jeux de données synthétiques partagés par les tests et les benchmarks :
+- make_stories      : US numérotées et toutes distinctes (export Jira)
+- synthetic_stories : US dont une part sont des variantes d'US précédentes (consolidation)
+- synthetic_ideas   : idées dont une part sont des variantes d'idées précédentes (déduplication)
+
+Déterministes pour une graine donnée.
+"""
+
+import random
+
+LETTERS = "abcdefghijklmnopqrstuvwxyzéè"
+
+WORDS = (
+    "ajouter afficher recevoir personnaliser configurer alerter planifier filtrer exporter notifier "
+    "une la le les des alerte météo vent houle marée spot carte favoris session photo prévision "
+    "heure jour semaine notification mode sombre hors ligne profil niveau planche plage webcam groupe"
+).split()
+
+
+def make_stories(n: int) -> list[dict]:
+    """US numérotées, toutes distinctes ; le titre « Alerte vent n°i » identifie l'US i."""
+    return [
+        {
+            "title": f"Alerte vent n°{i}",
+            "idea": f"Recevoir l'alerte vent du spot {i}",
+            "user_story": f"En tant que surfeur, je veux recevoir l'alerte vent du spot {i}.",
+            "acceptance_criteria": ["Seuil affiché"],
+            "priority": "Moyenne",
+        }
+        for i in range(n)
+    ]
+
+
+def synthetic_stories(n: int, seed: int = 0, dup_rate: float = 0.3, vocab_size: int = 5000) -> list[dict]:
+    """US aléatoires dont une part (`dup_rate`) sont des variantes (mot changé / ajouté) d'US précédentes."""
+    rng = random.Random(seed)
+    vocab = sorted({"".join(rng.choices(LETTERS, k=rng.randint(3, 9))) for _ in range(vocab_size)})
+    stories = []
+    for i in range(n):
+        if stories and rng.random() < dup_rate:
+            words = rng.choice(stories)["idea"].split()
+            words[rng.randrange(len(words))] = rng.choice(vocab)
+            if rng.random() < 0.5:
+                words.insert(rng.randrange(len(words)), rng.choice(vocab))
+        else:
+            words = rng.sample(vocab, rng.randint(4, 8))
+        idea = " ".join(words)
+        stories.append({
+            "theme": rng.choice(["Météo", "Communauté", "Interface"]),
+            "title": " ".join(words[:4]).capitalize(),
+            "idea": idea,
+            "user_story": f"En tant qu'utilisateur, je veux {idea} afin de {' '.join(rng.sample(vocab, 3))}.",
+            "acceptance_criteria": [f"critère {i % 7}", f"critère {i % 5}"],
+        })
+    return stories
+
+
+def synthetic_ideas(n: int, seed: int = 0, dup_rate: float = 0.3, vocab_size: int = 3000) -> list[str]:
+    """Idées aléatoires dont une part sont des variantes (mot remplacé / ajouté / retiré) d'idées précédentes."""
+    rng = random.Random(seed)
+    vocab = WORDS + ["".join(rng.choices("abcdefghijklmnopqrstuvwxyzé", k=rng.randint(3, 9))) for _ in range(vocab_size)]
+    ideas = []
+    for _ in range(n):
+        if ideas and rng.random() < dup_rate:
+            words = rng.choice(ideas).split()
+            op = rng.random()
+            if op < 0.4:
+                words[rng.randrange(len(words))] = rng.choice(vocab)
+            elif op < 0.7:
+                words.insert(rng.randrange(len(words) + 1), rng.choice(vocab))
+            else:
+                del words[rng.randrange(len(words))]
+            ideas.append(" ".join(words))
+        else:
+            ideas.append(" ".join(rng.choice(vocab) for _ in range(rng.randint(6, 14))))
+    return ideas
@@ -0,0 +1,51 @@
+"""
+conftest.py
+-----------
+Configuration commune des tests :
+- clé Groq factice (aucun test n'appelle réellement l'API)
+- cache LLM partagé désactivé pour ne pas polluer data/ (les tests du cache
+  instancient leur propre LLMCache dans un dossier temporaire)
+- catalogue des sessions, backlog, registre d'import et registre Jira des jobs texte redirigés vers un dossier temporaire pour chaque test
+"""
+
+import os
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ.setdefault("LLM_CACHE_DISABLED", "1")
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def session_catalog_path(tmp_path, monkeypatch):
+    """Chaque test écrit dans son propre catalogue de sessions et backlog (jamais dans data/)."""
+    from backlog_generator import backlog_store, batch_ingest, feedback_listener, session_catalog
+
+    path = tmp_path / "sessions.sqlite"
+    monkeypatch.setattr(session_catalog, "SESSION_CATALOG_PATH", path)
+    monkeypatch.setattr(backlog_store, "BACKLOG_STORE_PATH", tmp_path / "backlog.sqlite")
+    monkeypatch.setattr(batch_ingest, "BATCH_INGEST_PATH", tmp_path / "batch_ingest.sqlite")
+    monkeypatch.setattr(feedback_listener, "TEXT_JOBS_JIRA_LEDGER_PATH", tmp_path / "text_jobs_jira.sqlite")
+    yield path
+
+
+# -------------------------
+# 🧪 Faux serveur Jira local
+# -------------------------
+from benchmarks.jira_stub import JiraStub
+
+
+@pytest.fixture
+def jira_stub(monkeypatch):
+    """Démarre un faux Jira et y branche jira_client (configuration + nouvelle session)."""
+    from backlog_generator import jira_client
+
+    stub = JiraStub()
+    monkeypatch.setattr(jira_client, "JIRA_URL", stub.url)
+    monkeypatch.setattr(jira_client, "JIRA_EMAIL", "po@example.com")
+    monkeypatch.setattr(jira_client, "JIRA_API_TOKEN", "token")
+    monkeypatch.setattr(jira_client, "JIRA_PROJECT_KEY", "SCRUM")
+    monkeypatch.setattr(jira_client, "_session", None)
+    monkeypatch.setattr(jira_client, "retry_delay", lambda attempt, retry_after=None: 0.0)
+    yield stub
+    stub.close()
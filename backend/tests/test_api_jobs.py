@@ -0,0 +1,157 @@
+"""
+test_api_jobs.py
+----------------
+Teste les endpoints /api/jobs (soumission, état, flux SSE) avec un pipeline simulé :
+ - upload audio multipart écrit sur disque tel quel, session créée et mise en file
+ - feedback texte en JSON
+ - import en masse d'un fichier de feedbacks (job "batch")
+ - plusieurs jobs exécutés en parallèle sans bloquer la boucle d'événements
+ - analyse multipart au fil de l'eau, quel que soit le découpage des blocs reçus
+"""
+
+import os
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import jobs
+from api.main import app
+from backlog_generator import feedback_listener, session_processing
+from backlog_generator.job_queue import JobQueue
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "_queue", JobQueue(tmp_path / "jobs.sqlite", retry_base_sec=0))
+    monkeypatch.setattr(jobs, "SESSIONS_DIR", tmp_path / "sessions")
+    monkeypatch.setattr(jobs, "BATCH_INPUT_DIR", tmp_path / "input")
+
+    def fake_audio_pipeline(file_path, push_to_jira=False, report=None, progress=None, **kwargs):
+        for stage in ("transcript", "segments", "ideas", "stories"):
+            progress("stage_started", stage=stage)
+            time.sleep(0.1)
+            progress("stage_completed", stage=stage, reused=False)
+        report["quality"] = {"global_score": 0.8}
+        return [{"title": "Alerte vent", "priority": "Haute", "theme": "Alertes"}]
+
+    def fake_text_pipeline(text, push_to_jira=False, progress=None, **kwargs):
+        if progress is not None:
+            progress("stage_completed", stage="stories", items=1)
+        return [{"idea": text, "user_story": f"En tant qu'utilisateur, {text}"}]
+
+    monkeypatch.setattr(session_processing, "process_audio_feedback", fake_audio_pipeline)
+    monkeypatch.setattr(feedback_listener, "process_text_feedback", fake_text_pipeline)
+    with TestClient(app) as c:
+        yield c
+
+
+def wait_for(client, job_id: int, timeout: float = 20) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"❌ Job {job_id} non terminé")
+
+
+def read_sse(client, url: str) -> list[dict]:
+    events = []
+    with client.stream("GET", url) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        for line in response.iter_lines():
+            if line.startswith("data: "):
+                events.append(json.loads(line[6:]))
+    return events
+
+
+def test_audio_upload_is_streamed_and_processed(client):
+    audio = os.urandom(3 * 1024 * 1024)
+    response = client.post("/api/jobs", files={"file": ("réunion.flac", audio, "audio/flac")}, data={"push_to_jira": "0"})
+    assert response.status_code == 202, response.text
+    body = response.json()
+    assert body["kind"] == "session" and body["events_url"] == f"/api/jobs/{body['job_id']}/events"
+
+    job = wait_for(client, body["job_id"])
+    assert job["status"] == "succeeded", job
+    folder = jobs.SESSIONS_DIR / job["result"]["session_id"]
+    assert (folder / "audio.flac").read_bytes() == audio, "❌ Audio reçu altéré"
+    meta = json.loads((folder / "metadata.json").read_text())
+    assert meta["status"] == "completed" and meta["source"] == "api" and meta["job_id"] == body["job_id"]
+
+    events = read_sse(client, body["events_url"])
+    kinds = [e["event"] for e in events]
+    assert kinds[0] == "queued" and kinds[-1] == "succeeded", kinds
+    assert [e["stage"] for e in events if e["event"] == "stage_completed"] == ["transcript", "segments", "ideas", "stories"]
+
+    resumed = read_sse(client, f"{body['events_url']}?after={events[-2]['id']}")
+    assert [e["event"] for e in resumed] == ["succeeded"], "❌ Reprise du flux après un identifiant"
+
+
+def test_text_feedback_and_errors(client):
+    response = client.post("/api/jobs", json={"text": "je veux une alerte marée"})
+    assert response.status_code == 202 and response.json()["kind"] == "text"
+    job = wait_for(client, response.json()["job_id"])
+    assert job["result"]["user_stories"][0]["idea"] == "je veux une alerte marée"
+
+    assert client.post("/api/jobs", json={"text": "  "}).status_code == 400
+    assert client.post("/api/jobs", content=b"x", headers={"content-type": "text/plain"}).status_code == 415
+    assert client.get("/api/jobs/999").status_code == 404
+    assert not list(jobs.SESSIONS_DIR.glob("*")), "❌ Aucun dossier de session ne doit rester pour un texte"
+
+
+def test_batch_upload_and_path(client):
+    csv_body = "comment\nAlerte orage sur mon itinéraire\nMode hors ligne pour la carte\n".encode("utf-8")
+    response = client.post("/api/jobs/batch", content=csv_body, headers={"content-type": "text/csv"})
+    assert response.status_code == 202 and response.json()["kind"] == "batch"
+    job = wait_for(client, response.json()["job_id"])
+    assert job["status"] == "succeeded" and job["result"]["processed"] == 2, job
+    uploaded = list((jobs.BATCH_INPUT_DIR / "batches").glob("*.csv"))
+    assert len(uploaded) == 1 and uploaded[0].read_bytes() == csv_body, "❌ Fichier reçu altéré"
+
+    response = client.post("/api/jobs/batch", json={"path": str(uploaded[0])})
+    job = wait_for(client, response.json()["job_id"])
+    assert job["result"]["skipped"] == 2, "❌ Un fichier déjà importé ne doit pas être retraité"
+
+    assert client.post("/api/jobs/batch", json={"path": "/etc/passwd"}).status_code == 400
+    assert client.post("/api/jobs/batch", json={"path": str(jobs.BATCH_INPUT_DIR / "absent.txt")}).status_code == 404
+    assert client.post("/api/jobs/batch", content=b"", headers={"content-type": "text/plain"}).status_code == 400
+
+
+def test_concurrent_jobs_keep_event_loop_responsive(client):
+    ids = [
+        client.post("/api/jobs?filename=r.wav", content=os.urandom(1024), headers={"content-type": "audio/wav"}).json()["job_id"]
+        for _ in range(6)
+    ]
+    t0 = time.perf_counter()
+    client.get("/ping")
+    assert time.perf_counter() - t0 < 0.3, "❌ La boucle d'événements est bloquée par les jobs"
+
+    results = [wait_for(client, i) for i in ids]
+    assert all(r["status"] == "succeeded" for r in results)
+    queue = jobs.get_queue()
+    starts = [next(e["at"] for e in queue.events(i) if e["event"] == "started") for i in ids]
+    ends = [next(e["at"] for e in queue.events(i) if e["event"] == "succeeded") for i in ids]
+    assert max(starts) < min(ends), "❌ Les jobs auraient dû s'exécuter en parallèle"
+
+
+def test_multipart_parser_handles_any_chunking(tmp_path):
+    boundary = b"----frontiere42"
+    audio = os.urandom(50_000)
+    body = (
+        b"--" + boundary + b"\r\nContent-Disposition: form-data; name=\"push_to_jira\"\r\n\r\n1\r\n"
+        b"--" + boundary + b"\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.wav\"\r\n"
+        b"Content-Type: audio/wav\r\n\r\n" + audio + b"\r\n--" + boundary + b"--\r\n"
+    )
+    for size in (1, 7, 4096):
+        folder = tmp_path / f"chunks_{size}"
+        folder.mkdir()
+        sink = jobs.MultipartToDisk(boundary, folder)
+        for i in range(0, len(body), size):
+            sink.write(body[i:i + size])
+        sink.close()
+        assert sink.fields == {"push_to_jira": "1"}
+        assert sink.file_path.read_bytes() == audio, f"❌ Fichier corrompu avec des blocs de {size} octets"
+    print("✅ API de jobs conforme")
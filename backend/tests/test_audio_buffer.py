@@ -0,0 +1,35 @@
+"""
+test_audio_buffer.py
+--------------------
+Vérifie le tampon PCM à blocs préalloués utilisé par AudioListener :
+ - écriture à cheval sur plusieurs blocs sans perte
+ - lecture d'une fenêtre arbitraire (mode live)
+ - sauvegarde WAV identique au signal capturé
+"""
+
+import numpy as np
+
+from backlog_generator.audio_buffer import PCMBuffer
+from backlog_generator.audio_chunker import read_wav
+
+
+def test_buffer_roundtrip(tmp_path):
+    rng = np.random.default_rng(42)
+    signal = rng.integers(-30000, 30000, size=(10_000, 1), dtype=np.int16)
+
+    buffer = PCMBuffer(channels=1, block_frames=1500)
+    for start in range(0, len(signal), 1024):  # lectures micro de 1024 échantillons
+        buffer.write(signal[start:start + 1024])
+
+    assert len(buffer) == len(signal)
+    assert np.array_equal(buffer.read(), signal), "❌ Contenu du tampon altéré"
+    assert np.array_equal(buffer.read(1400, 3100), signal[1400:3100]), "❌ Fenêtre à cheval sur des blocs incorrecte"
+
+    wav_path = tmp_path / "audio.wav"
+    buffer.write_wav(str(wav_path), 44100)
+    samples, fs = read_wav(str(wav_path))
+    assert fs == 44100 and np.array_equal(samples, signal), "❌ WAV différent du signal capturé"
+
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.read().shape == (0, 1)
+    print("✅ PCMBuffer : écriture, fenêtrage et sauvegarde WAV cohérents")
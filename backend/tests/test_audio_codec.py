@@ -0,0 +1,80 @@
+"""
+test_audio_codec.py
+-------------------
+Vérifie l'archivage compressé des sessions :
+ - FLAC sans perte, Opus nettement plus léger
+ - réencodage d'un dossier de session (JSON mis à jour atomiquement et dans le catalogue, WAV supprimé),
+   sessions non terminées ignorées
+ - transcribe_audio accepte directement un fichier compressé
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from backlog_generator import audio_transcriber
+from backlog_generator.audio_chunker import encode_wav_bytes
+from backlog_generator.audio_codec import available_formats, encode_audio, read_audio, reencode_sessions
+from backlog_generator.session_catalog import get_catalog
+
+FS = 44100
+
+pytestmark = pytest.mark.skipif("flac" not in available_formats(), reason="aucun encodeur FLAC disponible")
+
+
+def _write_session(tmp_path, name="session_2025-11-11_1219", status="completed"):
+    t = np.arange(3 * FS) / FS
+    signal = (4000 * np.sin(2 * np.pi * 220 * t) * (t > 1)).astype(np.int16)[:, None]
+    folder = tmp_path / name
+    folder.mkdir()
+    (folder / "audio.wav").write_bytes(encode_wav_bytes(signal, FS))
+    for name in ("metadata.json", "summary.json"):
+        (folder / name).write_text(json.dumps({
+            "session_id": folder.name, "audio_file": str(folder / "audio.wav"), "status": status,
+        }))
+    return folder, signal
+
+
+def test_flac_is_lossless_and_opus_smaller(tmp_path):
+    folder, signal = _write_session(tmp_path)
+    flac = encode_audio(folder / "audio.wav", "flac")
+    samples, fs = read_audio(flac)
+    assert fs == FS and np.array_equal(samples, signal), "❌ FLAC doit être sans perte"
+    assert flac.stat().st_size < (folder / "audio.wav").stat().st_size
+
+    if "opus" in available_formats():
+        opus = encode_audio(folder / "audio.wav", "opus")
+        assert opus.stat().st_size < flac.stat().st_size, "❌ Opus devrait être plus compact que FLAC"
+
+
+def test_reencode_sessions_updates_metadata(tmp_path):
+    folder, _ = _write_session(tmp_path)
+    pending = [_write_session(tmp_path, f"session_2025-11-12_{i:04d}", status)[0]
+               for i, status in enumerate(("recording", "queued", "processing", "failed"))]
+    done = reencode_sessions(tmp_path, "flac")
+
+    assert done == [folder / "audio.flac"]
+    for other in pending:
+        assert (other / "audio.wav").exists(), f"❌ WAV d'une session non terminée supprimé : {other.name}"
+    assert not (folder / "audio.wav").exists(), "❌ Le WAV d'origine aurait dû être supprimé"
+    for name in ("metadata.json", "summary.json"):
+        data = json.loads((folder / name).read_text())
+        assert data["audio_file"].endswith("audio.flac"), f"❌ {name} non mis à jour"
+    assert not list(folder.glob("*.tmp")), "❌ Fichier temporaire laissé dans le dossier"
+    detail = get_catalog().get(folder.name)
+    assert detail["audio_file"].endswith("audio.flac"), "❌ Le catalogue sert encore le WAV supprimé (summary)"
+    assert detail["metadata"]["audio_file"].endswith("audio.flac"), "❌ Le catalogue sert encore le WAV supprimé (metadata)"
+
+
+def test_transcribe_accepts_compressed_audio(tmp_path, monkeypatch):
+    folder, _ = _write_session(tmp_path)
+    flac = encode_audio(folder / "audio.wav", "flac", remove_source=True)
+    uploads = []
+    monkeypatch.setattr(audio_transcriber, "transcribe_bytes", lambda data, name: uploads.append(name) or "bonjour")
+
+    report = {}
+    assert audio_transcriber.transcribe_audio(str(flac), report=report) == "bonjour"
+    assert uploads == ["audio.wav"], "❌ L'audio compressé doit être décodé puis prétraité avant l'envoi"
+    assert report["audio"]["bytes_saved_ratio"] > 0.5
+    print("✅ FLAC transcrit après prétraitement local")
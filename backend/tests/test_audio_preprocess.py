@@ -0,0 +1,55 @@
+"""
+test_audio_preprocess.py
+------------------------
+Vérifie la préparation audio avant transcription :
+ - les silences sont retirés et la parole conservée
+ - la table de correspondance redonne les temps de l'enregistrement d'origine
+ - l'audio est converti en 16 kHz mono et le gain en octets est reporté dans summary.json
+"""
+
+import json
+
+import numpy as np
+
+from backlog_generator.audio_preprocess import ASR_SAMPLE_RATE, prepare_for_asr
+from backlog_generator.session_summary import generate_session_summary
+
+FS = 44100
+
+
+def _meeting() -> np.ndarray:
+    """5 s de bruit de fond, 2 s de « parole », 10 s de pause, 2 s de parole, 3 s de bruit."""
+    rng = np.random.default_rng(0)
+    t = np.arange(2 * FS) / FS
+    speech = 5000 * np.sin(2 * np.pi * 300 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    noise = lambda sec: rng.standard_normal(int(sec * FS)) * 30
+    signal = np.concatenate([noise(5), speech, noise(10), speech, noise(3)])
+    return np.stack([signal, signal], axis=1).astype(np.int16)  # stéréo
+
+
+def test_silence_is_trimmed_and_timestamps_mapped():
+    prepared = prepare_for_asr(_meeting(), FS)
+
+    assert prepared.fs == ASR_SAMPLE_RATE and prepared.samples.ndim == 1
+    assert len(prepared.offset_map) == 2, "❌ Les deux prises de parole doivent être conservées"
+    assert 4 < prepared.duration_sec < 7, f"❌ Durée conservée inattendue : {prepared.duration_sec:.1f} s"
+
+    (_, first_start, _), (second_reduced, second_start, _) = prepared.offset_map
+    assert abs(first_start - 5) < 0.5 and abs(second_start - 17) < 0.5
+    assert abs(prepared.to_original_time(second_reduced + 1.0) - (second_start + 1.0)) < 1e-6
+
+    stats = prepared.stats()
+    assert stats["bytes_saved_ratio"] > 0.9, f"❌ Gain insuffisant : {stats}"
+
+
+def test_summary_reports_bytes_saved(tmp_path):
+    meta_path = tmp_path / "metadata.json"
+    meta_path.write_text(json.dumps({"session_id": "session_test", "audio_file": "audio.wav"}), encoding="utf-8")
+    stats = {**prepare_for_asr(_meeting(), FS).stats(), "offset_map": [(0, 5, 2)]}
+
+    summary = generate_session_summary(meta_path, [], {"global_score": 0.5}, audio_stats=stats)
+
+    saved = json.loads((tmp_path / "summary.json").read_text(encoding="utf-8"))
+    assert saved["audio_preprocessing"]["bytes_saved_ratio"] == summary["audio_preprocessing"]["bytes_saved_ratio"]
+    assert "offset_map" not in saved["audio_preprocessing"]
+    print(f"✅ Octets économisés : {saved['audio_preprocessing']['bytes_saved_ratio']:.0%}")
@@ -0,0 +1,94 @@
+"""
+test_backlog_store.py
+---------------------
+Teste le backlog persistant (SQLite FTS5) et les endpoints /api/backlog :
+ - une session remplace sa version précédente (pas de doublons à la relance)
+ - recherche plein texte classée, insensible aux accents, en préfixe, sans injection de syntaxe FTS
+ - filtres exacts et facettes
+ - enregistrement automatique depuis le pipeline texte
+"""
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from backlog_generator import backlog_store, feedback_listener
+from backlog_generator.backlog_store import BacklogStore, get_backlog_store, highlight, match_expression
+
+
+def story(title: str, theme: str, priority: str = "Moyenne", score: float = 0.5, **extra) -> dict:
+    return {
+        "title": title, "theme": theme, "priority": priority, "relevance_score": score,
+        "idea": extra.get("idea", title), "user_story": f"En tant que surfeur, je veux {title.lower()}.",
+        "acceptance_criteria": extra.get("criteria", ["Le système répond en moins de 2 s"]),
+    }
+
+
+def test_search_ranking_filters_and_replacement(tmp_path):
+    store = BacklogStore(tmp_path / "backlog.sqlite")
+    store.add_session("s1", [
+        story("Alerte de marée haute", "Alertes", "Haute", 0.9),
+        story("Carte des spots", "Cartographie", score=0.4, criteria=["Affiche la marée sur la carte"]),
+    ])
+    store.add_session("s2", [story("Historique des prévisions", "Prévisions", "Basse", 0.7)])
+    assert len(store) == 3
+
+    results, total = store.search("maree")
+    assert total == 2, "❌ La recherche doit ignorer les accents"
+    assert results[0]["title"] == "Alerte de marée haute", "❌ Un titre correspondant doit primer sur un critère"
+    assert results[0]["acceptance_criteria"] == ["Le système répond en moins de 2 s"] and "score" in results[0]
+
+    assert store.search("prévi")[1] == 1, "❌ Le dernier mot est recherché en préfixe"
+    assert store.search('marée" OR (')[1] == 0, "❌ Une requête mal formée ne doit pas lever d'erreur"
+    assert match_expression('a" OR mar*') == '"a" "OR" "mar"*', "❌ La syntaxe FTS ne doit pas être interprétée"
+    assert store.search("marée", theme="Alertes")[1] == 1
+    assert [r["session_id"] for r in store.search(min_relevance=0.6)[0]] == ["s1", "s2"]
+
+    facets = store.facets("marée")
+    assert {f["value"]: f["count"] for f in facets["theme"]} == {"Alertes": 1, "Cartographie": 1}
+    assert facets["session_id"] == [{"value": "s1", "count": 2}]
+
+    store.add_session("s1", [story("Alerte de houle", "Alertes")])
+    assert len(store) == 2 and store.search("marée")[1] == 0, "❌ Une relance doit remplacer les US de la session"
+    assert store.session_stories("s1")[0]["title"] == "Alerte de houle"
+
+
+def test_broad_queries_rank_every_match_and_paginate(tmp_path, monkeypatch):
+    monkeypatch.setattr(backlog_store, "SEARCH_RANK_CACHE_MIN", 4)
+    monkeypatch.setattr(backlog_store, "SEARCH_RANK_CACHE_DEPTH", 5)
+    store = BacklogStore(tmp_path / "backlog.sqlite")
+    # US la plus pertinente, mais la plus ancienne : elle doit sortir en tête
+    store.add_session("s_old", [story("Alerte alerte alerte", "Alertes")])
+    for i in range(5):
+        store.add_session(f"s{i}", [story(f"Alerte {i}-{j}", "Alertes") for j in range(2)])
+
+    pages = [store.search("alerte", limit=3, offset=offset) for offset in (0, 3, 6, 9)]
+    assert all(total == 11 for _, total in pages)
+    ids = [r["id"] for page, _ in pages for r in page]
+    assert len(ids) == len(set(ids)) == 11, "❌ La pagination doit couvrir chaque US une seule fois"
+    scores = [r["score"] for page, _ in pages for r in page]
+    assert None not in scores and scores == sorted(scores, reverse=True), "❌ Toutes les US doivent être classées par bm25"
+    assert [r["id"] for r in store.search("alerte", limit=11)[0]] == ids, "❌ Pages et page unique diffèrent"
+    assert pages[0][0][0]["session_id"] == "s_old", "❌ La plus pertinente doit primer, même ancienne"
+
+    store.add_session("s_new", [story("Alerte alerte alerte alerte", "Alertes", idea="Alerte alerte")])
+    results, total = store.search("alerte", limit=3)
+    assert total == 12 and results[0]["session_id"] == "s_new", "❌ Le cache de classement doit suivre les écritures"
+    assert highlight("Une Alerte de marée", "alerte maree") == "Une [Alerte] de [marée]"
+
+
+def test_text_pipeline_feeds_backlog_and_api(monkeypatch):
+    monkeypatch.setattr(feedback_listener, "extract_ideas_from_text", lambda text: ["prévoir la houle"])
+    monkeypatch.setattr(feedback_listener, "generate_user_stories_batch", lambda ideas: [
+        {"title": "Prévision de houle", "user_story": "En tant que surfeur, je veux la houle.",
+         "acceptance_criteria": ["Houle à J+3"], "priority": "Haute"} for _ in ideas
+    ])
+    feedback_listener.process_text_feedback("Je veux la houle", session_id="text_demo")
+    assert get_backlog_store().session_stories("text_demo")[0]["idea"] == "prévoir la houle"
+
+    with TestClient(app) as client:
+        found = client.get("/api/backlog/stories", params={"q": "houle", "source": "text"}).json()
+        assert found["total"] == 1 and found["items"][0]["session_id"] == "text_demo"
+        facets = client.get("/api/backlog/facets").json()
+        assert facets["priority"] == [{"value": "Haute", "count": 1}]
+        assert client.get("/api/backlog/stories", params={"limit": 0}).status_code == 422
+    print("✅ Backlog persistant conforme")
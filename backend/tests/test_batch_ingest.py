@@ -0,0 +1,129 @@
+"""
+test_batch_ingest.py
+--------------------
+Teste l'import en masse de feedbacks écrits (pipeline LLM simulé) :
+ - lecture en flux de .txt / .jsonl / .csv dans un dossier, nettoyage par parser.clean_text
+ - pool borné : jamais plus de `max_workers` feedbacks traités en même temps
+ - reprise : un second import ne refait que les feedbacks absents ou en échec
+ - export Jira idempotent : un feedback retraité ne recrée pas ses tickets
+ - exécution en job "batch" de la file
+"""
+
+import json
+import threading
+import time
+
+from backlog_generator import batch_ingest, feedback_listener
+from backlog_generator.batch_ingest import IngestLedger, ingest, iter_feedbacks
+from backlog_generator.job_queue import JobQueue, worker_loop
+
+
+def write_sources(folder):
+    folder.mkdir()
+    (folder / "a.txt").write_text(
+        "- Je veux  recevoir une alerte avant l'orage .\n\nok\n* Ajouter un mode hors ligne pour la carte\n",
+        encoding="utf-8",
+    )
+    (folder / "b.jsonl").write_text(
+        json.dumps({"id": 1, "feedback": "Partager mes itinéraires avec mon club"}) + "\n"
+        + "pas du json\n"
+        + json.dumps("Afficher la météo des refuges sur la carte") + "\n",
+        encoding="utf-8",
+    )
+    (folder / "c.csv").write_text(
+        "auteur,comment\nléa,\"Exporter mes sorties, au format GPX\"\nmax,Recevoir une alerte avant l'orage.\n",
+        encoding="utf-8",
+    )
+
+
+def test_iter_feedbacks_streams_and_cleans(tmp_path):
+    write_sources(tmp_path / "in")
+    feedbacks = list(iter_feedbacks(tmp_path / "in"))
+
+    assert [f["text"] for f in feedbacks] == [
+        "Je veux recevoir une alerte avant l'orage.",
+        "Ajouter un mode hors ligne pour la carte",
+        "Partager mes itinéraires avec mon club",
+        "Afficher la météo des refuges sur la carte",
+        "Exporter mes sorties, au format GPX",
+        "Recevoir une alerte avant l'orage.",
+    ], "❌ Lecture ou nettoyage des feedbacks incorrect"
+    assert feedbacks[0]["line"] == 1 and feedbacks[-1]["line"] == 3 and feedbacks[-1]["source"].endswith("c.csv")
+    print(f"✅ {len(feedbacks)} feedbacks lus depuis 3 formats")
+
+
+def test_bounded_pool_and_resume(tmp_path, monkeypatch):
+    write_sources(tmp_path / "in")
+    lock = threading.Lock()
+    seen, running, peak = [], [0], [0]
+    failing = {"Exporter mes sorties, au format GPX"}
+
+    def fake_pipeline(text, push_to_jira=False, progress=None, session_id=None, jira_ledger=None):
+        with lock:
+            seen.append(text)
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        if text in failing:
+            raise RuntimeError("LLM indisponible")
+        return [{"idea": text}, {"idea": text}]
+
+    monkeypatch.setattr(feedback_listener, "process_text_feedback", fake_pipeline)
+    ledger = IngestLedger(tmp_path / "ingest.sqlite")
+
+    report = ingest(tmp_path / "in", max_workers=2, ledger=ledger)
+    assert peak[0] == 2, "❌ Le pool doit rester borné à max_workers"
+    assert (report["processed"], report["failed"], report["stories"]) == (5, 1, 10)
+    assert report["feedbacks_per_min"] > 0
+    assert ledger.counts() == {"done": 5, "failed": 1}
+
+    seen.clear()
+    failing.clear()
+    (tmp_path / "in" / "d.txt").write_text("Noter la difficulté des randonnées\n", encoding="utf-8")
+    report = ingest(tmp_path / "in", max_workers=2, ledger=ledger)
+    assert sorted(seen) == ["Exporter mes sorties, au format GPX", "Noter la difficulté des randonnées"], \
+        "❌ La reprise ne doit traiter que les feedbacks absents ou en échec"
+    assert (report["processed"], report["skipped"]) == (2, 5)
+    print(f"✅ Import borné et repris : {report}")
+
+
+def test_reprocessed_feedbacks_do_not_recreate_jira_issues(tmp_path, monkeypatch, jira_stub):
+    source = tmp_path / "feedbacks.txt"
+    source.write_text("Recevoir une alerte avant l'orage\nAjouter un mode hors ligne\n", encoding="utf-8")
+    monkeypatch.setattr(feedback_listener, "extract_ideas_from_text", lambda text: [text])
+    monkeypatch.setattr(feedback_listener, "generate_user_stories_batch", lambda ideas: [
+        {"title": idea, "user_story": f"En tant que randonneur, je veux : {idea}.",
+         "acceptance_criteria": ["Disponible hors connexion"], "priority": "Haute"} for idea in ideas
+    ])
+    ledger = IngestLedger(tmp_path / "ingest.sqlite")
+
+    ingest(source, push_to_jira=True, max_workers=2, ledger=ledger)
+    assert len(jira_stub.issues) == 2
+    # Crash simulé après l'export Jira mais avant la consignation des feedbacks
+    with ledger._conn:
+        ledger._conn.execute("DELETE FROM ingested")
+    report = ingest(source, push_to_jira=True, max_workers=2, ledger=ledger)
+
+    assert report["processed"] == 2, "❌ Les feedbacks non consignés doivent être retraités"
+    assert len(jira_stub.issues) == 2, "❌ Un feedback retraité a recréé ses tickets Jira"
+    assert (tmp_path / "ingest_jira.sqlite").exists()
+    print("✅ Export Jira de l'import idempotent")
+
+
+def test_batch_job_runs_from_queue(tmp_path, monkeypatch):
+    source = tmp_path / "feedbacks.txt"
+    source.write_text("Recevoir une alerte avant l'orage\nAjouter un mode hors ligne\n", encoding="utf-8")
+    monkeypatch.setattr(feedback_listener, "process_text_feedback", lambda text, **kwargs: [{"idea": text}])
+    monkeypatch.setattr(batch_ingest, "PROGRESS_EVERY", 1)
+
+    queue = JobQueue(tmp_path / "jobs.sqlite")
+    job_id = queue.enqueue("batch", {"path": str(source)})
+    worker_loop(queue, worker_id="w", poll_sec=0.01, exit_when_idle=True)
+
+    job = queue.get(job_id)
+    assert job.status == "succeeded", job
+    assert job.result["processed"] == 2 and job.result["stories"] == 2
+    assert [e["event"] for e in queue.events(job_id)].count("batch_progress") == 2
+    print("✅ Import exécuté en job de la file")
@@ -0,0 +1,98 @@
+"""
+test_checkpoints.py
+-------------------
+Vérifie la reprise par étapes de process_audio_feedback (checkpoints.CheckpointStore) :
+ - une relance identique ne rappelle ni la transcription ni le LLM
+ - une étape dont la version change est recalculée, les étapes précédentes sont reprises
+ - un audio modifié invalide toute la chaîne
+ - sans dossier de reprise, la session du backlog est le dossier de l'audio (pas « audio »)
+"""
+
+import json
+
+from backlog_generator import audio_transcriber
+from backlog_generator.backlog_store import get_backlog_store
+from backlog_generator.checkpoints import CheckpointStore, fingerprint
+
+SEGMENTS = [
+    {"theme": "Alertes", "content": "On voudrait une alerte quand le vent dépasse vingt noeuds sur le spot."},
+    {"theme": "Carte", "content": "Afficher la marée et la houle directement sur la carte des spots."},
+]
+
+
+def install_fakes(monkeypatch, calls: dict):
+    def count(name, result):
+        def fake(*args, **kwargs):
+            calls[name] = calls.get(name, 0) + 1
+            return result(*args, **kwargs)
+        return fake
+
+    def transcribe(path, report=None, **kwargs):
+        report["audio"] = {"speech_duration_sec": 12.0}
+        return open(path, encoding="utf-8").read()
+
+    monkeypatch.setattr(audio_transcriber, "transcribe_audio", count("transcribe", transcribe))
+    monkeypatch.setattr(audio_transcriber, "segment_conversation_llm", count("segment", lambda t: [dict(s) for s in SEGMENTS]))
+    monkeypatch.setattr(audio_transcriber, "_analyze_segment", count("analyze", lambda seg: (True, [
+        {"idea": f"Idée {seg['theme']}", "title": seg["theme"], "why": "", "confidence": 0.9}
+    ])))
+    monkeypatch.setattr(audio_transcriber, "generate_user_stories_batch", count("generate", lambda ideas: [
+        {"user_story": f"En tant que surfeur, {i}", "acceptance_criteria": ["ok"], "priority": "Haute", "title": i}
+        for i in ideas
+    ]))
+
+
+def test_rerun_resumes_from_first_invalidated_stage(tmp_path, monkeypatch):
+    calls = {}
+    install_fakes(monkeypatch, calls)
+    audio = tmp_path / "audio.wav"
+    audio.write_text("transcription simulée", encoding="utf-8")
+
+    report = {}
+    first = audio_transcriber.process_audio_feedback(str(audio), report=report, segmenter="llm", checkpoint_dir=tmp_path)
+    assert calls == {"transcribe": 1, "segment": 1, "analyze": 2, "generate": 2}
+    assert {p.name for p in tmp_path.glob("*.json")} == {"transcript.json", "segments.json", "ideas.json", "stories.json"}
+
+    report = {}
+    again = audio_transcriber.process_audio_feedback(str(audio), report=report, segmenter="llm", checkpoint_dir=tmp_path)
+    assert again == first, "❌ La reprise doit redonner les mêmes US"
+    assert calls == {"transcribe": 1, "segment": 1, "analyze": 2, "generate": 2}, "❌ Aucune étape ne doit être refaite"
+    assert report["audio"] == {"speech_duration_sec": 12.0}, "❌ Statistiques audio perdues à la reprise"
+
+    monkeypatch.setitem(audio_transcriber.STAGE_VERSIONS, "ideas", 2)  # prompt d'extraction modifié
+    audio_transcriber.process_audio_feedback(str(audio), segmenter="llm", checkpoint_dir=tmp_path)
+    assert calls == {"transcribe": 1, "segment": 1, "analyze": 4, "generate": 2}, \
+        "❌ Seules les idées doivent être recalculées (mêmes idées → US reprises)"
+
+    audio.write_text("autre réunion", encoding="utf-8")
+    audio_transcriber.process_audio_feedback(str(audio), segmenter="llm", checkpoint_dir=tmp_path)
+    assert calls["transcribe"] == 2 and calls["segment"] == 2, "❌ Un audio modifié invalide toute la chaîne"
+
+
+def test_direct_calls_record_one_backlog_session_per_folder(tmp_path, monkeypatch):
+    install_fakes(monkeypatch, {})
+    for name in ("session_1", "session_2"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "audio.wav").write_text("transcription simulée", encoding="utf-8")
+
+    first = audio_transcriber.process_audio_feedback(str(tmp_path / "session_1" / "audio.wav"), segmenter="llm")
+    again = audio_transcriber.process_audio_feedback(str(tmp_path / "session_2" / "audio.wav"), segmenter="llm")
+
+    backlog = get_backlog_store()
+    assert backlog.session_stories("audio") == [], "❌ Le nom du fichier audio ne doit pas servir d'identifiant de session"
+    assert len(backlog.session_stories("session_1")) == len(first) > 0, "❌ La session précédente a été remplacée"
+    assert {s["backlog_decision"] for s in again} == {"duplicate"}, "❌ La 2e session doit se comparer à la 1re"
+
+
+def test_store_rejects_stale_or_corrupt_artifacts(tmp_path):
+    store = CheckpointStore(tmp_path)
+    key = fingerprint("entrée")
+    store.save("segments", 1, key, [{"theme": "A"}])
+    assert store.load("segments", 1, key) == (True, [{"theme": "A"}])
+    assert store.load("segments", 2, key)[0] is False, "❌ Version différente → artefact invalide"
+    assert store.load("segments", 1, fingerprint("autre"))[0] is False, "❌ Entrée différente → artefact invalide"
+
+    (tmp_path / "segments.json").write_text("{tronqué", encoding="utf-8")
+    assert store.run("segments", 1, key, lambda: ["recalculé"]) == ["recalculé"]
+    assert json.loads((tmp_path / "segments.json").read_text())["data"] == ["recalculé"]
+    print("✅ Points de reprise du pipeline conformes")
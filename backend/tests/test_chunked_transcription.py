@@ -0,0 +1,99 @@
+"""
+test_chunked_transcription.py
+-----------------------------
+Vérifie la transcription par fenêtres des longs enregistrements :
+ - les coupes tombent dans les silences
+ - le recollage supprime les mots dupliqués par le chevauchement
+ - le flux produit le texte dans l'ordre, sans perte ni doublon
+ - la durée des fenêtres découle du budget d'octets (aucun envoi au-delà, même à 44,1 / 48 kHz)
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+from backlog_generator import audio_transcriber
+from backlog_generator.audio_chunker import (
+    encode_wav_bytes, find_silence_cuts, plan_chunks, read_wav, stitch_transcripts,
+)
+
+FS = 8000
+
+
+def _synthetic_meeting(n_words: int = 60) -> np.ndarray:
+    """Un « mot » = une salve de 0,2 s dont l'amplitude encode l'indice ; pause longue tous les 8 mots."""
+    parts = []
+    t = np.arange(int(0.2 * FS)) / FS
+    for i in range(n_words):
+        burst = (1000 + 100 * i) * np.sign(np.sin(2 * np.pi * 200 * t))
+        parts.append(burst)
+        pause = 1.5 if i % 8 == 7 else 0.15
+        parts.append(np.zeros(int(pause * FS)))
+    return np.concatenate(parts).astype(np.int16)[:, None]
+
+
+def _fake_transcribe(data: bytes, filename: str) -> str:
+    """Transcripteur factice : une salve audible → le mot « wN »."""
+    import wave
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+    loud = np.abs(samples) > 500
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], loud.astype(np.int8), [0]])))
+    words = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        amp = int(np.abs(samples[start:end]).max())
+        words.append(f"w{round((amp - 1000) / 100)}")
+    return " ".join(words)
+
+
+def test_cuts_fall_in_silence():
+    samples = _synthetic_meeting()
+    cuts = find_silence_cuts(samples, FS, chunk_sec=6, search_sec=2)
+    assert cuts, "❌ Aucune coupe trouvée"
+    for cut in cuts:
+        assert np.all(samples[cut - 40: cut + 40] == 0), f"❌ Coupe en pleine parole ({cut})"
+
+    chunks = plan_chunks(len(samples), cuts, FS, overlap_sec=1)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(samples)
+    assert all(b[0] < a[1] for a, b in zip(chunks, chunks[1:])), "❌ Les fenêtres ne se chevauchent pas"
+
+
+def test_stitch_removes_overlap_only():
+    assert stitch_transcripts("il faut une alerte météo", "alerte météo en temps réel") == "en temps réel"
+    assert stitch_transcripts("bonjour à tous", "on parle du planning") == "on parle du planning"
+
+
+def test_stream_yields_ordered_text_without_duplicates(tmp_path, monkeypatch):
+    samples = _synthetic_meeting()
+    wav_path = tmp_path / "audio.wav"
+    wav_path.write_bytes(encode_wav_bytes(samples, FS))
+    assert read_wav(str(wav_path))[1] == FS
+
+    monkeypatch.setattr(audio_transcriber, "transcribe_bytes", _fake_transcribe)
+    parts = list(audio_transcriber.transcribe_audio_stream(str(wav_path), chunk_sec=6, overlap_sec=2, max_workers=4, preprocess=False))
+    assert len(parts) > 3, "❌ Le flux aurait dû produire plusieurs morceaux"
+
+    text = " ".join(p for p in parts if p)
+    assert text.split() == [f"w{i}" for i in range(60)], f"❌ Transcription recollée incorrecte : {text}"
+    full = audio_transcriber.transcribe_audio(str(wav_path), chunked=True, preprocess=False)
+    assert full == text
+    print(f"✅ {len(parts)} fenêtres recollées sans doublon")
+
+
+@pytest.mark.parametrize("fs", [44100, 48000])
+def test_chunks_fit_byte_budget_at_high_sample_rates(fs, monkeypatch):
+    # 300 s de WAV mono int16 à 44,1 kHz ≈ 26,5 Mo : au-delà de la limite de 25 Mo
+    assert 300 * fs * 2 > 25_000_000
+    chunk_sec = audio_transcriber.chunk_seconds_for(fs, channels=1, overlap_sec=2.0)
+    assert (chunk_sec + min(20, chunk_sec / 4) + 2.0) * fs * 2 + 44 <= audio_transcriber.TRANSCRIPTION_CHUNK_MAX_BYTES
+
+    # Budget réduit à 1 Mo : 40 s de bruit (sans silence, coupes au pire endroit) en stéréo
+    budget = 1_000_000
+    monkeypatch.setattr(audio_transcriber, "TRANSCRIPTION_CHUNK_MAX_BYTES", budget)
+    samples = np.random.default_rng(0).integers(-3000, 3000, size=(40 * fs, 2)).astype(np.int16)
+    sizes = []
+    monkeypatch.setattr(audio_transcriber, "transcribe_bytes", lambda data, name: sizes.append(len(data)) or "")
+    list(audio_transcriber.transcribe_samples_stream(samples, fs, chunk_sec=300, max_workers=2))
+    assert len(sizes) > 1 and max(sizes) <= budget, f"❌ Fenêtre au-delà du budget : {max(sizes)} octets"
+    print(f"✅ {fs} Hz : {len(sizes)} fenêtres ≤ {budget} octets")
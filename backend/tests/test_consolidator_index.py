@@ -0,0 +1,79 @@
+"""
+test_consolidator_index.py
+--------------------------
+Vérifie que l'index de similarité de consolidate_user_stories :
+ - produit exactement les mêmes fusions que la boucle historique (SequenceMatcher sur chaque paire
+   titre / idée / texte), sur des lots aléatoires et quel que soit l'index exact ("exact", "brute")
+ - ne vérifie réellement qu'une fraction des paires
+ - reste cohérent en mode approximatif ("lsh") sur des doublons évidents
+"""
+
+import copy
+
+from backlog_generator import consolidator
+from backlog_generator.consolidator import consolidate_user_stories
+from backlog_generator.similarity import BoundedIndex, normalize, ratio
+from benchmarks.synthetic import synthetic_stories
+
+def _signature(stories):
+    return [(s["title"], s["idea"], s["relevance_score"], sorted(s["acceptance_criteria"])) for s in stories]
+
+
+def _pairwise_consolidate(stories, threshold):
+    """Boucle historique de consolidate_user_stories : chaque US comparée à toutes les US retenues."""
+    merged = []
+    for s in stories:
+        if consolidator._looks_like_prompt_artifact(s["title"]):
+            s["title"] = s["title"].split(":", 1)[-1].strip().capitalize()
+        s["theme"] = consolidator.normalize_theme(s["theme"])
+        s["priority"] = consolidator.auto_priority(s["user_story"], s["theme"])
+        s["relevance_score"] = consolidator.compute_relevance(s)
+        duplicate = next((m for m in merged if any(
+            consolidator._similar(s[field], m[field]) > threshold for field in ("title", "idea", "user_story")
+        )), None)
+        if duplicate:
+            duplicate["acceptance_criteria"] = list(set(duplicate["acceptance_criteria"] + s["acceptance_criteria"]))
+            duplicate["relevance_score"] = round((duplicate["relevance_score"] + s["relevance_score"]) / 2, 2)
+        else:
+            merged.append(s)
+    return sorted(merged, key=lambda x: x["relevance_score"], reverse=True)
+
+
+def test_default_index_matches_pairwise_loop():
+    for threshold, seed in ((0.6, 1), (0.72, 2), (0.8, 0)):
+        stories = synthetic_stories(150, seed=seed)
+        expected = _signature(_pairwise_consolidate(copy.deepcopy(stories), threshold))
+        default = consolidate_user_stories(copy.deepcopy(stories), threshold=threshold)
+        assert _signature(default) == expected, f"❌ Fusions différentes de la boucle historique au seuil {threshold}"
+        assert len(expected) < len(stories), "❌ Le jeu de test devrait contenir quelques doublons"
+    brute = consolidate_user_stories(copy.deepcopy(stories), threshold=threshold, index="brute")
+    assert _signature(brute) == expected, "❌ L'index brute doit reproduire la boucle historique"
+
+
+def test_bounds_never_exceeded_and_prune():
+    for field in ("title", "idea", "user_story"):
+        texts = [normalize(s[field]) for s in synthetic_stories(160, seed=3, vocab_size=600)]
+        index = BoundedIndex(threshold=0.72)
+        for t in texts[:80]:
+            index.add(t)
+        checked = 0
+        for t in texts[80:]:
+            bounds = index.upper_bounds(t)
+            candidates = set(index.candidates(t).tolist())
+            for pos, stored in enumerate(index.texts):
+                exact = ratio(t, stored)
+                assert exact <= bounds[pos] + 1e-9, "❌ Borne supérieure violée"
+                assert exact <= 0.72 or pos in candidates, "❌ Un vrai doublon a été écarté"
+                if pos in candidates:
+                    assert index.ratio(t, pos) == exact, "❌ Ratio mis en cache différent"
+            checked += len(candidates)
+        assert checked < 80 * 80 / 10, f"❌ Trop de candidats ({field}) : {checked}"
+
+
+def test_lsh_index_merges_exact_duplicates():
+    stories = synthetic_stories(200, seed=5, vocab_size=600)
+    single = consolidate_user_stories(copy.deepcopy(stories), threshold=0.8, index="lsh")
+    doubled = consolidate_user_stories(copy.deepcopy(stories) + copy.deepcopy(stories), threshold=0.8, index="lsh")
+    assert len(doubled) <= len(stories), "❌ Des copies exactes n'ont pas été fusionnées"
+    assert len(single) < len(stories), "❌ Aucune variante fusionnée en mode LSH"
+    print(f"✅ Consolidation LSH : {len(single)} US retenues sur {len(stories)}")
@@ -0,0 +1,134 @@
+"""
+test_cross_session.py
+---------------------
+Teste la consolidation incrémentale entre sessions (backlog persistant) :
+ - décisions new / merge-into / duplicate contre les US des sessions précédentes
+ - une relance de la même session ne se considère pas comme doublon d'elle-même
+ - seules les US nouvelles partent vers Jira, les variantes enrichissent l'US existante
+ - le nombre de candidates vérifiées dépend du lot, pas de la taille du backlog
+ - deux sessions proches traitées en même temps : une seule est « nouvelle » et exportée
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backlog_generator import audio_transcriber, backlog_store
+from backlog_generator.backlog_store import BacklogStore
+from backlog_generator.consolidator import consolidate_against_backlog
+
+
+def story(title: str, idea: str, criteria: list[str], theme: str = "Alertes") -> dict:
+    return {
+        "title": title, "idea": idea, "theme": theme, "priority": "Moyenne", "relevance_score": 1.0,
+        "user_story": f"En tant que randonneur, je veux {idea.lower()}.", "acceptance_criteria": criteria,
+    }
+
+
+ALERT = story("Alerte orage en montagne", "Recevoir une alerte quand un orage approche de mon itinéraire",
+              ["Notification en moins de 5 minutes"])
+MAP = story("Carte des refuges", "Consulter la carte des refuges ouverts autour de moi", ["Affiche les horaires"],
+            theme="Cartographie")
+
+
+def test_decisions_against_previous_sessions(tmp_path):
+    store = BacklogStore(tmp_path / "backlog.sqlite")
+    store.add_session("s1", [ALERT])
+
+    batch = [
+        dict(ALERT),
+        story("Prévenir des orages", "Recevoir une alerte dès qu'un orage approche de mon itinéraire",
+              ["Inclut la direction de l'orage"]),
+        MAP,
+    ]
+    decisions = consolidate_against_backlog(batch, store, session_id="s2")
+    assert [d["decision"] for d in decisions] == ["duplicate", "merge-into", "new"], "❌ Décisions inattendues"
+    target = store.search(session_id="s1")[0][0]["id"]
+    assert decisions[1]["target_id"] == target and decisions[2]["target_id"] is None
+
+    assert consolidate_against_backlog([ALERT], store, session_id="s1")[0]["decision"] == "new", \
+        "❌ Une relance ne doit pas se comparer à sa propre version"
+
+    store.add_session("s2", batch, decisions=decisions)
+    assert [s["title"] for s in store.session_stories("s2")] == ["Carte des refuges"], \
+        "❌ Seules les US nouvelles sont enregistrées pour la session"
+    merged = store.session_stories("s1")[0]
+    assert merged["acceptance_criteria"] == ["Notification en moins de 5 minutes", "Inclut la direction de l'orage"]
+    assert store.search("direction")[1] == 1, "❌ L'index plein texte doit suivre la fusion"
+    print("✅ Décisions new / merge-into / duplicate contre le backlog")
+
+
+def test_only_new_stories_are_pushed(monkeypatch):
+    pushed = []
+    monkeypatch.setattr(audio_transcriber, "export_user_stories_to_jira",
+                        lambda stories, ledger=None: pushed.append([s["title"] for s in stories]))
+
+    audio_transcriber.finalize_user_stories([dict(ALERT)], push_to_jira=True, session_id="s1")
+    report = {}
+    stories = audio_transcriber.finalize_user_stories(
+        [dict(ALERT), dict(MAP)], push_to_jira=True, report=report, session_id="s2"
+    )
+
+    assert pushed == [["Alerte orage en montagne"], ["Carte des refuges"]], "❌ Un doublon a été réexporté vers Jira"
+    assert len(stories) == 2, "❌ Toutes les US de la session doivent être retournées"
+    assert {s["title"]: s["backlog_decision"] for s in stories} == {
+        "Alerte orage en montagne": "duplicate", "Carte des refuges": "new",
+    }
+    assert report["cross_session"] == {"new": 1, "merge-into": 0, "duplicate": 1}
+
+    audio_transcriber.finalize_user_stories([dict(ALERT), dict(MAP)], push_to_jira=True, session_id="s2")
+    assert pushed[-1] == ["Carte des refuges"], "❌ La relance d'une session doit rester idempotente"
+    print("✅ Seules les US nouvelles partent vers Jira")
+
+
+def _slow_classification(monkeypatch):
+    """Élargit la fenêtre entre classement et écriture : sans transaction commune, les deux sessions se croisent."""
+    classify = backlog_store.consolidate_against_backlog
+
+    def slow(*args, **kwargs):
+        time.sleep(0.2)
+        return classify(*args, **kwargs)
+    monkeypatch.setattr(backlog_store, "consolidate_against_backlog", slow)
+
+
+def test_concurrent_sessions_classify_and_record_atomically(tmp_path, monkeypatch):
+    _slow_classification(monkeypatch)
+    pushed = []
+    monkeypatch.setattr(audio_transcriber, "export_user_stories_to_jira",
+                        lambda stories, ledger=None: pushed.extend(s["title"] for s in stories))
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(
+            lambda session_id: audio_transcriber.finalize_user_stories([dict(ALERT)], push_to_jira=True,
+                                                                       session_id=session_id),
+            ["s1", "s2"],
+        ))
+    assert pushed == ["Alerte orage en montagne"], "❌ Deux sessions simultanées ont exporté la même US"
+    assert sorted(r[0]["backlog_decision"] for r in results) == ["duplicate", "new"]
+
+    # Deux process : connexions distinctes sur le même fichier (BEGIN IMMEDIATE les sérialise)
+    stores = [BacklogStore(tmp_path / "shared.sqlite") for _ in range(2)]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        decisions = list(pool.map(
+            lambda i: stores[i].add_classified_session(f"p{i}", [dict(MAP)]), range(2)
+        ))
+    assert sorted(d[0]["decision"] for d in decisions) == ["duplicate", "new"], "❌ Classement concurrent entre process"
+    assert len(stores[0]) == 1
+    print("✅ Classement et enregistrement atomiques entre sessions concurrentes")
+
+
+def test_candidates_do_not_grow_with_backlog(tmp_path):
+    store = BacklogStore(tmp_path / "backlog.sqlite")
+    subjects = ["météo", "refuge", "itinéraire", "matériel", "groupe", "secours", "photo", "altitude"]
+    for i in range(200):
+        store.add_session(f"s{i}", [
+            story(f"Suivi {subjects[i % 8]} numéro {i}", f"Voir le {subjects[j % 8]} {i}-{j} ligne {i * 7 + j}",
+                  [f"Critère {i}-{j}"])
+            for j in range(3)
+        ])
+    store.add_session("alert", [ALERT])
+    assert len(store) == 601
+
+    candidates = store.similar_stories([ALERT, MAP], exclude_session="new")
+    assert [c["title"] for c in candidates[0]] == ["Alerte orage en montagne"], "❌ Candidates LSH trop larges"
+    assert sum(map(len, candidates)) < 20, "❌ Le nombre de candidates ne doit pas suivre la taille du backlog"
+    print(f"✅ {sum(map(len, candidates))} candidate(s) pour un backlog de {len(store)} US")
@@ -0,0 +1,60 @@
+"""
+test_dedupe.py
+--------------
+Vérifie le moteur de déduplication par lot (similarity.dedupe_indices) :
+ - "exact" reproduit la boucle SequenceMatcher historique (seuils 0.82 et 0.88)
+ - "shingle" (n-grammes + MinHash/LSH + confirmation) reste fidèle à quelques écarts près
+ - semantic_deduplicate et dedupe_keep_order conservent leur contrat
+"""
+
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from backlog_generator.audio_transcriber import dedupe_keep_order
+from backlog_generator.quality import semantic_deduplicate
+from backlog_generator.similarity import dedupe_indices, normalize, pair_cosines, shingle_matrix
+from benchmarks.synthetic import synthetic_ideas
+
+def legacy_dedupe(texts: list[str], threshold: float) -> list[int]:
+    kept = []
+    for i, text in enumerate(texts):
+        if not any(SequenceMatcher(None, normalize(text), normalize(texts[k])).ratio() >= threshold for k in kept):
+            kept.append(i)
+    return kept
+
+
+def test_exact_and_shingle_follow_legacy_thresholds():
+    for threshold in (0.82, 0.88):
+        ideas = synthetic_ideas(150, seed=int(threshold * 100))
+        legacy = legacy_dedupe(ideas, threshold)
+        assert dedupe_indices(ideas, threshold, method="exact") == legacy, f"❌ 'exact' diverge au seuil {threshold}"
+        shingle = dedupe_indices(ideas, threshold, method="shingle")
+        assert len(set(shingle) ^ set(legacy)) <= len(ideas) // 100, f"❌ 'shingle' trop éloigné au seuil {threshold}"
+        assert len(legacy) < len(ideas), "❌ Le jeu de test devrait contenir des doublons"
+
+
+def test_pair_cosines_match_dense_computation():
+    texts = [normalize(t) for t in synthetic_ideas(40, seed=2)] + ["ab", "", "ab"]
+    indptr, indices = shingle_matrix(texts)
+    dense = np.zeros((len(texts), int(indices.max()) + 1))
+    for row in range(len(texts)):
+        dense[row, indices[indptr[row]:indptr[row + 1]]] = 1
+    pairs = np.array([(a, b) for a in range(len(texts)) for b in range(a + 1, len(texts))])
+    norms = np.linalg.norm(dense, axis=1)
+    expected = (dense[pairs[:, 0]] * dense[pairs[:, 1]]).sum(axis=1) / (norms[pairs[:, 0]] * norms[pairs[:, 1]])
+    assert np.allclose(pair_cosines(indptr, indices, pairs, block_size=97), expected), "❌ Cosinus creux incorrect"
+
+
+def test_public_helpers_keep_contract():
+    ideas = [
+        "Ajouter une alerte quand le vent dépasse 20 noeuds",
+        "ajouter une alerte quand le vent dépasse 20 noeuds !",
+        "Afficher la marée sur la carte des spots",
+        "   ",
+        "Afficher la marée sur la carte des spots",
+    ]
+    assert semantic_deduplicate(ideas) == [ideas[0], ideas[2], ideas[3]], "❌ semantic_deduplicate modifié"
+    assert dedupe_keep_order(ideas + ["ok", None]) == [ideas[0], ideas[2]], "❌ dedupe_keep_order modifié"
+    assert semantic_deduplicate(ideas, method="shingle") == semantic_deduplicate(ideas, method="exact")
+    print("✅ Déduplication par lot conforme aux seuils historiques")
@@ -0,0 +1,85 @@
+"""
+test_embeddings.py
+------------------
+Vérifie le backend d'embeddings local et ses usages :
+ - vecteurs déterministes, reformulations plus proches que des sujets différents
+ - cache .npz par session (aucun recalcul d'un texte connu)
+ - segmentation locale d'une transcription en thèmes, sans appel LLM
+ - fusion des US reformulées dans consolidate_user_stories (semantic_threshold)
+"""
+
+import copy
+
+import numpy as np
+
+from backlog_generator.consolidator import consolidate_user_stories
+from backlog_generator.embeddings import HashingEmbedder, VectorStore, tfidf_weight
+from backlog_generator.semantic_segmenter import segment_conversation_local
+
+TRANSCRIPT = (
+    "Bonjour à tous, merci d'être venus. On commence par la météo. "
+    "Les prévisions de vent sont souvent fausses sur notre spot. "
+    "J'aimerais recevoir une alerte quand le vent dépasse vingt noeuds. "
+    "Les alertes de vent devraient arriver la veille au soir. "
+    "La direction du vent compte aussi pour les alertes. "
+    "Parlons maintenant de la communauté. Je voudrais partager mes photos de session avec mes amis. "
+    "Un fil de photos par spot serait génial. On pourrait commenter les photos des autres riders. "
+    "Les photos devraient être classées par date de session."
+)
+
+STORIES = [
+    {"theme": "Météo", "title": "Alerte vent fort",
+     "idea": "Recevoir une alerte quand le vent dépasse 20 noeuds",
+     "user_story": "En tant que rider, je veux recevoir une alerte quand le vent dépasse 20 noeuds afin de ne pas rater une session.",
+     "acceptance_criteria": ["seuil réglable"]},
+    {"theme": "Météo", "title": "Notification de vent",
+     "idea": "Être notifié dès que les alertes de vent fort dépassent le seuil de 20 noeuds",
+     "user_story": "En tant qu'utilisateur, je veux être notifié lorsque le vent est fort afin de planifier ma sortie.",
+     "acceptance_criteria": ["notification push"]},
+    {"theme": "Communauté", "title": "Partage de photos",
+     "idea": "Partager mes photos de session avec mes amis",
+     "user_story": "En tant que rider, je veux partager mes photos afin de montrer mes sessions.",
+     "acceptance_criteria": ["album par session"]},
+]
+
+
+def test_hashing_embeddings_are_deterministic_and_semantic():
+    texts = [
+        "recevoir une alerte quand le vent est fort",
+        "être alerté dès que les vents forts arrivent",
+        "partager des photos avec la communauté",
+    ]
+    first = tfidf_weight(HashingEmbedder().embed(texts))
+    again = tfidf_weight(HashingEmbedder().embed(texts))
+    assert np.array_equal(first, again), "❌ Embeddings non déterministes"
+    sims = first @ first.T
+    assert sims[0, 1] > sims[0, 2] and sims[0, 1] > sims[1, 2], "❌ La reformulation n'est pas la plus proche"
+
+
+def test_vector_store_caches_per_session(tmp_path):
+    path = tmp_path / "embeddings.npz"
+    store = VectorStore(path)
+    vectors = store.embed(["alerte vent", "photos", "alerte vent"])
+    assert store.computed == 2 and np.array_equal(vectors[0], vectors[2])
+
+    reloaded = VectorStore(path)
+    assert np.array_equal(reloaded.embed(["photos"])[0], vectors[1]), "❌ Vecteur relu différent"
+    assert reloaded.computed == 0, "❌ Un texte déjà en cache a été recalculé"
+
+
+def test_local_segmentation_splits_topics():
+    segments = segment_conversation_local(TRANSCRIPT)
+    assert len(segments) >= 2, "❌ Les deux sujets n'ont pas été séparés"
+    weather = next(s for s in segments if "vingt noeuds" in s["content"])
+    community = next(s for s in segments if "commenter les photos" in s["content"])
+    assert weather is not community, "❌ Météo et communauté dans le même segment"
+    assert all(s["theme"] and len(s["content"].split()) > 5 for s in segments)
+
+
+def test_semantic_threshold_merges_paraphrases():
+    assert len(consolidate_user_stories(copy.deepcopy(STORIES))) == 3
+    merged = consolidate_user_stories(copy.deepcopy(STORIES), semantic_threshold=0.3)
+    assert len(merged) == 2, "❌ Les deux reformulations auraient dû être fusionnées"
+    alert = next(s for s in merged if s["title"] == "Alerte vent fort")
+    assert set(alert["acceptance_criteria"]) == {"seuil réglable", "notification push"}
+    print("✅ Embeddings locaux : segmentation et fusion des reformulations")
@@ -0,0 +1,77 @@
+"""
+test_exporter.py
+----------------
+Teste les exports du backlog :
+ - un générateur est consommé une seule fois, au fil de l'eau
+ - Markdown / CSV / JSON Lines identiques en clair et compressés gzip
+ - Parquet (si pyarrow est installé)
+ - parcours paginé du backlog persistant (BacklogStore.iter_stories)
+"""
+
+import csv
+import gzip
+import json
+
+import pytest
+
+from backlog_generator import exporter
+from backlog_generator.backlog_store import BacklogStore
+
+
+def generate(n: int):
+    for i in range(n):
+        yield {
+            "title": f"US {i}", "idea": f"Idée {i}", "user_story": f"En tant que guide, je veux l'action {i}.",
+            "priority": "Haute" if i % 2 else "Basse", "theme": "Alertes", "relevance_score": i / 10,
+            "acceptance_criteria": [f"Critère {i}.1", f"Critère {i}.2"],
+        }
+
+
+def read_text(path: str) -> str:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_text_exports_stream_generators(tmp_path, compress):
+    md = exporter.export_to_markdown(generate(3), output_dir=str(tmp_path / "md"), compress=compress)
+    path = exporter.export_to_csv(generate(3), output_dir=str(tmp_path / "csv"), compress=compress)
+    jsonl = exporter.export_to_jsonl(generate(3), output_dir=str(tmp_path / "jsonl"), compress=compress)
+    assert md.endswith(".md.gz" if compress else ".md") and jsonl.endswith(".jsonl.gz" if compress else ".jsonl")
+
+    text = read_text(md)
+    assert text.count("## 🧩 User Story") == 3 and "- Critère 2.2\n" in text, "❌ Markdown incomplet"
+
+    rows = list(csv.DictReader(read_text(path).splitlines()))
+    assert [r["ID"] for r in rows] == ["1", "2", "3"], "❌ Numérotation CSV incorrecte"
+    assert rows[1]["Acceptance Criteria"] == "Critère 1.1 | Critère 1.2"
+
+    lines = [json.loads(line) for line in read_text(jsonl).splitlines()]
+    assert lines == list(generate(3)), "❌ JSON Lines doit conserver les US complètes"
+    print(f"✅ Exports texte en flux (gzip={compress})")
+
+
+def test_parquet_export(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = exporter.export_to_parquet(generate(25), output_dir=str(tmp_path), compress=True, batch_size=10)
+    table = pq.read_table(path)
+    assert table.num_rows == 25 and pq.ParquetFile(path).num_row_groups == 3, "❌ Un row group par lot attendu"
+    assert table.column("acceptance_criteria")[4].as_py() == ["Critère 4.1", "Critère 4.2"]
+    print("✅ Export Parquet par lots")
+
+
+def test_export_backlog_by_pages(tmp_path):
+    store = BacklogStore(tmp_path / "backlog.sqlite")
+    stories = list(generate(7))
+    store.add_session("s1", stories[:4])
+    store.add_session("s2", stories[4:])
+
+    assert list(store.iter_stories(batch_size=3)) == stories, "❌ Le parcours paginé doit couvrir tout le backlog"
+    assert [s["title"] for s in store.iter_stories(batch_size=2, session_id="s2")] == ["US 4", "US 5", "US 6"]
+
+    path = exporter.export_stories(store.iter_stories(priority="Haute"), "jsonl", str(tmp_path), compress=True)
+    assert len(read_text(path).splitlines()) == 3
+    with pytest.raises(ValueError):
+        exporter.export_stories([], "xlsx", str(tmp_path))
+    print("✅ Export du backlog persistant en flux")
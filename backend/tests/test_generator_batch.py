@@ -0,0 +1,73 @@
+"""
+test_generator_batch.py
+-----------------------
+Vérifie la génération groupée des User Stories (generator.generate_user_stories_batch) :
+ - une seule requête pour plusieurs idées (US + critères + priorité + titre)
+ - seules les idées invalides ou absentes de la réponse sont redemandées individuellement
+ - l'ordre des idées est conservé
+"""
+
+import json
+
+from backlog_generator import generator
+
+IDEAS = ["alerte vent fort", "partage de photos", "mode sombre", "export calendrier"]
+
+
+def _item(i, idea, **overrides):
+    item = {
+        "id": i,
+        "user_story": f"En tant que rider, je veux {idea} afin de gagner du temps.",
+        "acceptance_criteria": [f"- {idea} disponible", "Testé sur mobile", "Documenté"],
+        "priority": "haute",
+        "title": f"Titre {idea}",
+    }
+    item.update(overrides)
+    return item
+
+
+def test_batch_validates_items_and_retries_only_failures(monkeypatch):
+    calls = []
+
+    def fake_chat(messages, **kwargs):
+        prompt = messages[-1]["content"]
+        calls.append(prompt)
+        if '"stories"' in prompt:
+            return json.dumps({"stories": [
+                _item(1, IDEAS[0]),
+                _item(2, IDEAS[1], acceptance_criteria=[]),  # invalide → redemandée
+                _item(3, IDEAS[2], priority="Urgente"),       # invalide → redemandée
+                # id 4 absent → redemandée
+            ]})
+        if "Voici une User Story" in prompt:
+            return '"Titre individuel"'
+        idea = prompt.split('"')[1]
+        return f"En tant qu'utilisateur, je veux {idea} afin de progresser.\n- critère A\n- critère B\nPriorité : Basse"
+
+    monkeypatch.setattr(generator, "chat_completion", fake_chat)
+    stories = generator.generate_user_stories_batch(IDEAS, batch_size=8)
+
+    batch_calls = [c for c in calls if '"stories"' in c]
+    assert len(batch_calls) == 1 and all(idea in batch_calls[0] for idea in IDEAS), "❌ Une requête groupée attendue"
+    assert len(calls) == 1 + 3 * 2, "❌ Seules les 3 idées en échec doivent être redemandées (US + titre)"
+
+    assert stories[0]["priority"] == "Haute" and stories[0]["title"] == f"Titre {IDEAS[0]}"
+    assert stories[0]["acceptance_criteria"][0] == f"{IDEAS[0]} disponible"
+    assert stories[0]["summary"] == IDEAS[0].capitalize()
+    for story, idea in zip(stories[1:], IDEAS[1:]):
+        assert idea in story["user_story"], "❌ Ordre des idées non conservé"
+        assert story["title"] == "Titre individuel" and story["priority"] == "Basse"
+
+
+def test_unparseable_batch_falls_back_and_reports_errors(monkeypatch):
+    def fake_chat(messages, **kwargs):
+        prompt = messages[-1]["content"]
+        if '"stories"' in prompt:
+            return "Désolé, je ne peux pas répondre."
+        raise RuntimeError("API indisponible")
+
+    monkeypatch.setattr(generator, "chat_completion", fake_chat)
+    stories = generator.generate_user_stories(IDEAS[:2])
+    assert [s["priority"] for s in stories] == ["Erreur", "Erreur"]
+    assert [s["idea"] for s in stories] == IDEAS[:2]
+    print("✅ Génération groupée : validation par élément et repli individuel")
@@ -0,0 +1,66 @@
+"""
+test_jira_bulk.py
+-----------------
+Vérifie l'export Jira contre un faux serveur local (fixture `jira_stub`) :
+ - lots de 50 via /rest/api/3/issue/bulk, clés dans l'ordre des US
+ - seuls les éléments en échec transitoire sont renvoyés, les rejets définitifs donnent None
+ - la session partagée réutilise une seule connexion (keep-alive)
+ - le débit en masse dépasse largement le débit « une requête par US »
+"""
+
+import time
+
+from backlog_generator import jira_client
+from backlog_generator.jira_client import bulk_create_issues, export_user_stories_to_jira
+from benchmarks.synthetic import make_stories
+
+
+def test_bulk_batches_and_keeps_order(jira_stub):
+    keys = export_user_stories_to_jira(make_stories(120))
+    assert len(keys) == 120, "❌ Toutes les US devraient être créées"
+    assert jira_stub.requests == [("POST", "/rest/api/3/issue/bulk")] * 3, "❌ 120 US = 3 lots de 50 au plus"
+    summaries = [jira_stub.issues[k]["summary"] for k in keys]
+    assert summaries == [f"Alerte vent n°{i}" for i in range(120)], "❌ Ordre des clés non conservé"
+
+
+def test_partial_failures_only_retry_transient_items(jira_stub, monkeypatch):
+    jira_stub.fail_summaries = {"Alerte vent n°3": [503], "Alerte vent n°7": [400, 400, 400, 400]}
+    fields = [jira_client._build_issue_fields(s) for s in make_stories(10)]
+
+    sent = []
+    real_post = jira_client._post_bulk
+    def spy(issue_fields, pending, keys):
+        sent.append(list(pending))
+        return real_post(issue_fields, pending, keys)
+    monkeypatch.setattr(jira_client, "_post_bulk", spy)
+    keys = bulk_create_issues(fields)
+
+    assert sent == [list(range(10)), [3]], f"❌ Seul l'élément 3 (503) devrait être renvoyé : {sent}"
+    assert keys[7] is None, "❌ Un rejet 400 doit rester en échec"
+    assert all(keys[i] for i in range(10) if i != 7), "❌ Les autres éléments doivent avoir une clé"
+    assert jira_stub.issues[keys[3]]["summary"] == "Alerte vent n°3", "❌ Clé mal associée après reprise"
+
+
+def test_whole_batch_retried_on_throttle(jira_stub):
+    jira_stub.throttle = [1]
+    keys = bulk_create_issues([jira_client._build_issue_fields(s) for s in make_stories(5)])
+    assert all(keys) and len(jira_stub.requests) == 2, "❌ Un 429 global doit renvoyer le lot entier une fois"
+
+
+def test_bulk_throughput_and_keep_alive(jira_stub):
+    jira_stub.latency = 0.01
+    stories = make_stories(60)
+
+    t0 = time.perf_counter()
+    single = export_user_stories_to_jira(stories, bulk=False)
+    single_rate = len(single) / (time.perf_counter() - t0)
+    assert len(jira_stub.connections) == 1, "❌ La session devrait réutiliser une seule connexion"
+
+    t0 = time.perf_counter()
+    bulk = export_user_stories_to_jira(stories)
+    bulk_rate = len(bulk) / (time.perf_counter() - t0)
+
+    print(f"📈 {single_rate:.0f} US/s (unitaire) → {bulk_rate:.0f} US/s (bulk)")
+    assert len(single) == len(bulk) == 60
+    assert bulk_rate > 5 * single_rate, "❌ L'export en masse devrait être bien plus rapide"
+    print("✅ Export Jira en masse conforme")
@@ -0,0 +1,81 @@
+"""
+test_jira_concurrent.py
+-----------------------
+Vérifie le mode d'export Jira concurrent (une requête par US, concurrence AIMD) :
+ - le limiteur monte d'environ +1 par fenêtre réussie et se divise par deux une fois par fenêtre de 429
+ - contre un faux Jira limitant les requêtes simultanées : toutes les US sont créées, dans l'ordre
+ - `Retry-After` suspend les nouveaux départs
+ - chaque clé créée est consignée aussitôt : un lot interrompu ne recrée rien à la reprise
+"""
+
+import time
+
+import pytest
+
+from backlog_generator import jira_client
+from backlog_generator.jira_client import export_user_stories_to_jira
+from backlog_generator.jira_ledger import SyncLedger
+from backlog_generator.rate_limit import AdaptiveConcurrency
+from benchmarks.synthetic import make_stories
+
+
+def test_aimd_limits():
+    limiter = AdaptiveConcurrency(initial=2, maximum=8)
+    for _ in range(20):
+        limiter.release(limiter.acquire())
+    assert 5 <= limiter.limit <= 8, f"❌ La limite devrait avoir augmenté : {limiter.limit}"
+
+    before = limiter.limit
+    tickets = [limiter.acquire() for _ in range(3)]
+    for t in tickets:  # trois 429 de la même fenêtre → une seule division
+        limiter.release(t, throttled=True)
+    assert limiter.limit == before / 2 and limiter.throttled == 3, "❌ Une seule réduction par fenêtre"
+
+    for _ in range(10):
+        limiter.release(limiter.acquire(), throttled=True)
+    assert limiter.limit == 1, "❌ La limite ne descend pas sous le minimum"
+
+
+def test_concurrent_export_adapts_to_server_limit(jira_stub):
+    jira_stub.latency = 0.02
+    jira_stub.max_in_flight = 4
+    stories = make_stories(100)
+
+    t0 = time.perf_counter()
+    keys = export_user_stories_to_jira(stories, bulk=False, concurrency=16)
+    elapsed = time.perf_counter() - t0
+
+    assert len(keys) == 100 and len(jira_stub.issues) == 100, "❌ Toutes les US devraient être créées une fois"
+    assert [jira_stub.issues[k]["summary"] for k in keys] == [s["title"] for s in stories], "❌ Ordre non conservé"
+    assert jira_stub.peak_in_flight > 1, "❌ Les requêtes devraient partir en parallèle"
+    assert elapsed < 100 * 0.02, f"❌ Pas plus rapide que l'export séquentiel ({elapsed:.2f} s)"
+
+
+def test_retry_after_pauses_new_requests(jira_stub):
+    jira_stub.throttle = [0.3]
+    t0 = time.perf_counter()
+    keys = export_user_stories_to_jira(make_stories(3), bulk=False, concurrency=4)
+    assert len(keys) == 3, "❌ L'US limitée doit être recréée après la pause"
+    assert time.perf_counter() - t0 >= 0.3, "❌ Retry-After non respecté"
+    print("✅ Export Jira concurrent adaptatif conforme")
+
+
+def test_interrupted_chunk_keeps_created_keys(jira_stub, monkeypatch, tmp_path):
+    stories = make_stories(40)
+    create = jira_client._create_adaptive
+
+    def crash_on_last(fields, limiter):
+        if fields["summary"] == stories[-1]["title"]:
+            raise KeyboardInterrupt
+        return create(fields, limiter)
+
+    ledger = SyncLedger(tmp_path / "jira_sync.sqlite")
+    monkeypatch.setattr(jira_client, "_create_adaptive", crash_on_last)
+    with pytest.raises(KeyboardInterrupt):
+        export_user_stories_to_jira(stories, bulk=False, concurrency=4, ledger=ledger)
+    created = len(jira_stub.issues)
+    assert created == 39 and len(ledger) == created, "❌ Les clés créées doivent être consignées avant la fin du lot"
+
+    monkeypatch.setattr(jira_client, "_create_adaptive", create)
+    keys = export_user_stories_to_jira(stories, bulk=False, concurrency=4, ledger=ledger)
+    assert len(keys) == 40 and len(jira_stub.issues) == 40, "❌ La reprise a recréé des US déjà poussées"
@@ -0,0 +1,82 @@
+"""
+test_jira_ledger.py
+-------------------
+Vérifie l'export Jira idempotent (jira_ledger.SyncLedger) contre le faux serveur local :
+ - un second export identique ne crée ni ne modifie rien
+ - une US modifiée est mise à jour (PUT) sur sa clé existante
+ - un export interrompu reprend sans doublon
+ - un job "text" relancé ne recrée pas ses tickets
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from backlog_generator import feedback_listener, jira_client
+from backlog_generator.jira_client import export_user_stories_to_jira
+from backlog_generator.jira_ledger import SyncLedger, story_identities
+from benchmarks.synthetic import make_stories
+
+
+def test_reexport_skips_unchanged_and_updates_changed(jira_stub, tmp_path):
+    ledger = SyncLedger.for_session(tmp_path)
+    stories = make_stories(80)
+    first = export_user_stories_to_jira(stories, ledger=ledger)
+    assert len(first) == 80 and len(ledger) == 80, "❌ Toutes les US devraient être enregistrées"
+
+    jira_stub.requests.clear()
+    assert export_user_stories_to_jira(stories, ledger=ledger) == first, "❌ Clés différentes au ré-export"
+    assert jira_stub.requests == [], "❌ Un ré-export identique ne doit envoyer aucune requête"
+
+    stories[5]["acceptance_criteria"] = ["Seuil affiché", "Coefficient affiché"]
+    assert export_user_stories_to_jira(stories, ledger=ledger) == first, "❌ La mise à jour doit garder la clé"
+    assert jira_stub.requests == [("PUT", f"/rest/api/3/issue/{first[5]}")], "❌ Seule l'US modifiée est poussée"
+    assert "Coefficient" in str(jira_stub.issues[first[5]]["description"]), "❌ Description non mise à jour"
+    assert len(jira_stub.issues) == 80
+
+
+def test_interrupted_export_resumes_without_duplicates(jira_stub, tmp_path, monkeypatch):
+    stories = make_stories(120)
+    real_bulk = jira_client.bulk_create_issues
+    calls = []
+
+    def crash_on_second_batch(fields):
+        calls.append(len(fields))
+        if len(calls) == 2:
+            raise ConnectionError("coupure réseau")
+        return real_bulk(fields)
+
+    monkeypatch.setattr(jira_client, "bulk_create_issues", crash_on_second_batch)
+    with pytest.raises(ConnectionError):
+        export_user_stories_to_jira(stories, ledger=SyncLedger.for_session(tmp_path))
+    monkeypatch.setattr(jira_client, "bulk_create_issues", real_bulk)
+
+    jira_stub.requests.clear()
+    keys = export_user_stories_to_jira(stories, ledger=SyncLedger.for_session(tmp_path))
+    assert len(jira_stub.requests) == 2, "❌ Seuls les 70 éléments restants devraient être envoyés (2 lots)"
+    assert len(jira_stub.issues) == 120 and len(set(keys)) == 120, "❌ Doublons créés à la reprise"
+    summaries = [jira_stub.issues[k]["summary"] for k in keys]
+    assert summaries == [s["title"] for s in stories], "❌ Ordre des clés non conservé"
+
+
+def test_retried_text_job_does_not_recreate_issues(jira_stub, monkeypatch):
+    stories = make_stories(5)
+    monkeypatch.setattr(feedback_listener, "extract_ideas_from_text", lambda text: [s["idea"] for s in stories])
+    monkeypatch.setattr(feedback_listener, "generate_user_stories_batch", lambda ideas: [dict(s) for s in stories])
+    ctx = SimpleNamespace(job=SimpleNamespace(id="42"), event=lambda *args, **kwargs: None)
+    payload = {"text": "retours de la réunion", "push_to_jira": True}
+
+    feedback_listener.text_job(payload, ctx)
+    assert len(jira_stub.issues) == 5
+    jira_stub.requests.clear()
+    feedback_listener.text_job(payload, ctx)  # relance du même job (ex. bail expiré après l'export)
+    assert len(jira_stub.issues) == 5, "❌ La relance du job a recréé des tickets Jira"
+    assert jira_stub.requests == [], "❌ Une relance identique ne doit envoyer aucune requête"
+
+
+def test_identities_are_stable_and_distinct():
+    stories = make_stories(3) + [{"idea": "Recevoir l'alerte vent du spot 0 !"}]
+    ids = story_identities(stories)
+    assert len(set(ids)) == 4, "❌ Deux US de même idée doivent garder des identités distinctes"
+    assert story_identities(make_stories(3)) == ids[:3], "❌ Identité instable"
+    print("✅ Registre de synchronisation Jira conforme")
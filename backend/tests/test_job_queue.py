@@ -0,0 +1,141 @@
+"""
+test_job_queue.py
+-----------------
+Vérifie la file de jobs durable (job_queue.JobQueue) et son pool de workers :
+ - prise de job avec bail, reprise après expiration du bail, protection contre un worker périmé
+ - nouvelles tentatives puis échec définitif, journal d'événements
+ - plusieurs process traitent des jobs en parallèle
+ - le job "session" reflète son état dans metadata.json, y compris après un bail expiré
+"""
+
+import json
+import time
+
+import pytest
+
+from backlog_generator import session_processing
+from backlog_generator.job_queue import JobQueue, WorkerPool, worker_loop
+from backlog_generator.session_processing import enqueue_session
+
+TEST_HANDLERS = {"sleep": "test_job_queue:sleep_job", "flaky": "test_job_queue:flaky_job"}
+
+
+def sleep_job(payload, ctx):
+    ctx.event("progress", step="sleep")
+    time.sleep(payload["sec"])
+    return {"slept": payload["sec"], "worker": ctx.worker_id}
+
+
+def flaky_job(payload, ctx):
+    if ctx.job.attempts < payload["succeed_on"]:
+        raise RuntimeError(f"panne #{ctx.job.attempts}")
+    return {"attempts": ctx.job.attempts}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lease_expiry_and_stale_worker(tmp_path):
+    clock = FakeClock()
+    queue = JobQueue(tmp_path / "jobs.sqlite", lease_sec=10, clock=clock)
+    job_id = queue.enqueue("sleep", {"sec": 0})
+
+    job = queue.claim("w1")
+    assert job.id == job_id and job.attempts == 1
+    assert queue.claim("w2") is None, "❌ Un job sous bail ne doit pas être repris"
+
+    clock.now += 11  # w1 a disparu : bail expiré
+    job = queue.claim("w2")
+    assert job is not None and job.attempts == 2, "❌ Le job au bail expiré doit être repris"
+    assert not queue.complete(job_id, "w1", {}), "❌ Un worker périmé ne doit pas conclure le job"
+    assert queue.complete(job_id, "w2", {"ok": True})
+    assert queue.get(job_id).status == "succeeded"
+    assert [e["event"] for e in queue.events(job_id)] == ["queued", "started", "started", "succeeded"]
+
+
+def test_retries_then_fails(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite", max_attempts=3, retry_base_sec=0)
+    ok = queue.enqueue("flaky", {"succeed_on": 2})
+    ko = queue.enqueue("flaky", {"succeed_on": 9})
+    assert worker_loop(queue, "w", poll_sec=0.01, handlers=TEST_HANDLERS, exit_when_idle=True) == 5
+
+    assert queue.get(ok).status == "succeeded" and queue.get(ok).result == {"attempts": 2}
+    failed = queue.get(ko)
+    assert failed.status == "failed" and failed.attempts == 3, "❌ Échec définitif après 3 tentatives"
+    assert failed.error == "panne #3"
+    assert [e["event"] for e in queue.events(ko)].count("retry") == 2
+
+
+def test_worker_pool_runs_jobs_in_parallel(tmp_path):
+    path = tmp_path / "jobs.sqlite"
+    queue = JobQueue(path)
+    ids = [queue.enqueue("sleep", {"sec": 1.0}) for _ in range(4)]
+
+    pool = WorkerPool(path, processes=4, poll_sec=0.1, handlers=TEST_HANDLERS, exit_when_idle=True)
+    pool.start()
+    pool.join(timeout=60)
+
+    jobs = [queue.get(i) for i in ids]
+    assert all(j.status == "succeeded" for j in jobs), "❌ Tous les jobs doivent réussir"
+    assert len({j.result["worker"] for j in jobs}) > 1, "❌ Les jobs doivent être répartis entre workers"
+    # Fenêtres d'exécution (hors démarrage des process) : elles doivent se chevaucher
+    starts = [next(e["at"] for e in queue.events(i) if e["event"] == "started") for i in ids]
+    ends = [next(e["at"] for e in queue.events(i) if e["event"] == "succeeded") for i in ids]
+    assert max(starts) < min(ends), "❌ Les jobs auraient dû s'exécuter en parallèle"
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_session_job_updates_metadata(tmp_path, monkeypatch, fails):
+    folder = tmp_path / "session_2025-11-12_0930"
+    folder.mkdir()
+    (folder / "metadata.json").write_text(json.dumps({
+        "session_id": folder.name, "audio_file": str(folder / "audio.wav"), "processed": False, "status": "recorded",
+    }))
+    seen = []
+
+    def fake_pipeline(file_path, push_to_jira=False, report=None, **kwargs):
+        seen.append(json.loads((folder / "metadata.json").read_text())["status"])
+        if fails:
+            raise RuntimeError("Groq indisponible")
+        report["quality"] = {"global_score": 0.9}
+        return [{"title": "Alerte vent", "priority": "Haute", "theme": "Alertes"}]
+
+    monkeypatch.setattr(session_processing, "process_audio_feedback", fake_pipeline)
+    queue = JobQueue(tmp_path / "jobs.sqlite", max_attempts=2, retry_base_sec=0)
+    job_id = enqueue_session(queue, folder)
+    assert json.loads((folder / "metadata.json").read_text())["status"] == "queued"
+
+    worker_loop(queue, "w", poll_sec=0.01, exit_when_idle=True)
+    meta = json.loads((folder / "metadata.json").read_text())
+    assert seen[0] == "processing", "❌ metadata.json doit indiquer le traitement en cours"
+    assert meta["job_id"] == job_id
+    if fails:
+        assert len(seen) == 2 and meta["status"] == "failed" and not meta["processed"]
+        assert queue.get(job_id).status == "failed"
+    else:
+        assert meta["status"] == "completed" and meta["processed"] is True
+        assert queue.get(job_id).result["user_story_count"] == 1
+        assert json.loads((folder / "summary.json").read_text())["user_story_count"] == 1
+    print("✅ File de jobs conforme")
+
+
+def test_expired_last_attempt_marks_session_failed(tmp_path):
+    folder = tmp_path / "session_2025-11-12_1015"
+    folder.mkdir()
+    (folder / "metadata.json").write_text(json.dumps({"session_id": folder.name, "status": "recorded"}))
+    clock = FakeClock()
+    queue = JobQueue(tmp_path / "jobs.sqlite", lease_sec=10, max_attempts=1, clock=clock)
+    job_id = enqueue_session(queue, folder)
+
+    assert queue.claim("w1").id == job_id
+    clock.now += 11  # le worker est mort pendant sa dernière tentative
+    assert queue.claim("w2") is None
+
+    meta = json.loads((folder / "metadata.json").read_text())
+    assert queue.get(job_id).status == "failed"
+    assert meta["status"] == "failed" and meta["error"] == "bail expiré", "❌ metadata.json resté en file"
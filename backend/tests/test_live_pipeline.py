@@ -0,0 +1,55 @@
+"""
+test_live_pipeline.py
+---------------------
+Vérifie le pipeline live : les fenêtres audio sont transcrites et analysées
+au fil de l'eau, et l'arrêt ne traite que la dernière fenêtre + la consolidation.
+"""
+
+import numpy as np
+
+from backlog_generator import live_pipeline
+
+FS = 8000
+
+
+def test_windows_are_analyzed_incrementally(monkeypatch):
+    transcripts = iter([
+        "nous voulons une alerte météo en temps réel pour les randonneurs " * 3,
+        "il faut aussi exporter les prévisions vers le calendrier de l'équipe " * 3,
+        "enfin partager les itinéraires avec la communauté des alpinistes " * 3,
+    ])
+    analyzed, finalized = [], []
+
+    monkeypatch.setattr(live_pipeline, "transcribe_bytes", lambda data, name: next(transcripts))
+    monkeypatch.setattr(
+        live_pipeline, "segment_transcript",
+        lambda text: [{"theme": f"Thème {len(analyzed)}", "content": text}],
+    )
+
+    def fake_analyze(segments, max_workers=None):
+        analyzed.append(segments[0]["content"])
+        return [{"theme": segments[0]["theme"], "title": "US", "idea": segments[0]["content"][:30]}]
+
+    def fake_finalize(stories, push_to_jira=False, report=None, **kwargs):
+        finalized.append(list(stories))
+        return stories
+
+    monkeypatch.setattr(live_pipeline, "analyze_segments", fake_analyze)
+    monkeypatch.setattr(live_pipeline, "finalize_user_stories", fake_finalize)
+
+    pipeline = live_pipeline.LiveSessionPipeline(fs=FS, session_id="test_live", min_segment_words=20)
+    pipeline.start()
+    t = np.arange(FS) / FS
+    window = (5000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)[:, None]
+    pipeline.submit_window(window)
+    pipeline.submit_window(window)
+
+    report = {}
+    stories = pipeline.finish(tail=window, report=report)
+
+    assert pipeline.windows_processed == 3, "❌ Toutes les fenêtres n'ont pas été transcrites"
+    assert len(analyzed) == 3, "❌ Chaque fenêtre suffisamment longue doit être analysée"
+    assert len(finalized) == 1 and len(stories) == 3, "❌ La consolidation finale doit voir toutes les US"
+    assert report["audio"]["original_bytes"] == 3 * window.nbytes, "❌ Statistiques d'envoi manquantes"
+    assert "alerte météo" in pipeline.transcript and "alpinistes" in pipeline.transcript
+    print(f"✅ Pipeline live : {len(stories)} US issues de {pipeline.windows_processed} fenêtres")
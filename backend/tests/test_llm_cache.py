@@ -0,0 +1,69 @@
+"""
+test_llm_cache.py
+-----------------
+Vérifie le cache persistant des réponses LLM :
+ - clé stable sur (modèle, messages, température, max_tokens)
+ - compteurs hits / misses
+ - expiration TTL et éviction LRU
+ - chat_completion ne rappelle pas l'API sur une requête déjà vue
+"""
+
+from types import SimpleNamespace
+
+from backlog_generator import llm_client
+from backlog_generator.llm_cache import LLMCache, make_cache_key
+
+
+def test_cache_key_is_content_addressed():
+    messages = [{"role": "user", "content": "Bonjour"}]
+    a = make_cache_key(model="m", messages=messages, temperature=0.2, max_tokens=None)
+    b = make_cache_key(max_tokens=None, temperature=0.2, messages=messages, model="m")
+    c = make_cache_key(model="m", messages=messages, temperature=0.3, max_tokens=None)
+    assert a == b, "❌ La clé dépend de l'ordre des paramètres"
+    assert a != c, "❌ La température doit faire partie de la clé"
+
+
+def test_cache_hits_ttl_and_lru(tmp_path):
+    cache = LLMCache(tmp_path / "cache.sqlite", ttl_sec=3600, max_entries=2)
+    assert cache.get("k1") is None
+    cache.set("k1", "réponse 1")
+    cache.set("k2", "réponse 2")
+    assert cache.get("k1") == "réponse 1"
+
+    # k2 est le moins récemment utilisé → évincé à l'ajout de k3
+    cache.set("k3", "réponse 3")
+    assert cache.get("k2") is None, "❌ L'éviction LRU n'a pas supprimé l'entrée la plus ancienne"
+    assert cache.get("k3") == "réponse 3"
+
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+    assert stats["entries"] == 2
+
+    # Persistance sur disque + expiration
+    reopened = LLMCache(tmp_path / "cache.sqlite", ttl_sec=-1)
+    assert reopened.get("k1") is None, "❌ Une entrée expirée ne doit pas être servie"
+
+
+def test_chat_completion_replays_from_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def create(**params):
+        calls.append(params)
+        response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="oui"))])
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+    raw = SimpleNamespace(create=create)
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw)))
+    cache = LLMCache(tmp_path / "cache.sqlite")
+    monkeypatch.setattr(llm_client, "get_client", lambda: fake_client)
+    monkeypatch.setattr(llm_client, "get_cache", lambda: cache)
+
+    messages = [{"role": "user", "content": "Ce segment parle-t-il produit ?"}]
+    assert llm_client.chat_completion(messages, temperature=0) == "oui"
+    assert llm_client.chat_completion(messages, temperature=0) == "oui"
+    assert len(calls) == 1, "❌ La seconde requête identique aurait dû être servie par le cache"
+
+    llm_client.chat_completion(messages, temperature=0, max_tokens=10)
+    assert len(calls) == 2
+    assert llm_client.cache_stats()["hits"] == 1
+    print("✅ Cache LLM OK :", llm_client.cache_stats())
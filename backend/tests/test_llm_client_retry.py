@@ -0,0 +1,121 @@
+"""
+test_llm_client_retry.py
+------------------------
+Vérifie la couche client LLM partagée (llm_client + rate_limit) sans réseau :
+le client Groq réel est branché sur un transport httpx simulé.
+ - 429 avec retry-after puis succès : l'appel aboutit, le délai imposé est respecté
+ - 5xx et erreurs réseau retentées, 4xx non retentées
+ - seaux à jetons recalés sur les en-têtes x-ratelimit-*
+ - quota journalier de requêtes (en-têtes Groq *-requests) : plafond, jamais un débit par minute
+"""
+
+import json
+
+import httpx
+import pytest
+from groq import BadRequestError, Groq
+
+from backlog_generator import llm_client
+from backlog_generator.rate_limit import RateLimiter, TokenBucket, parse_duration
+
+
+class FakeClock:
+    """Horloge simulée : `sleep` avance le temps au lieu d'attendre."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _completion(text):
+    return {
+        "id": "c1", "object": "chat.completion", "created": 0, "model": "m",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+    }
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Installe un client Groq sur transport simulé ; `responses` = file de (statut, en-têtes, corps)."""
+    responses, seen = [], []
+
+    def handler(request):
+        seen.append(request)
+        status, headers, body = responses.pop(0)
+        if isinstance(body, Exception):
+            raise body
+        return httpx.Response(status, headers=headers, content=json.dumps(body))
+
+    client = Groq(api_key="test", http_client=httpx.Client(transport=httpx.MockTransport(handler)), max_retries=0)
+    clock = FakeClock()
+    monkeypatch.setattr(llm_client, "_client", client)
+    monkeypatch.setattr(llm_client, "limiter", RateLimiter(600, 1e6, clock=clock, sleep=clock.sleep))
+    return responses, seen, clock
+
+
+def test_rate_limited_call_is_retried_after_retry_after(fake_api):
+    responses, seen, clock = fake_api
+    responses += [
+        (429, {"retry-after": "7"}, {"error": {"message": "rate limited"}}),
+        (503, {}, {"error": {"message": "overloaded"}}),
+        (200, {"x-ratelimit-limit-tokens": "6000", "x-ratelimit-remaining-tokens": "5000",
+               "x-ratelimit-reset-tokens": "10s"}, _completion("bonjour")),
+    ]
+    text = llm_client.chat_completion([{"role": "user", "content": "salut"}], use_cache=False)
+
+    assert text == "bonjour" and len(seen) == 3, "❌ L'appel aurait dû aboutir à la 3e tentative"
+    assert clock.now >= 7, "❌ Le retry-after du fournisseur n'a pas été respecté"
+    tokens = llm_client.limiter.buckets(llm_client.CHAT_MODEL)[1]
+    assert tokens.capacity == 6000 and tokens.tokens <= 5000 and tokens.rate == pytest.approx(100.0)
+
+
+def test_connection_errors_retry_but_client_errors_do_not(fake_api):
+    responses, seen, _ = fake_api
+    responses += [(0, {}, httpx.ConnectError("refusé")), (200, {}, _completion("ok"))]
+    assert llm_client.chat_completion([{"role": "user", "content": "a"}], use_cache=False) == "ok"
+
+    responses += [(400, {}, {"error": {"message": "bad request"}})]
+    with pytest.raises(BadRequestError):
+        llm_client.chat_completion([{"role": "user", "content": "b"}], use_cache=False)
+    assert len(seen) == 3, "❌ Une erreur 400 ne doit pas être retentée"
+
+
+def test_token_bucket_paces_to_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock, sleep=clock.sleep)
+    for _ in range(6):
+        bucket.acquire()
+    assert clock.now == pytest.approx(2.0), "❌ 6 jetons à 2/s avec 2 d'avance = 2 s d'attente"
+
+    bucket.pause(5)
+    bucket.acquire()
+    assert clock.now >= 7.0, "❌ La pause retry-after n'a pas bloqué l'acquisition"
+    assert parse_duration("2m59.5s") == pytest.approx(179.5) and parse_duration("120ms") == pytest.approx(0.12)
+    print("✅ Client LLM : limitation de débit et reprises")
+
+
+def test_daily_request_headers_do_not_throttle_per_minute_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(30, 1e6, clock=clock, sleep=clock.sleep)
+    for i in range(90):
+        limiter.acquire("m")
+        limiter.observe("m", {
+            "x-ratelimit-limit-requests": "1000", "x-ratelimit-remaining-requests": str(999 - i),
+            "x-ratelimit-reset-requests": "1m26.4s",
+            "x-ratelimit-limit-tokens": "6000", "x-ratelimit-remaining-tokens": "5900",
+            "x-ratelimit-reset-tokens": "1s",
+        })
+    assert clock.now == pytest.approx(120.0), "❌ 90 appels à 30/min (30 d'avance) doivent prendre 2 min"
+
+    limiter.observe("m", {"x-ratelimit-limit-requests": "1000", "x-ratelimit-remaining-requests": "0",
+                          "x-ratelimit-reset-requests": "2h0m0s"})
+    limiter.acquire("m")
+    assert clock.now >= 120.0 + 7200, "❌ Le quota journalier épuisé doit suspendre les appels jusqu'à sa remise à zéro"
+    print("✅ Quota journalier de requêtes traité comme un plafond")
@@ -0,0 +1,90 @@
+"""
+test_pipeline_concurrency.py
+----------------------------
+Vérifie que l'exécution concurrente du pipeline audio (segments + idées)
+produit exactement le même résultat que l'exécution séquentielle.
+"""
+
+import random
+import threading
+import time
+
+from backlog_generator import audio_transcriber
+
+SEGMENTS = [
+    {"theme": f"Thème {i}", "content": f"contenu du segment {i} sur les alertes météo"}
+    for i in range(8)
+]
+
+
+def _install_fake_llm(monkeypatch):
+    """Remplace les appels Groq par des fonctions déterministes (avec latence aléatoire)."""
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def slow(fn):
+        def wrapper(*args):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(random.uniform(0.001, 0.02))
+            try:
+                return fn(*args)
+            finally:
+                with lock:
+                    state["active"] -= 1
+        return wrapper
+
+    def is_product(text):
+        return not text.endswith("3 sur les alertes météo")
+
+    def extract(text):
+        n = int(text.split()[3])
+        return [
+            {"idea": f"idée {n}.{k} : alerte numéro {n * 10 + k}", "title": f"Idée {n}.{k}", "confidence": 0.9}
+            for k in range(n % 4)
+        ]
+
+    def story(idea):
+        return {
+            "summary": idea,
+            "user_story": f"En tant qu'utilisateur, je veux {idea} afin de rester informé.",
+            "acceptance_criteria": [f"critère {idea}"],
+            "priority": "Moyenne",
+        }
+
+    monkeypatch.setattr(audio_transcriber, "is_segment_about_product", slow(is_product))
+    monkeypatch.setattr(audio_transcriber, "extract_ideas_from_segment", slow(extract))
+    def batch(ideas):
+        return [{**story(idea), "title": idea[:20]} for idea in ideas]
+
+    monkeypatch.setattr(audio_transcriber, "generate_user_stories_batch", slow(batch))
+    return state
+
+
+def test_concurrent_analysis_matches_sequential(monkeypatch):
+    """L'ordre et le contenu des US doivent être identiques quel que soit le parallélisme."""
+    state = _install_fake_llm(monkeypatch)
+
+    sequential = audio_transcriber.analyze_segments(SEGMENTS, max_workers=1)
+    assert state["peak"] == 1, "❌ Le mode séquentiel ne doit lancer qu'un appel à la fois"
+
+    state["peak"] = 0
+    concurrent = audio_transcriber.analyze_segments(SEGMENTS, max_workers=8)
+    assert state["peak"] > 1, "❌ Aucun appel LLM n'a été parallélisé"
+
+    assert concurrent == sequential, "❌ Résultat différent entre séquentiel et concurrent"
+    assert [us["theme"] for us in sequential][:3] == ["Thème 1", "Thème 2", "Thème 2"]
+
+
+def test_process_audio_feedback_consolidation_is_stable(monkeypatch):
+    """La consolidation finale est identique en mode séquentiel et concurrent."""
+    _install_fake_llm(monkeypatch)
+    monkeypatch.setattr(audio_transcriber, "transcribe_audio", lambda path, **kwargs: "texte transcrit")
+    monkeypatch.setattr(audio_transcriber, "segment_conversation_llm", lambda text: [dict(s) for s in SEGMENTS])
+
+    sequential = audio_transcriber.process_audio_feedback("fake.wav", max_workers=1)
+    concurrent = audio_transcriber.process_audio_feedback("fake.wav", max_workers=6)
+
+    assert concurrent == sequential, "❌ Consolidation différente selon le parallélisme"
+    print(f"✅ {len(concurrent)} US identiques en séquentiel et en concurrent")
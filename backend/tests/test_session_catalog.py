@@ -0,0 +1,95 @@
+"""
+test_session_catalog.py
+-----------------------
+Teste le catalogue indexé des sessions et les endpoints /api/sessions :
+ - indexation au fil des écritures (update_metadata, generate_session_summary)
+ - filtres since / theme / min_score et pagination
+ - cache de réponses avec ETag / If-None-Match (304) invalidé par la révision du catalogue
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from api import sessions
+from api.main import app
+from backlog_generator.session_catalog import SessionCatalog, get_catalog
+from backlog_generator.session_processing import update_metadata
+from backlog_generator.session_summary import generate_session_summary
+
+
+def make_session(root, day: int, score: float, themes: list[str]):
+    folder = root / f"session_2025-11-{day:02d}_1000"
+    folder.mkdir(parents=True)
+    update_metadata(folder, session_id=folder.name, start_time=f"2025-11-{day:02d}T10:00:00",
+                    end_time=f"2025-11-{day:02d}T10:30:00", duration_sec=1800,
+                    audio_file=str(folder / "audio.wav"), status="completed")
+    stories = [{"title": f"US {t}", "priority": "Haute", "theme": t} for t in themes]
+    generate_session_summary(folder / "metadata.json", stories, {"global_score": score})
+    return folder
+
+
+def test_catalog_indexes_writes_and_filters(tmp_path):
+    for day, score, themes in [(1, 0.4, ["Alertes"]), (2, 0.9, ["Alertes", "Cartes"]), (3, 0.7, ["Cartes"])]:
+        make_session(tmp_path, day, score, themes)
+    catalog = get_catalog()
+
+    items, total = catalog.search()
+    assert total == 3 and [i["session_id"][-10:] for i in items] == ["11-03_1000", "11-02_1000", "11-01_1000"]
+    assert catalog.search(theme="alertes")[1] == 2, "❌ Filtre par thème insensible à la casse"
+    assert [i["score_global"] for i in catalog.search(min_score=0.5)[0]] == [0.7, 0.9]
+    assert catalog.search(since="2025-11-02")[1] == 2
+    assert catalog.search(limit=1, offset=2)[0][0]["session_id"].endswith("11-01_1000")
+
+    latest = catalog.latest()
+    assert latest["metadata"]["status"] == "completed" and latest["user_story_count"] == 1
+
+    revision = catalog.revision()
+    update_metadata(tmp_path / "session_2025-11-03_1000", status="completed")
+    assert catalog.revision() == revision, "❌ Une écriture identique ne doit pas invalider les caches"
+
+    rebuilt = SessionCatalog(tmp_path / "rebuilt.sqlite")
+    assert rebuilt.rebuild(tmp_path) == 3 and rebuilt.get("session_2025-11-02_1000") == catalog.get("session_2025-11-02_1000")
+
+
+def test_sessions_api_etag_and_invalidation(tmp_path, monkeypatch):
+    monkeypatch.setattr(sessions, "SESSIONS_DIR", tmp_path)
+    make_session(tmp_path, 1, 0.4, ["Alertes"])
+    folder = make_session(tmp_path, 2, 0.9, ["Cartes"])
+
+    with TestClient(app) as client:
+        first = client.get("/api/sessions", params={"theme": "cartes"})
+        assert first.status_code == 200 and first.json()["total"] == 1
+        etag = first.headers["etag"]
+
+        again = client.get("/api/sessions", params={"theme": "cartes"}, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b"", "❌ Le tableau de bord doit recevoir un 304"
+
+        latest = client.get("/api/sessions/latest")
+        assert latest.json()["session_id"] == folder.name
+        assert client.get(f"/api/sessions/{folder.name}").json()["quality"]["global_score"] == 0.9
+        assert client.get("/api/sessions/session_inconnue").status_code == 404
+        assert client.get("/api/sessions", params={"min_score": 2}).status_code == 422
+
+        hits = sessions.cache.hits
+        client.get("/api/sessions/latest")
+        assert sessions.cache.hits == hits + 1, "❌ La réponse aurait dû venir du cache"
+
+        update_metadata(folder, status="archived")
+        changed = client.get("/api/sessions", params={"theme": "cartes"}, headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+        assert changed.json()["items"][0]["status"] == "archived"
+    print("✅ Catalogue des sessions conforme")
+
+
+def test_api_startup_indexes_existing_folders(tmp_path, monkeypatch):
+    folder = tmp_path / "session_2025-10-01_0900"
+    folder.mkdir()
+    (folder / "metadata.json").write_text(json.dumps({"session_id": folder.name, "start_time": "2025-10-01T09:00:00"}))
+    (folder / "summary.json").write_text(json.dumps({"session_id": folder.name, "quality": {"global_score": 0.5},
+                                                     "themes_detected": [], "user_story_count": 0}))
+    monkeypatch.setattr(sessions, "SESSIONS_DIR", tmp_path)
+
+    with TestClient(app) as client:
+        data = client.get("/api/sessions/latest").json()
+    assert data["session_id"] == folder.name and data["metadata"]["start_time"] == "2025-10-01T09:00:00"
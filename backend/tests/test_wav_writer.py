@@ -0,0 +1,53 @@
+"""
+test_wav_writer.py
+------------------
+Vérifie l'enregistrement en flux vers le disque :
+ - le WAV est valide à la fermeture et identique au signal
+ - un fichier interrompu (crash) est réparé par recover_wav
+"""
+
+import shutil
+
+import numpy as np
+
+from backlog_generator.audio_chunker import read_wav
+from backlog_generator.wav_writer import StreamingWavWriter, recover_sessions, recover_wav
+
+
+def _signal(n=20_000):
+    return np.random.default_rng(7).integers(-20000, 20000, size=(n, 1), dtype=np.int16)
+
+
+def test_streaming_writer_produces_valid_wav(tmp_path):
+    signal = _signal()
+    writer = StreamingWavWriter(tmp_path / "audio.wav", fs=16000, header_interval_sec=0)
+    for start in range(0, len(signal), 1024):
+        writer.write(signal[start:start + 1024])
+    assert np.array_equal(writer.read(5000, 6000), signal[5000:6000]), "❌ Relecture live incorrecte"
+    writer.close()
+
+    samples, fs = read_wav(str(tmp_path / "audio.wav"))
+    assert fs == 16000 and np.array_equal(samples, signal), "❌ WAV différent du signal"
+
+
+def test_recover_interrupted_recording(tmp_path):
+    signal = _signal()
+    session = tmp_path / "session_2025-11-11_1219"
+    session.mkdir()
+    writer = StreamingWavWriter(session / "audio.wav", fs=16000, header_interval_sec=3600, fsync=False)
+    writer.write(signal[:8000])
+    writer._fix_header()            # dernière correction d'en-tête avant le crash
+    writer.write(signal[8000:])
+    writer._file.write(b"\x01")     # demi-échantillon écrit au moment du crash
+    writer._file.flush()            # le process meurt ici : pas de close()
+
+    writer._file.close()
+    shutil.copy(session / "audio.wav", tmp_path / "crashed.wav")
+    samples, _ = read_wav(str(tmp_path / "crashed.wav"))
+    assert len(samples) == 8000, "❌ Avant réparation, seul le début déclaré est lisible"
+
+    assert recover_sessions(tmp_path) == [session / "audio.wav"]
+    samples, fs = read_wav(str(session / "audio.wav"))
+    assert np.array_equal(samples, signal), "❌ L'audio n'a pas été entièrement récupéré"
+    assert recover_wav(tmp_path / "crashed.wav") == len(signal)
+    print("✅ WAV interrompu réparé sans perte")